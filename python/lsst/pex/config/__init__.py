@@ -19,6 +19,7 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+from .arrayField import *
 from .choiceField import *
 from .comparison import *
 from .config import *
@@ -0,0 +1,422 @@
+# This file is part of pex_config.
+#
+# Developed for the LSST Data Management System.
+# This product includes software developed by the LSST Project
+# (http://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This software is dual licensed under the GNU General Public License and also
+# under a 3-clause BSD license. Recipients may choose which of these licenses
+# to use; please see the files gpl-3.0.txt and/or bsd_license.txt,
+# respectively.  If you choose the GPL option then the following text applies
+# (but note that there is still no warranty even if you opt for BSD instead):
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+__all__ = ["ArrayField"]
+
+import base64
+from typing import Generic
+
+import numpy
+
+from .callStack import getStackFrame
+from .comparison import ConfigDifference, getComparisonName
+from .config import Config, Field, FieldTypeVar, FieldValidationError, _joinNamePath, _typeStr
+
+_MAX_LITERAL_SIZE = 64
+"""Largest array saved as a (nested) list literal; larger arrays are saved
+as encoded binary data.
+"""
+
+_HASH_DTYPES = {
+    "b": numpy.int64,
+    "i": numpy.int64,
+    "u": numpy.int64,
+    "f": numpy.float64,
+    "c": numpy.complex128,
+}
+"""Data types that arrays are cast to before hashing their data, by kind."""
+
+
+def _sameArrays(a1, a2):
+    """Return whether two arrays held by an `ArrayField` (or `None`) are
+    saved the same way.
+    """
+    if a1 is None or a2 is None:
+        return a1 is a2
+    return a1 is a2 or a1.dtype == a2.dtype and a1.shape == a2.shape and a1.tobytes() == a2.tobytes()
+
+
+class ArrayField(Field[numpy.ndarray], Generic[FieldTypeVar]):
+    """A configuration field (`~lsst.pex.config.Field` subclass) that holds
+    a `numpy.ndarray` of numbers.
+
+    Parameters
+    ----------
+    doc : `str`
+        A description of the field.
+    dtype : class, optional
+        The data type of the items of the array: `bool`, `int`, `float`,
+        `complex`, or a NumPy scalar type such as `numpy.float32`. Optional
+        if supplied as typing argument to the class.
+    default : array-like, optional
+        The default value for the field.
+    optional : `bool`, optional
+        Set whether the field is *optional*. When `False`,
+        `lsst.pex.config.Config.validate` will fail if the field's value is
+        `None`.
+    shape : `int` or `tuple` [`int` or `None`], optional
+        If set, the shape the array must have; `None` in a tuple matches any
+        length along that axis, and an `int` is the length of a
+        one-dimensional array.
+    arrayCheck : callable, optional
+        A callable that validates the array as a whole.
+    itemCheck : callable, optional
+        A callable that validates the items of the array all at once: it is
+        called with the array, and returns a boolean array of the same shape
+        that is `False` for invalid items (or a single `bool`).
+    deprecated : None or `str`, optional
+        A description of why this Field is deprecated, including removal date.
+        If not None, the string is appended to the docstring for this Field.
+
+    See also
+    --------
+    Field
+    ListField
+
+    Notes
+    -----
+    Values can be given as any array-like object whose items can be cast to
+    ``dtype`` without changing their kind (e.g. integers to floats, but not
+    floats to integers). The field holds a C-contiguous copy of the value,
+    which is never modified: reading the field gives a read-only view of it,
+    without copying, and modifying it means assigning a new value. Items are
+    checked with ``itemCheck`` when the value is set; the shape and
+    ``arrayCheck`` are checked by `lsst.pex.config.Config.validate`.
+
+    Small arrays are saved as lists; larger arrays, and arrays that are not
+    finite, are saved as encoded binary data.
+
+    Examples
+    --------
+    >>> from lsst.pex.config import Config, ArrayField
+    >>> class MyConfig(Config):
+    ...     coeffs = ArrayField("Coefficients", float, default=[1, 0, 0])
+    ...
+    >>> config = MyConfig()
+    >>> config.coeffs
+    array([1., 0., 0.])
+    >>> config.coeffs = config.coeffs * 2
+    """
+
+    def __init__(
+        self,
+        doc,
+        dtype=None,
+        default=None,
+        optional=False,
+        shape=None,
+        arrayCheck=None,
+        itemCheck=None,
+        deprecated=None,
+    ):
+        if dtype is None:
+            raise ValueError(
+                "dtype must either be supplied as an argument or as a type argument to the class"
+            )
+        try:
+            itemDtype = numpy.dtype(dtype)
+        except TypeError:
+            itemDtype = None
+        if itemDtype is None or itemDtype.kind not in "biufc":
+            raise ValueError("Unsupported dtype %s" % _typeStr(dtype))
+        if isinstance(shape, int):
+            shape = (shape,)
+        elif shape is not None:
+            shape = tuple(shape)
+            if not all(n is None or isinstance(n, int) and n >= 0 for n in shape):
+                raise ValueError("'shape' %r must hold non-negative lengths or None" % (shape,))
+
+        if arrayCheck is not None and not hasattr(arrayCheck, "__call__"):
+            raise ValueError("'arrayCheck' must be callable")
+        if itemCheck is not None and not hasattr(itemCheck, "__call__"):
+            raise ValueError("'itemCheck' must be callable")
+
+        source = getStackFrame()
+        self._setup(
+            doc=doc,
+            dtype=numpy.ndarray,
+            default=default,
+            check=None,
+            optional=optional,
+            source=source,
+            deprecated=deprecated,
+        )
+
+        self.arrayCheck = arrayCheck
+        """Callable used to check the array as a whole.
+        """
+
+        self.itemCheck = itemCheck
+        """Callable used to validate the items of the array when it is set.
+        """
+
+        self.itemtype = dtype
+        """Data type of the items of the array.
+        """
+
+        self.shape = shape
+        """Shape the array must have, with `None` for axes of any length (or
+        `None` to disable checking the array's shape).
+        """
+
+        self._itemDtype = itemDtype
+        self._defaultArray = (None, None)
+
+    def _toArray(self, value):
+        """Convert a value to the array held by this field.
+
+        Parameters
+        ----------
+        value : array-like
+            The value.
+
+        Returns
+        -------
+        array : `numpy.ndarray`
+            A new read-only, C-contiguous array of ``dtype``.
+
+        Raises
+        ------
+        TypeError
+            Raised if the value cannot be cast to ``dtype``.
+        ValueError
+            Raised if items of the value are rejected by ``itemCheck``.
+        """
+        array = numpy.asarray(value)
+        if not numpy.can_cast(array.dtype, self._itemDtype, casting="same_kind"):
+            msg = "Value %s is of incorrect type %s. Expected items of type %s" % (
+                value,
+                array.dtype,
+                _typeStr(self.itemtype),
+            )
+            raise TypeError(msg)
+        array = numpy.array(array, dtype=self._itemDtype, order="C")
+        array.flags.writeable = False
+        if self.itemCheck is not None:
+            valid = numpy.asarray(self.itemCheck(array), dtype=bool)
+            if not valid.all():
+                if valid.ndim:
+                    i = numpy.unravel_index(numpy.flatnonzero(~valid)[0], valid.shape)
+                    msg = "Item at position %s is not a valid value: %s" % (
+                        ", ".join(str(k) for k in i),
+                        array[i],
+                    )
+                else:
+                    msg = "Items are not valid values: %s" % str(array)
+                raise ValueError(msg)
+        return array
+
+    def _getDefaultArray(self):
+        """Return the array for the default value, converting it only once
+        for as long as the default is not replaced.
+        """
+        default, array = self._defaultArray
+        if default is not self.default or array is None:
+            array = self._toArray(self.default)
+            self._defaultArray = (self.default, array)
+        return array
+
+    def __get__(self, instance, owner=None, at=None, label="default"):
+        if instance is None or not isinstance(instance, Config):
+            return self
+        value = instance._storage[self.name]
+        return None if value is None else value.view()
+
+    def __set__(self, instance, value, at=None, label="assignment"):
+        if instance._frozen:
+            raise FieldValidationError(self, instance, "Cannot modify a frozen Config")
+
+        if value is not None:
+            try:
+                if value is self.default:
+                    value = self._getDefaultArray()
+                else:
+                    value = self._toArray(value)
+            except (TypeError, ValueError) as e:
+                raise FieldValidationError(self, instance, str(e))
+        if at is None:
+            at = instance._getCallStack()
+        self._store(instance, value, at, label)
+
+    def _store(self, instance, value, at, label):
+        """Store an array that is never modified, or `None`."""
+        instance._storage[self.name] = value
+        # The array is never modified, so the history can hold it as is.
+        instance._recordHistory(self.name, value, at, label)
+
+    def validate(self, instance):
+        """Validate the field.
+
+        Parameters
+        ----------
+        instance : `lsst.pex.config.Config`
+            The config instance that contains this field.
+
+        Raises
+        ------
+        lsst.pex.config.FieldValidationError
+            Raised if:
+
+            - The field is not optional, but the value is `None`.
+            - The array does not have the required `shape`.
+            - The `arrayCheck` callable returns `False`.
+
+        Notes
+        -----
+        Item checks (`itemCheck`) are applied when the array is set and are
+        not re-checked by this method.
+        """
+        validator = self._makeValidator()
+        if validator is not None:
+            validator(instance)
+
+    def _makeValidator(self):
+        optional = self.optional
+        shape = self.shape
+        arrayCheck = self.arrayCheck
+        if optional and shape is None and arrayCheck is None:
+            return None
+
+        def validator(instance):
+            value = instance._storage[self.name]
+            if value is None:
+                if not optional:
+                    raise FieldValidationError(self, instance, "Required value cannot be None")
+                return
+            if shape is not None and (
+                value.ndim != len(shape)
+                or any(n is not None and n != m for n, m in zip(shape, value.shape))
+            ):
+                msg = "Required array shape=%s, got shape=%s" % (shape, value.shape)
+                raise FieldValidationError(self, instance, msg)
+            if arrayCheck is not None and not arrayCheck(value.view()):
+                msg = "%s is not a valid value" % str(value)
+                raise FieldValidationError(self, instance, msg)
+
+        return validator
+
+    def _equal(self, value1, value2):
+        if value1 is None or value2 is None:
+            return value1 is value2
+        return numpy.array_equal(value1, value2, equal_nan=value1.dtype.kind in "fc")
+
+    def _hash(self, value):
+        if value is None:
+            return hash(None)
+        # The data is hashed in a canonical dtype, with the items that
+        # compare equal despite differing bytes (signed zeros and NaNs)
+        # made identical.
+        value = value.astype(_HASH_DTYPES[value.dtype.kind])
+        if value.dtype.kind in "fc":
+            value = numpy.where(numpy.isnan(value), numpy.nan, value + 0)
+        return hash((value.shape, value.tobytes()))
+
+    def _isDeprecatedDefault(self, value):
+        if not self.deprecated:
+            return False
+        if self.default is None:
+            return value is None
+        return _sameArrays(value, self._getDefaultArray())
+
+    def _save(self, outfile, instance, fullname, imports, reference=None, skipDocs=False):
+        value = instance._storage[self.name]
+        if self._isDeprecatedDefault(value):
+            return
+        if reference is not None and _sameArrays(value, reference._storage[self.name]):
+            return
+
+        if value is None:
+            literal = "None"
+        elif (
+            (value.size or value.ndim == 1)
+            and value.size <= _MAX_LITERAL_SIZE
+            and (value.dtype.kind not in "fc" or numpy.isfinite(value).all())
+        ):
+            literal = repr(value.tolist())
+        else:
+            imports.update(("base64", "numpy"))
+            literal = "numpy.frombuffer(base64.b64decode(%r), dtype=%r).reshape(%r)" % (
+                base64.b64encode(value.tobytes()).decode(),
+                value.dtype.str,
+                value.shape,
+            )
+        line = "{}={}\n".format(fullname, literal)
+        if skipDocs:
+            outfile.write(line)
+        else:
+            doc = "# " + str(self.doc).replace("\n", "\n# ")
+            outfile.write("{}\n{}\n".format(doc, line))
+
+    def _updateFingerprint(self, instance, hash_):
+        value = instance._storage[self.name]
+        if value is None:
+            hash_.update("{}=None\n".format(self.name).encode())
+        else:
+            hash_.update("{}={}{}:".format(self.name, value.dtype.str, value.shape).encode())
+            hash_.update(value)
+            hash_.update(b"\n")
+
+    def _diff(self, instance1, instance2, fullname, steps, differences):
+        a1 = instance1._storage[self.name]
+        a2 = instance2._storage[self.name]
+        if not _sameArrays(a1, a2):
+            old = self.__get__(instance1)
+            new = self.__get__(instance2)
+            differences.append(ConfigDifference(fullname, old, new, "value", (steps, self.name, None)))
+
+    def _iterNames(self, instance, fullname):
+        if not self._isDeprecatedDefault(instance._storage[self.name]):
+            yield fullname, self.__get__(instance)
+
+    def _getState(self, instance):
+        value = instance._storage[self.name]
+        if value is None:
+            return None
+        return (value.dtype.str, value.shape, value.tobytes())
+
+    def _setState(self, instance, state, at):
+        if state is None:
+            self.__set__(instance, None, at=at)
+            return
+        dtype, shape, data = state
+        # The state is valid already, and the bytes it holds cannot change,
+        # so they are used without copying or checking them.
+        self._store(instance, numpy.frombuffer(data, dtype=dtype).reshape(shape), at, "assignment")
+
+    def _gatherComparison(self, instance1, instance2, comparison):
+        a1 = instance1._storage[self.name]
+        a2 = instance2._storage[self.name]
+        name = getComparisonName(
+            _joinNamePath(instance1._name, self.name), _joinNamePath(instance2._name, self.name)
+        )
+        if not comparison.compareScalars("isnone for %s" % name, a1 is None, a2 is None):
+            return
+        if a1 is None and a2 is None:
+            return
+        if not comparison.compareScalars("shape for %s" % name, a1.shape, a2.shape):
+            return
+        comparison.compareArrays(name, a1, a2)
@@ -25,10 +25,20 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
-__all__ = ["getCallerFrame", "getStackFrame", "StackFrame", "getCallStack"]
-
+__all__ = [
+    "getCallerFrame",
+    "getStackFrame",
+    "StackFrame",
+    "getCallStack",
+    "LazyCallStack",
+    "getLazyCallStack",
+]
+
+import collections.abc
 import inspect
 import linecache
+import sys
+import weakref
 
 
 def getCallerFrame(relative=0):
@@ -195,3 +205,170 @@ def getCallStack(skip=0):
         stack.append(StackFrame.fromFrame(frame))
         frame = frame.f_back
     return list(reversed(stack))
+
+
+class _StackNode:
+    """A node of the process-wide tree of interned call stacks.
+
+    Parameters
+    ----------
+    parent : `_StackNode` or `None`
+        Node for the calling frame, or `None` for the root.
+    code : `types.CodeType` or `None`
+        Code object being executed in this frame.
+    lineno : `int` or `None`
+        Line number being executed in this frame.
+
+    Notes
+    -----
+    A node keeps its parent alive, while a parent only refers weakly to its
+    children, so that the tree holds exactly the stacks that are still
+    referenced by some `LazyCallStack`. Each node builds its `StackFrame` at
+    most once, so frames are shared by every stack passing through the node.
+    """
+
+    __slots__ = ("parent", "code", "lineno", "depth", "children", "_frame", "__weakref__")
+
+    def __init__(self, parent, code, lineno):
+        self.parent = parent
+        self.code = code
+        self.lineno = lineno
+        self.depth = 0 if parent is None else parent.depth + 1
+        self.children = weakref.WeakValueDictionary()
+        self._frame = None
+
+    def child(self, code, lineno):
+        """Return the interned node for a frame called from this one."""
+        key = (code, lineno)
+        node = self.children.get(key)
+        if node is None:
+            node = _StackNode(self, code, lineno)
+            self.children[key] = node
+        return node
+
+    @property
+    def frame(self):
+        """The `StackFrame` for this node (built on demand)."""
+        if self._frame is None:
+            self._frame = StackFrame(self.code.co_filename, self.lineno, self.code.co_name)
+        return self._frame
+
+
+_STACK_ROOT = _StackNode(None, None, None)
+"""Root of the tree of interned call stacks; it has no frame of its own."""
+
+
+class LazyCallStack(collections.abc.Sequence):
+    """A call stack that defers building `StackFrame` objects until read.
+
+    Parameters
+    ----------
+    leaf : `_StackNode`
+        Interned node for the most recent captured frame.
+    head : `tuple` of `StackFrame`, optional
+        Frames that precede the captured frames.
+    tail : `tuple` of `StackFrame`, optional
+        Frames that follow the captured frames.
+
+    Notes
+    -----
+    Capturing a `LazyCallStack` only interns the code object and line number
+    of each frame in a tree shared by every stack in the process, so stacks
+    with a common prefix (the driver script, config loading, and so on)
+    store it only once. The filename stripping and source lookups done by
+    `StackFrame` happen the first time a frame is read. Otherwise this
+    behaves like the read-only `list` of `StackFrame` returned by
+    `getCallStack`, including concatenation with lists of `StackFrame`.
+
+    See also
+    --------
+    getLazyCallStack
+    """
+
+    __slots__ = ("_leaf", "_head", "_tail", "_frames")
+
+    def __init__(self, leaf, head=(), tail=()):
+        self._leaf = leaf
+        self._head = head
+        self._tail = tail
+        self._frames = None
+
+    def _materialize(self):
+        # Built once per stack, on first read; it must not be modified.
+        if self._frames is None:
+            frames = []
+            node = self._leaf
+            while node.parent is not None:
+                frames.append(node.frame)
+                node = node.parent
+            frames.reverse()
+            self._frames = list(self._head) + frames + list(self._tail)
+        return self._frames
+
+    def __len__(self):
+        return len(self._head) + self._leaf.depth + len(self._tail)
+
+    def __getitem__(self, i):
+        return self._materialize()[i]
+
+    def __iter__(self):
+        return iter(self._materialize())
+
+    def __add__(self, other):
+        if not isinstance(other, (list, tuple, LazyCallStack)):
+            return NotImplemented
+        return LazyCallStack(self._leaf, self._head, self._tail + tuple(other))
+
+    def __radd__(self, other):
+        if not isinstance(other, (list, tuple)):
+            return NotImplemented
+        return LazyCallStack(self._leaf, tuple(other) + self._head, self._tail)
+
+    def __eq__(self, other):
+        if isinstance(other, (list, tuple, LazyCallStack)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return repr(self._materialize())
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        # Stacks are immutable, and copying would detach them from the tree.
+        return self
+
+
+def getLazyCallStack(skip=0):
+    """Retrieve the call stack for the caller without building `StackFrame`
+    objects.
+
+    Parameters
+    ----------
+    skip : `int`, non-negative
+        Number of stack frames above caller to skip.
+
+    Returns
+    -------
+    output : `LazyCallStack`
+        The call stack, ordered with the most recent frame last.
+
+    Notes
+    -----
+    This function is excluded from the call stack. It is the capture mode
+    used for config history, where most stacks are never read.
+    """
+    try:
+        frame = sys._getframe(skip + 2)
+    except ValueError:
+        # Called from the top level; there is no caller to record.
+        frame = None
+    raw = []
+    while frame:
+        raw.append((frame.f_code, frame.f_lineno))
+        frame = frame.f_back
+    node = _STACK_ROOT
+    for code, lineno in reversed(raw):
+        node = node.child(code, lineno)
+    return LazyCallStack(node)
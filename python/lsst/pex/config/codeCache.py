@@ -0,0 +1,278 @@
+# This file is part of pex_config.
+#
+# Developed for the LSST Data Management System.
+# This product includes software developed by the LSST Project
+# (http://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This software is dual licensed under the GNU General Public License and also
+# under a 3-clause BSD license. Recipients may choose which of these licenses
+# to use; please see the files gpl-3.0.txt and/or bsd_license.txt,
+# respectively.  If you choose the GPL option then the following text applies
+# (but note that there is still no warranty even if you opt for BSD instead):
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+__all__ = ("CodeCache", "getDefaultCodeCache")
+
+import collections
+import hashlib
+import importlib.util
+import marshal
+import os
+import struct
+import sys
+import tempfile
+import threading
+
+from .declarative import DeclarativeOverride, compileOverride
+
+_HEADER = struct.Struct("<4sqq32s")
+"""Layout of the header of an on-disk cache file: the interpreter's magic
+number, then the source's modification time (ns), size and SHA-256 digest.
+"""
+
+_OPTIMIZATION_TAG = "pexconfig"
+"""Tag distinguishing cached config files from the interpreter's own
+bytecode files in ``__pycache__``.
+"""
+
+
+class CodeCache:
+    """Cache of compiled config override code.
+
+    Overrides are compiled by `~lsst.pex.config.declarative.compileOverride`,
+    so the cache holds `~lsst.pex.config.declarative.DeclarativeOverride`
+    objects for declarative overrides and code objects for the others.
+
+    Parameters
+    ----------
+    maxSize : `int`, optional
+        Maximum number of code objects kept in memory; the least recently
+        used ones are dropped first.
+    enabled : `bool`, optional
+        If `False`, every request compiles its source again.
+    useDisk : `bool`, optional
+        If `True`, code compiled from files is also written next to them,
+        in ``__pycache__`` like the interpreter's own bytecode, so that other
+        processes can reuse it.
+
+    Notes
+    -----
+    Code compiled from a file is keyed by the file's path, modification time,
+    size and SHA-256 digest, so a cached code object is only used if the
+    file is unchanged. Code compiled from a string is keyed by the file name
+    reported for it and the digest of the string. On-disk files follow
+    `sys.dont_write_bytecode` and `sys.pycache_prefix`; failing to read or
+    write them is not an error.
+
+    See also
+    --------
+    getDefaultCodeCache
+    """
+
+    def __init__(self, maxSize=256, enabled=True, useDisk=True):
+        self.maxSize = maxSize
+        """Maximum number of code objects kept in memory (`int`)."""
+
+        self.enabled = enabled
+        """Whether compiled code is cached at all (`bool`)."""
+
+        self.useDisk = useDisk
+        """Whether code compiled from files is cached on disk (`bool`)."""
+
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = dict.fromkeys(("hits", "diskHits", "misses"), 0)
+
+    def compileFile(self, filename):
+        """Compile a config override file, reusing the code compiled for
+        it before if the file is unchanged.
+
+        Parameters
+        ----------
+        filename : `str`
+            Name of the file.
+
+        Returns
+        -------
+        code : `types.CodeType` or `DeclarativeOverride`
+            The compiled override (see
+            `~lsst.pex.config.declarative.compileOverride`).
+        """
+        with open(filename, "rb") as f:
+            stat = os.fstat(f.fileno())
+            source = f.read()
+        if not self.enabled:
+            return compileOverride(source, filename)
+        digest = hashlib.sha256(source).digest()
+        key = (filename, os.path.abspath(filename), stat.st_mtime_ns, stat.st_size, digest)
+        code = self._lookup(key)
+        if code is not None:
+            return code
+        cacheFile = self._getCacheFile(filename)
+        if cacheFile is not None:
+            code = self._readCacheFile(cacheFile, key)
+            # The file name recorded in the code must match the one given.
+            if code is not None and _getFilename(code) == filename:
+                self._store(key, code, "diskHits")
+                return code
+        code = compileOverride(source, filename)
+        self._store(key, code, "misses")
+        if cacheFile is not None:
+            self._writeCacheFile(cacheFile, key, code)
+        return code
+
+    def compileSource(self, source, filename):
+        """Compile config override code, reusing the code compiled for the
+        same source before.
+
+        Parameters
+        ----------
+        source : `str` or `bytes`
+            The code to compile.
+        filename : `str`
+            Name of the file the code came from, used for error reporting.
+
+        Returns
+        -------
+        code : `types.CodeType` or `DeclarativeOverride`
+            The compiled override (see
+            `~lsst.pex.config.declarative.compileOverride`).
+        """
+        if not self.enabled:
+            return compileOverride(source, filename)
+        data = source.encode() if isinstance(source, str) else source
+        key = (filename, type(source), hashlib.sha256(data).digest())
+        code = self._lookup(key)
+        if code is None:
+            code = compileOverride(source, filename)
+            self._store(key, code, "misses")
+        return code
+
+    def getStats(self):
+        """Return statistics about the use of this cache.
+
+        Returns
+        -------
+        stats : `dict` [`str`, `int`]
+            The number of requests served from memory (``"hits"``), from disk
+            (``"diskHits"``) and by compiling (``"misses"``), and the number
+            of code objects held in memory (``"size"``).
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["size"] = len(self._entries)
+        return stats
+
+    def clear(self):
+        """Forget all code held in memory and reset the statistics.
+
+        On-disk files are left alone; they are checked against their source
+        before being used.
+        """
+        with self._lock:
+            self._entries.clear()
+            for k in self._stats:
+                self._stats[k] = 0
+
+    def _lookup(self, key):
+        with self._lock:
+            code = self._entries.get(key)
+            if code is not None:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+            return code
+
+    def _store(self, key, code, stat):
+        with self._lock:
+            self._stats[stat] += 1
+            self._entries[key] = code
+            while len(self._entries) > self.maxSize:
+                self._entries.popitem(last=False)
+
+    def _getCacheFile(self, filename):
+        if not self.useDisk or sys.dont_write_bytecode:
+            return None
+        try:
+            return importlib.util.cache_from_source(
+                os.path.abspath(filename), optimization=_OPTIMIZATION_TAG
+            )
+        except (NotImplementedError, ValueError):
+            return None
+
+    @staticmethod
+    def _readCacheFile(cacheFile, key):
+        try:
+            with open(cacheFile, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        if len(data) < _HEADER.size:
+            return None
+        if _HEADER.unpack_from(data) != (importlib.util.MAGIC_NUMBER,) + key[2:]:
+            return None
+        try:
+            code = marshal.loads(data[_HEADER.size :])
+        except (EOFError, ValueError, TypeError):
+            return None
+        if isinstance(code, tuple):
+            code = DeclarativeOverride(*code)
+        return code
+
+    @staticmethod
+    def _writeCacheFile(cacheFile, key, code):
+        if isinstance(code, DeclarativeOverride):
+            code = (code.operations, code.source, code.filename)
+        data = _HEADER.pack(importlib.util.MAGIC_NUMBER, *key[2:]) + marshal.dumps(code)
+        directory = os.path.dirname(cacheFile)
+        tempName = None
+        try:
+            os.makedirs(directory, exist_ok=True)
+            with tempfile.NamedTemporaryFile(mode="wb", delete=False, dir=directory) as outfile:
+                tempName = outfile.name
+                outfile.write(data)
+            # Replace atomically so that readers never see a partial file.
+            os.replace(tempName, cacheFile)
+        except OSError:
+            if tempName is not None:
+                try:
+                    os.unlink(tempName)
+                except OSError:
+                    pass
+
+
+def _getFilename(code):
+    """Return the file name a compiled override was compiled for."""
+    if isinstance(code, DeclarativeOverride):
+        return code.filename
+    return code.co_filename
+
+
+_defaultCodeCache = CodeCache(enabled=os.environ.get("PEX_CONFIG_CODE_CACHE", "1") != "0")
+
+
+def getDefaultCodeCache():
+    """Return the cache used by `lsst.pex.config.Config.load` and
+    `lsst.pex.config.Config.loadFromStream`.
+
+    Returns
+    -------
+    cache : `CodeCache`
+        The process-wide cache. It is disabled if the environment variable
+        ``PEX_CONFIG_CODE_CACHE`` is ``0`` at import time; set its
+        ``enabled`` attribute to change that later.
+    """
+    return _defaultCodeCache
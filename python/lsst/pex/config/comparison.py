@@ -32,7 +32,17 @@ or `lsst.pex.config.Field._compare` implementation, as they take care of
 writing messages as well as floating-point comparisons and shortcuts.
 """
 
-__all__ = ("getComparisonName", "compareScalars", "compareConfigs")
+__all__ = (
+    "getComparisonName",
+    "compareScalars",
+    "compareConfigs",
+    "groupConfigs",
+    "ConfigDifference",
+    "ConfigGroup",
+)
+
+import collections.abc
+import weakref
 
 import numpy
 
@@ -144,33 +154,495 @@ def compareConfigs(name, c1, c2, shortcut=True, rtol=1e-8, atol=1e-8, output=Non
 
     Notes
     -----
-    Floating point comparisons are performed by `numpy.allclose`.
+    Floating point comparisons are performed like `numpy.allclose`, but all
+    the floating-point values in the two configs, including those in lists
+    and dicts, are compared with a single call to `numpy.isclose`.
 
     If ``c1`` or ``c2`` contain `~lsst.pex.config.RegistryField` or
     `~lsst.pex.config.ConfigChoiceField` instances, *unselected*
     `~lsst.pex.config.Config` instances will not be compared.
     """
     assert name is not None
-    if c1 is None:
-        if c2 is None:
-            return True
+    comparison = _Comparison(shortcut, rtol, atol)
+    return comparison.run(comparison.compareConfigs, name, c1, c2, output=output)
+
+
+def groupConfigs(configs, rtol=1e-8, atol=1e-8):
+    """Partition configs into groups of equal configs.
+
+    Parameters
+    ----------
+    configs : iterable of `lsst.pex.config.Config`
+        The configs to group.
+    rtol : `float`, optional
+        Relative tolerance for floating point comparisons.
+    atol : `float`, optional
+        Absolute tolerance for floating point comparisons.
+
+    Returns
+    -------
+    groups : `list` [`ConfigGroup`]
+        The groups, in the order of their first member. Every config is in
+        exactly one group.
+
+    See also
+    --------
+    lsst.pex.config.compareConfigs
+
+    Notes
+    -----
+    Configs are equal if `compareConfigs` finds them equal, so unselected
+    configs of `~lsst.pex.config.RegistryField` and
+    `~lsst.pex.config.ConfigChoiceField` fields do not matter. Each config is
+    compared with the representative (first member) of the existing groups,
+    and joins the first one it is equal to. As floating-point comparisons
+    are not transitive, members of a group are only known to be equal to its
+    representative.
+
+    Only a few configs are actually compared: configs with the same
+    `~lsst.pex.config.Config.fingerprint` join the same group right away,
+    and the others are only compared with groups whose representative has
+    the same structure, that is the same values for everything but
+    floating-point values.
+    """
+    groups = []
+    byFingerprint = {}
+    byStructure = {}
+    for index, config in enumerate(configs):
+        fingerprint = config.fingerprint()
+        group = byFingerprint.get(fingerprint)
+        if group is None:
+            candidates = byStructure.setdefault(_StructuralKey.compute(config), [])
+            for candidate in candidates:
+                comparison = _Comparison(True, rtol, atol)
+                if comparison.run(comparison.compareConfigs, "config", candidate.representative, config):
+                    group = candidate
+                    break
+            else:
+                group = ConfigGroup(config)
+                groups.append(group)
+                candidates.append(group)
+            byFingerprint[fingerprint] = group
+        group.members.append(config)
+        group.indices.append(index)
+    return groups
+
+
+class ConfigGroup:
+    """A group of equal configs, as found by `groupConfigs`.
+
+    Parameters
+    ----------
+    representative : `lsst.pex.config.Config`
+        The config the members of the group were compared with.
+    """
+
+    __slots__ = ("representative", "members", "indices")
+
+    def __init__(self, representative):
+        self.representative = representative
+        """The first member of the group (`lsst.pex.config.Config`)."""
+
+        self.members = []
+        """All the members of the group, in the order they were given,
+        starting with the representative (`list` [`lsst.pex.config.Config`]).
+        """
+
+        self.indices = []
+        """The positions of the members among the configs given to
+        `groupConfigs` (`list` [`int`]).
+        """
+
+    def __len__(self):
+        return len(self.members)
+
+    def __repr__(self):
+        return "ConfigGroup(%s, indices=%r)" % (type(self.representative).__name__, self.indices)
+
+
+class ConfigDifference:
+    """A difference between two configs, as found by
+    `lsst.pex.config.Config.diff`.
+
+    Parameters
+    ----------
+    path : `str`
+        Name of the field (or item of a field) that differs, relative to the
+        configs that were compared, as in `lsst.pex.config.Config.names`.
+    old : object
+        Value in the config `~lsst.pex.config.Config.diff` was called on.
+    new : object
+        Value in the other config.
+    kind : `str`
+        What differs:
+
+        ``"value"``
+            The value of a field; lists and dicts are given as copies, and
+            the values of a `~lsst.pex.config.ConfigDictField` as dicts of
+            configs (or `None`).
+        ``"selection"``
+            The selection of a `~lsst.pex.config.ConfigChoiceField`: a name,
+            or a sorted list of names for multi-selection fields.
+        ``"retarget"``
+            The target of a `~lsst.pex.config.ConfigurableField`, given as a
+            ``(target, ConfigClass)`` tuple.
+        ``"add"``, ``"remove"``
+            An item of a `~lsst.pex.config.ConfigDictField` only present in
+            the other config, or only in this one; the missing side is
+            `None`.
+    location : `tuple`, optional
+        Where the difference is, for `~lsst.pex.config.Config.applyDiff`
+        (for internal use only). Differences without one cannot be applied.
+    """
+
+    __slots__ = ("path", "old", "new", "kind", "_location")
+
+    def __init__(self, path, old, new, kind, location=None):
+        self.path = path
+        self.old = old
+        self.new = new
+        self.kind = kind
+        self._location = location
+
+    def __eq__(self, other):
+        if not isinstance(other, ConfigDifference):
+            return NotImplemented
+        return (self.path, self.old, self.new, self.kind) == (other.path, other.old, other.new, other.kind)
+
+    def __repr__(self):
+        return "ConfigDifference(%r, %r, %r, %r)" % (self.path, self.old, self.new, self.kind)
+
+
+class _ShortcutStop(Exception):
+    """Raised to stop gathering a shortcut comparison at the first
+    difference known without comparing floating-point values.
+    """
+
+
+class _Comparison:
+    """Comparison of two config trees in which all floating-point values are
+    compared at once (for internal use only).
+
+    Fields add their values to the comparison through
+    ``Field._gatherComparison``. Everything but floating-point values is
+    compared right away, as are arrays; floating-point values, including the
+    contents of lists and dicts, are gathered and compared with a single call
+    to `numpy.isclose` by `run`, which then reports the differences in the
+    order a field-by-field comparison would have found them.
+
+    Parameters
+    ----------
+    shortcut : `bool`
+        If `True`, stop at the first difference.
+    rtol : `float`
+        Relative tolerance for floating point comparisons.
+    atol : `float`
+        Absolute tolerance for floating point comparisons.
+    """
+
+    _INDEX = object()
+    """Marker for gathered sequences, whose items are named by index."""
+
+    def __init__(self, shortcut, rtol, atol):
+        self.shortcut = shortcut
+        self.rtol = rtol
+        self.atol = atol
+        # Differences in the order they are found: either a list of messages,
+        # or a block of gathered values given as (start, stop, name, keys).
+        self._events = []
+        self._values1 = []
+        self._values2 = []
+        self._complex = False
+
+    def run(self, gather, *args, output=None):
+        """Gather a comparison and report its result.
+
+        Parameters
+        ----------
+        gather : callable
+            Called with ``args`` to gather the comparison, e.g.
+            `compareConfigs`.
+        *args
+            Arguments for ``gather``.
+        output : callable, optional
+            A callable that takes a string, used (possibly repeatedly) to
+            report inequalities.
+
+        Returns
+        -------
+        areEqual : `bool`
+            `True` if no difference was found.
+        """
+        try:
+            gather(*args)
+        except _ShortcutStop:
+            pass
+        if self._values1:
+            dtype = complex if self._complex else float
+            close = numpy.isclose(
+                numpy.array(self._values1, dtype=dtype),
+                numpy.array(self._values2, dtype=dtype),
+                rtol=self.rtol,
+                atol=self.atol,
+                equal_nan=True,
+            )
+            differences = numpy.flatnonzero(~close).tolist()
         else:
+            differences = []
+        equal = True
+        nextDifference = 0
+        for event in self._events:
+            if type(event) is list:
+                messages = event
+            else:
+                start, stop, name, keys = event
+                if nextDifference == len(differences) or differences[nextDifference] >= stop:
+                    continue
+                messages = []
+                while nextDifference < len(differences) and differences[nextDifference] < stop:
+                    i = differences[nextDifference]
+                    nextDifference += 1
+                    if keys is None:
+                        itemName = name
+                    elif keys is self._INDEX:
+                        itemName = "%s[%d]" % (name, i - start)
+                    else:
+                        itemName = "%s[%r]" % (name, keys[i - start])
+                    v1, v2 = self._values1[i], self._values2[i]
+                    messages.append("Inequality in %s: %r != %r" % (itemName, v1, v2))
+                    if self.shortcut:
+                        break
+            equal = False
             if output is not None:
-                output("LHS is None for %s" % name)
-            return False
-    else:
-        if c2 is None:
-            if output is not None:
-                output("RHS is None for %s" % name)
-            return False
-    if type(c1) != type(c2):
-        if output is not None:
-            output("Config types do not match for %s: %s != %s" % (name, type(c1), type(c2)))
+                for message in messages:
+                    output(message)
+            if self.shortcut:
+                break
+        return equal
+
+    def fail(self, *messages):
+        """Record a difference.
+
+        Parameters
+        ----------
+        *messages : `str`
+            Messages reporting the difference.
+        """
+        self._events.append(list(messages))
+        if self.shortcut:
+            raise _ShortcutStop()
+
+    def compareScalars(self, name, v1, v2, dtype=None):
+        """Compare two scalar values, like `compareScalars`.
+
+        Returns
+        -------
+        areEqual : `bool`
+            `False` if the values are known to differ; floating-point values
+            are only compared by `run`.
+        """
+        if dtype in (float, complex) and v1 is not None and v2 is not None:
+            self._gather(name, None, (v1,), (v2,), dtype)
+            return True
+        if v1 == v2:
+            return True
+        self.fail("Inequality in %s: %r != %r" % (name, v1, v2))
         return False
-    equal = True
-    for field in c1._fields.values():
-        result = field._compare(c1, c2, shortcut=shortcut, rtol=rtol, atol=atol, output=output)
-        if not result and shortcut:
-            return False
-        equal = equal and result
-    return equal
+
+    def compareSequences(self, name, l1, l2, dtype):
+        """Compare the items of two sequences of the same length, named
+        ``name[index]``.
+        """
+        if dtype in (float, complex):
+            if None not in l1 and None not in l2:
+                self._gather(name, self._INDEX, l1, l2, dtype)
+                return
+        elif list(l1) == list(l2):
+            return
+        for n, v1, v2 in zip(range(len(l1)), l1, l2):
+            self.compareScalars("%s[%d]" % (name, n), v1, v2, dtype)
+
+    def compareMappings(self, name, d1, d2, dtype):
+        """Compare the items of two mappings with the same keys, named
+        ``name[key]``.
+        """
+        keys = list(d1.keys())
+        values1 = [d1[k] for k in keys]
+        values2 = [d2[k] for k in keys]
+        if dtype in (float, complex):
+            if None not in values1 and None not in values2:
+                self._gather(name, keys, values1, values2, dtype)
+                return
+        elif values1 == values2:
+            return
+        for k, v1, v2 in zip(keys, values1, values2):
+            self.compareScalars("%s[%r]" % (name, k), v1, v2, dtype)
+
+    def compareArrays(self, name, a1, a2):
+        """Compare the items of two `numpy.ndarray` objects of the same
+        shape, named ``name[index]``.
+
+        Floating-point arrays are compared with a single call to
+        `numpy.isclose` each, rather than being gathered with the other
+        values.
+        """
+        if a1.dtype.kind in "fc" or a2.dtype.kind in "fc":
+            same = numpy.isclose(a1, a2, rtol=self.rtol, atol=self.atol, equal_nan=True)
+        else:
+            same = a1 == a2
+        differences = numpy.flatnonzero(~same)
+        if not len(differences):
+            return
+        if self.shortcut:
+            differences = differences[:1]
+        self.fail(
+            *(
+                "Inequality in %s[%s]: %r != %r"
+                % (
+                    name,
+                    ", ".join(str(k) for k in numpy.unravel_index(i, a1.shape)),
+                    a1.flat[i].item(),
+                    a2.flat[i].item(),
+                )
+                for i in differences
+            )
+        )
+
+    def compareConfigs(self, name, c1, c2):
+        """Compare two configs, like `compareConfigs`."""
+        if c1 is c2:
+            # Shared subconfigs, such as unbuilt defaults, are equal.
+            return
+        if c1 is None:
+            if c2 is not None:
+                self.fail("LHS is None for %s" % name)
+            return
+        if c2 is None:
+            self.fail("RHS is None for %s" % name)
+            return
+        if type(c1) is not type(c2):
+            self.fail("Config types do not match for %s: %s != %s" % (name, type(c1), type(c2)))
+            return
+        for field in c1._fields.values():
+            if _overridesCompare(type(field)):
+                messages = []
+                result = field._compare(
+                    c1, c2, shortcut=self.shortcut, rtol=self.rtol, atol=self.atol, output=messages.append
+                )
+                if not result:
+                    self.fail(*messages)
+            else:
+                field._gatherComparison(c1, c2, self)
+
+    def _gather(self, name, keys, values1, values2, dtype):
+        start = len(self._values1)
+        self._values1.extend(values1)
+        self._values2.extend(values2)
+        self._events.append((start, len(self._values1), name, keys))
+        if dtype is complex:
+            self._complex = True
+
+
+class _StructuralKey(_Comparison):
+    """Key of a config that is the same for all the configs
+    `compareConfigs` finds equal, whatever the tolerances (for internal use
+    only).
+
+    The key is gathered like a comparison of the config with itself, and
+    holds every value compared, except floating-point values which are only
+    represented by their position.
+    """
+
+    _FLOAT = object()
+    """Stand-in for floating-point values."""
+
+    def __init__(self):
+        super().__init__(False, 0.0, 0.0)
+        self._key = []
+
+    @classmethod
+    def compute(cls, config):
+        """Return the key of a config.
+
+        Parameters
+        ----------
+        config : `lsst.pex.config.Config`
+            The config.
+
+        Returns
+        -------
+        key : `tuple`
+            The key; it is hashable, and keys of configs that are equal
+            compare equal.
+        """
+        walker = cls()
+        walker.compareConfigs(None, config, config)
+        return tuple(walker._key)
+
+    def _token(self, value, dtype):
+        """Return the hashable part of the key standing for a value."""
+        if dtype in (float, complex) and value is not None:
+            return self._FLOAT
+        if isinstance(value, collections.abc.Set):
+            value = frozenset(value)
+        elif isinstance(value, list):
+            value = tuple(value)
+        try:
+            hash(value)
+        except TypeError:
+            value = repr(value)
+        return value
+
+    def fail(self, *messages):
+        # A config cannot differ from itself.
+        pass
+
+    def compareScalars(self, name, v1, v2, dtype=None):
+        self._key.append(self._token(v1, dtype))
+        return True
+
+    def compareSequences(self, name, l1, l2, dtype):
+        self._key.append(tuple(self._token(v, dtype) for v in l1))
+
+    def compareMappings(self, name, d1, d2, dtype):
+        self._key.append(frozenset((k, self._token(v, dtype)) for k, v in d1.items()))
+
+    def compareArrays(self, name, a1, a2):
+        if a1.dtype.kind in "fc":
+            self._key.append(self._FLOAT)
+        else:
+            self._key.append(a1.tobytes())
+
+    def compareConfigs(self, name, c1, c2):
+        if c1 is None:
+            self._key.append(None)
+            return
+        self._key.append(type(c1))
+        for field in c1._fields.values():
+            if _overridesCompare(type(field)):
+                # Nothing is known about how this field compares.
+                self._key.append(field.name)
+            else:
+                field._gatherComparison(c1, c1, self)
+
+
+_compareOverrides = weakref.WeakKeyDictionary()
+
+
+def _overridesCompare(fieldType):
+    """Return whether a field type customizes ``_compare`` without
+    customizing ``_gatherComparison`` to match.
+    """
+    try:
+        return _compareOverrides[fieldType]
+    except KeyError:
+        pass
+
+    def owner(attr):
+        return next(base for base in fieldType.__mro__ if attr in base.__dict__)
+
+    compareOwner = owner("_compare")
+    gatherOwner = owner("_gatherComparison")
+    result = compareOwner is not gatherOwner and issubclass(compareOwner, gatherOwner)
+    _compareOverrides[fieldType] = result
+    return result
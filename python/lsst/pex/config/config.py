@@ -33,18 +33,29 @@ __all__ = (
     "FieldValidationError",
     "UnexpectedProxyUsageError",
     "FieldTypeVar",
+    "deferredValidation",
 )
 
+import abc
+import collections
+import collections.abc
+import contextlib
 import copy
+import functools
+import hashlib
 import importlib
 import io
+import itertools
+import logging
 import math
 import os
 import re
 import shutil
 import sys
 import tempfile
+import threading
 import warnings
+import weakref
 from typing import Any, ForwardRef, Generic, Mapping, Optional, TypeVar, Union, cast, overload
 
 try:
@@ -60,8 +71,10 @@ try:
 except ImportError:
     yaml = None
 
-from .callStack import getCallStack, getStackFrame
-from .comparison import compareConfigs, compareScalars, getComparisonName
+from .callStack import getLazyCallStack, getStackFrame
+from .codeCache import getDefaultCodeCache
+from .comparison import ConfigDifference, _Comparison, compareConfigs, getComparisonName
+from .declarative import DeclarativeOverride
 
 if yaml:
     YamlLoaders: tuple[Any, ...] = (yaml.Loader, yaml.FullLoader, yaml.SafeLoader, yaml.UnsafeLoader)
@@ -106,6 +119,8 @@ class _PexConfigGenericAlias(GenericAlias, **genericAliasKwds):
 
 FieldTypeVar = TypeVar("FieldTypeVar")
 
+_LOG = logging.getLogger(__name__)
+
 
 class UnexpectedProxyUsageError(TypeError):
     """Exception raised when a proxy class is used in a context that suggests
@@ -128,6 +143,215 @@ def _joinNamePath(prefix=None, name=None, index=None):
         return name
 
 
+def _checkHistoryLimit(limit):
+    """Check that a history limit is `None` or a non-negative `int`."""
+    if limit is not None and (not isinstance(limit, int) or isinstance(limit, bool) or limit < 0):
+        raise ValueError("History limit must be None or a non-negative integer, not %r" % (limit,))
+    return limit
+
+
+_HISTORY_SNAPSHOT_INTERVAL = 64
+"""Number of history entries of a container field between full copies of its
+value; the entries in between only record the change that was made.
+"""
+
+
+_fieldChanges = itertools.count(1)
+_fieldGeneration = 0
+"""Number replaced whenever an attribute of any field is set, so that the
+validators made from the attributes of fields are made again.
+"""
+
+_validationState = threading.local()
+"""Per-thread state of `Config.validate`; ``full`` is set while a full
+validation is in progress, so that it reaches all subconfigs.
+"""
+
+_deferredValidationState = threading.local()
+"""Per-thread state of `deferredValidation`; ``pending`` maps
+``(id(config), fieldName)`` to the config, field and call stack of the last
+assignment whose checks were deferred, and the value the field held before
+the first such assignment; ``at`` is the call stack of the assignment being
+checked when the block ends.
+"""
+
+
+def _deferValidation(instance, field, at):
+    """Record an assignment to a field whose checks are to be run when the
+    current `deferredValidation` block ends.
+
+    Parameters
+    ----------
+    instance : `lsst.pex.config.Config`
+        The config the field belongs to.
+    field : `lsst.pex.config.Field`
+        The field that was assigned.
+    at : `list` of `lsst.pex.config.callStack.StackFrame`
+        The call stack of the assignment; if empty (history is disabled),
+        the call stack is captured here.
+
+    Returns
+    -------
+    deferred : `bool`
+        `True` if the checks were deferred, `False` if they must be run now.
+    """
+    pending = getattr(_deferredValidationState, "pending", None)
+    if pending is None:
+        return False
+    if not at:
+        at = getLazyCallStack()
+    key = (id(instance), field.name)
+    entry = pending.get(key)
+    previous = instance._storage.get(field.name) if entry is None else entry[3]
+    pending[key] = (instance, field, at, previous)
+    return True
+
+
+def _checkDeferred(pending):
+    """Run the checks of the assignments deferred by a `deferredValidation`
+    block, setting fields that fail them back to the values they held before
+    the block.
+
+    Parameters
+    ----------
+    pending : `dict`
+        The assignments, as recorded by `_deferValidation`.
+
+    Returns
+    -------
+    error : `Exception` or `None`
+        The first exception other than `FieldValidationError` raised by a
+        check, or else a `FieldValidationError` describing every field that
+        failed its checks, if any.
+    """
+    errors = []
+    for instance, field, at, previous in pending.values():
+        _deferredValidationState.at = at
+        try:
+            field._validateDeferred(instance)
+        except Exception as e:
+            errors.append(e)
+            instance._storage[field.name] = previous
+            instance._recordHistory(field.name, field._getState(instance), at, "restore")
+        finally:
+            del _deferredValidationState.at
+    if not errors:
+        return None
+    for error in errors:
+        if not isinstance(error, FieldValidationError):
+            return error
+    error = errors[0]
+    if len(errors) > 1:
+        messages = "\n\n".join(str(e) for e in errors)
+        error.args = ("%d values failed validation:\n\n%s" % (len(errors), messages),)
+    return error
+
+
+@contextlib.contextmanager
+def _suspendDeferredValidation():
+    """Return a context manager checking assignments at once, even inside a
+    `deferredValidation` block.
+    """
+    pending = getattr(_deferredValidationState, "pending", None)
+    if pending is None:
+        yield
+        return
+    del _deferredValidationState.pending
+    try:
+        yield
+    finally:
+        _deferredValidationState.pending = pending
+
+
+@contextlib.contextmanager
+def deferredValidation():
+    """Return a context manager that defers the checks made when fields of
+    configs are set until the end of the block.
+
+    The type and range checks of fields, and the item checks of list and
+    dict fields, are made once, on the final values, when the block ends
+    without an exception. This saves checking values that are set again
+    later, e.g. when applying large override files.
+
+    Raises
+    ------
+    lsst.pex.config.FieldValidationError
+        Raised when the block ends if values do not pass their checks; the
+        message describes every such value and shows where it was assigned.
+
+    Notes
+    -----
+    Checks are deferred for all the configs set in the current thread during
+    the block. Nested blocks are checked when the outermost one ends. Values
+    are only converted (e.g. `int` to `float`) as they are set, and in-place
+    changes to lists and dicts, as well as field defaults, are still checked
+    at once. `Config.validate` is not called.
+
+    Fields whose values do not pass their checks are set back to the values
+    they held before the block, both when the checks fail and when the block
+    raises an exception; in that case, the exception raised by the block is
+    the one reported.
+
+    Examples
+    --------
+    A value that is out of range in the middle of the block is not reported,
+    since it is replaced by a valid one:
+
+    >>> from lsst.pex.config import Config, RangeField, deferredValidation
+    >>> class DemoConfig(Config):
+    ...     fieldA = RangeField(doc='Field A', dtype=int, default=1, min=0)
+    ...
+    >>> config = DemoConfig()
+    >>> with deferredValidation():
+    ...     config.fieldA = -1
+    ...     config.fieldA = 2
+    ...
+    >>> config.fieldA
+    2
+    """
+    if getattr(_deferredValidationState, "pending", None) is not None:
+        yield
+        return
+    pending = _deferredValidationState.pending = {}
+    try:
+        yield
+    except BaseException:
+        del _deferredValidationState.pending
+        try:
+            _checkDeferred(pending)
+        except Exception:
+            # Only the values are at stake here; report the block's error.
+            pass
+        raise
+    del _deferredValidationState.pending
+    error = _checkDeferred(pending)
+    if error is not None:
+        raise error
+
+
+def _formatAssignmentSite(at):
+    """Format the innermost frame of a call stack outside this package."""
+    packageDir = os.path.dirname(__file__)
+    for frame in reversed(at):
+        # Frame file names may have been shortened by StackFrame.
+        frameDir = os.path.dirname(frame.filename)
+        if not frameDir or (frameDir != packageDir and not packageDir.endswith(os.sep + frameDir)):
+            return frame.format()
+    return at[-1].format()
+
+
+class _HistoryDelta(abc.ABC):
+    """Base class for history entries that record a change to the previous
+    value of a field instead of the full value.
+    """
+
+    __slots__ = ()
+
+    @abc.abstractmethod
+    def apply(self, value):
+        """Return a new value with this change applied to ``value``."""
+
+
 def _autocast(x, dtype):
     """Cast a value to a type, if appropriate.
 
@@ -173,6 +397,36 @@ def _typeStr(x):
         return "%s.%s" % (xtype.__module__, xtype.__name__)
 
 
+def _overridesValidate(fieldType):
+    """Return whether a field type customizes ``validate`` without
+    customizing ``_makeValidator`` to match.
+    """
+
+    def owner(attr):
+        return next(base for base in fieldType.__mro__ if attr in base.__dict__)
+
+    validateOwner = owner("validate")
+    makeValidatorOwner = owner("_makeValidator")
+    return validateOwner is not makeValidatorOwner and issubclass(validateOwner, makeValidatorOwner)
+
+
+@functools.lru_cache(maxsize=None)
+def _overridesSave(fieldType):
+    """Return whether a field type customizes ``save``, and whether it
+    customizes ``_collectImports`` without customizing ``_save`` to match.
+    """
+
+    def owner(attr):
+        return next(base for base in fieldType.__mro__ if attr in base.__dict__)
+
+    saveOwner = owner("_save")
+    collectImportsOwner = owner("_collectImports")
+    return (
+        owner("save") is not Field,
+        collectImportsOwner is not saveOwner and issubclass(collectImportsOwner, saveOwner),
+    )
+
+
 if yaml:
 
     def _yaml_config_representer(dumper, data):
@@ -242,6 +496,11 @@ class ConfigMeta(type):
         if isinstance(value, Field):
             value.name = name
             cls._fields[name] = value
+            cls.__dict__.get("_defaultCache", {}).pop(name, None)
+            if "_defaultPrototype" in cls.__dict__:
+                type.__delattr__(cls, "_defaultPrototype")
+            if "_validators" in cls.__dict__:
+                type.__delattr__(cls, "_validators")
         type.__setattr__(cls, name, value)
 
 
@@ -278,7 +537,7 @@ class FieldValidationError(ValueError):
         (`str`).
         """
 
-        self.history = config.history.setdefault(field.name, [])
+        self.history = config._decodeHistory(field.name)
         """Full history of all changes to the `~lsst.pex.config.Field`
         instance.
         """
@@ -300,6 +559,9 @@ class FieldValidationError(ValueError):
                 self.configSource.format(),
             )
         )
+        at = getattr(_deferredValidationState, "at", None)
+        if at:
+            error += "\nThe value was assigned at:\n%s" % _formatAssignmentSite(at)
         super().__init__(error)
 
 
@@ -472,6 +734,15 @@ class Field(Generic[FieldTypeVar]):
     def __class_getitem__(cls, params: Union[tuple[type, ...], type, ForwardRef]):
         return _PexConfigGenericAlias(cls, params)
 
+    def __setattr__(self, name, value):
+        # Validators capture the attributes of the field they are made from,
+        # so replacing one makes them stale.
+        global _fieldGeneration
+        replaced = name in self.__dict__
+        object.__setattr__(self, name, value)
+        if replaced:
+            _fieldGeneration = next(_fieldChanges)
+
     def __init__(self, doc, dtype=None, default=None, check=None, optional=False, deprecated=None):
         if dtype is None:
             raise ValueError(
@@ -583,6 +854,34 @@ class Field(Generic[FieldTypeVar]):
         if not self.optional and value is None:
             raise FieldValidationError(self, instance, "Required value cannot be None")
 
+    def _makeValidator(self):
+        """Make a function that validates this field (for internal use only).
+
+        Returns
+        -------
+        validator : callable or `None`
+            Function taking the config instance that contains this field, and
+            doing what `validate` does, or `None` if there is nothing to
+            validate.
+
+        Notes
+        -----
+        This is called once per `~lsst.pex.config.Config` class, the first
+        time one of its instances is validated, and again after an attribute
+        of any field is set, so the validator can depend on the field's
+        attributes but not on any instance. Subclasses that
+        override `validate` should override this method to match; otherwise
+        `validate` is used as the validator.
+        """
+        if self.optional:
+            return None
+
+        def validator(instance):
+            if instance._storage[self.name] is None:
+                raise FieldValidationError(self, instance, "Required value cannot be None")
+
+        return validator
+
     def freeze(self, instance):
         """Make this field read-only (for internal use only).
 
@@ -600,6 +899,40 @@ class Field(Generic[FieldTypeVar]):
         """
         pass
 
+    def _setHistoryLimit(self, instance, limit):
+        """Apply a history policy to any subconfigs held by this field (for
+        internal use only).
+
+        Parameters
+        ----------
+        instance : `lsst.pex.config.Config`
+            The config instance that contains this field.
+        limit : `int` or `None`
+            The history limit (see `lsst.pex.config.Config.setHistoryLimit`).
+
+        Notes
+        -----
+        This is only relevant for fields that hold subconfigs, which should
+        call `~lsst.pex.config.Config.setHistoryLimit` on each subconfig.
+        """
+        pass
+
+    def _materialize(self, instance):
+        """Replace any placeholder stored for this field by its real value
+        (for internal use only).
+
+        Parameters
+        ----------
+        instance : `lsst.pex.config.Config`
+            The config instance that contains this field.
+
+        Notes
+        -----
+        This is only relevant for fields that can defer building their value,
+        such as a lazy `~lsst.pex.config.ConfigField`.
+        """
+        pass
+
     def _validateValue(self, value):
         """Validate a value.
 
@@ -664,21 +997,285 @@ class Field(Generic[FieldTypeVar]):
         line is formatted as an assignment: ``{fullname}={value}``.
 
         This output can be executed with Python.
+
+        Subclasses should customize `_save` instead, which is given the name
+        to save the field under. Subclasses that customize this method are
+        still used by `~lsst.pex.config.Config.saveToStream`, which then
+        renames the config while they run and always writes their output,
+        even when only values that differ from the defaults are saved.
+        """
+        self._save(outfile, instance, _joinNamePath(instance._name, self.name), set())
+
+    def _save(self, outfile, instance, fullname, imports, reference=None, skipDocs=False):
+        """Save this field to a file under a given name (for internal use
+        only).
+
+        Parameters
+        ----------
+        outfile : file-like object
+            A writeable field handle.
+        instance : `Config`
+            The `Config` instance that contains this field.
+        fullname : `str`
+            Full name of this field in the saved config.
+        imports : `set` [`str`]
+            Set to add the modules needed to load the output to.
+        reference : `lsst.pex.config.Config`, optional
+            Config of the same type as ``instance`` that the output will be
+            loaded onto. If given, nothing is written if this field's value
+            there is already the same.
+        skipDocs : `bool`, optional
+            If `True`, do not write the documentation as a comment.
+
+        Notes
+        -----
+        This method is invoked by `~lsst.pex.config.Config.saveToStream`,
+        which saves the whole config in a single walk. Fields that hold
+        subconfigs should save them with ``Config._save``, passing names
+        derived from ``fullname``, the same ``imports`` and ``skipDocs``, and
+        the matching subconfig of ``reference``, rather than renaming them.
         """
         value = self.__get__(instance)
-        fullname = _joinNamePath(instance._name, self.name)
 
         if self.deprecated and value == self.default:
             return
 
-        # write full documentation string as comment lines
-        # (i.e. first character is #)
-        doc = "# " + str(self.doc).replace("\n", "\n# ")
+        if reference is not None:
+            # Values are written as their repr, so values with the same repr
+            # load the same.
+            refValue = self.__get__(reference)
+            if value is refValue or repr(value) == repr(refValue):
+                return
+
         if isinstance(value, float) and not math.isfinite(value):
             # non-finite numbers need special care
-            outfile.write("{}\n{}=float('{!r}')\n\n".format(doc, fullname, value))
+            line = "{}=float('{!r}')\n".format(fullname, value)
         else:
-            outfile.write("{}\n{}={!r}\n\n".format(doc, fullname, value))
+            line = "{}={!r}\n".format(fullname, value)
+        if skipDocs:
+            outfile.write(line)
+        else:
+            # write full documentation string as comment lines
+            # (i.e. first character is #)
+            doc = "# " + str(self.doc).replace("\n", "\n# ")
+            outfile.write("{}\n{}\n".format(doc, line))
+
+    def _equal(self, value1, value2):
+        """Return whether two values of this field are equal, as used by
+        `lsst.pex.config.Config.__eq__` (for internal use only).
+
+        Parameters
+        ----------
+        value1, value2 : object
+            Values of this field in two configs.
+
+        Returns
+        -------
+        equal : `bool`
+            `True` if the values are equal; NaNs are equal to each other.
+
+        Notes
+        -----
+        Fields whose values do not compare to a `bool` with ``==`` must
+        override this method.
+        """
+        if isinstance(value1, float) and math.isnan(value1):
+            return isinstance(value2, float) and math.isnan(value2)
+        return value1 == value2
+
+    def _hash(self, value):
+        """Return a hash of a value of this field, as used by
+        `lsst.pex.config.Config.__hash__` (for internal use only).
+
+        Parameters
+        ----------
+        value : object
+            Value of this field in a frozen config.
+
+        Returns
+        -------
+        hash : `int`
+            Hash of the value; values that `_equal` considers equal must
+            have the same hash.
+
+        Notes
+        -----
+        Fields that override `_equal` may need to override this method.
+        """
+        if isinstance(value, float) and math.isnan(value):
+            # NaNs are equal here, but hash(nan) depends on the object.
+            return 0
+        return hash(value)
+
+    def _updateFingerprint(self, instance, hash_):
+        """Add the value of this field to the fingerprint of its config (for
+        internal use only).
+
+        Parameters
+        ----------
+        instance : `lsst.pex.config.Config`
+            The config instance that contains this field.
+        hash_ : `hashlib` hash object
+            The hash being computed; ``update`` it with bytes that identify
+            the value.
+
+        Notes
+        -----
+        The base implementation uses the `repr` of the value. Fields that
+        hold subconfigs should use their fingerprints, obtained through
+        ``instance._getSubconfigFingerprint`` so that changes to them reach
+        ``instance``.
+        """
+        hash_.update("{}={!r}\n".format(self.name, self.__get__(instance)).encode())
+
+    def _diff(self, instance1, instance2, fullname, steps, differences):
+        """Add the differences in this field between two configs to a list
+        (for internal use only).
+
+        Parameters
+        ----------
+        instance1 : `lsst.pex.config.Config`
+            The config `~lsst.pex.config.Config.diff` was called on, or a
+            subconfig of it.
+        instance2 : `lsst.pex.config.Config`
+            The matching config on the other side.
+        fullname : `str`
+            Name of this field relative to the root of the diff.
+        steps : `tuple`
+            ``(fieldName, key)`` pairs leading from the root of the diff to
+            ``instance1``.
+        differences : `list` [`lsst.pex.config.ConfigDifference`]
+            List to add the differences to.
+
+        Notes
+        -----
+        Differences must be created with the location
+        ``(steps, self.name, key)`` so that `_applyDiff` is called for them.
+        The differences for a field must be added together.
+        Fields that hold subconfigs should call ``_diff`` on the pairs of
+        subconfigs, adding ``(self.name, key)`` to ``steps``, and implement
+        `_getDiffSubconfig`.
+        """
+        v1 = self.__get__(instance1)
+        v2 = self.__get__(instance2)
+        # Values are saved as their repr, so values with the same repr are
+        # the same as far as configs are concerned.
+        if v1 is not v2 and repr(v1) != repr(v2):
+            differences.append(ConfigDifference(fullname, v1, v2, "value", (steps, self.name, None)))
+
+    def _getDiffSubconfig(self, instance, key):
+        """Return a subconfig held by this field, for
+        `~lsst.pex.config.Config.applyDiff` (for internal use only).
+        """
+        raise TypeError("Field %s does not hold subconfigs" % self.name)
+
+    def _applyDiff(self, instance, differences, at, label):
+        """Apply the differences found by `_diff` for this field, recording
+        a single history entry (for internal use only).
+
+        Parameters
+        ----------
+        instance : `lsst.pex.config.Config`
+            The config instance that contains this field.
+        differences : `list` [`tuple`]
+            The differences to apply, as pairs of the key given in their
+            location and the `lsst.pex.config.ConfigDifference`.
+        at : `list` of `lsst.pex.config.callStack.StackFrame`
+            The call stack.
+        label : `str`
+            Event label for the history.
+        """
+        self.__set__(instance, differences[-1][1].new, at=at, label=label)
+
+    def _iterNames(self, instance, fullname):
+        """Iterate over the names and values this field contributes to
+        `Config.iterNames` (for internal use only).
+
+        Parameters
+        ----------
+        instance : `lsst.pex.config.Config`
+            The config instance that contains this field.
+        fullname : `str`
+            Full name of this field relative to the config being iterated.
+
+        Yields
+        ------
+        name : `str`
+            Full name of a value.
+        value : `object`
+            The value.
+
+        Notes
+        -----
+        Fields that hold subconfigs should yield the names in those
+        subconfigs, using names derived from ``fullname``.
+        """
+        value = self.__get__(instance)
+        if not (self.deprecated and value == self.default):
+            yield fullname, value
+
+    def _copy(self, instance, other, keepHistory):
+        """Copy the value of this field into a copy of its config (for
+        internal use only).
+
+        Parameters
+        ----------
+        instance : `lsst.pex.config.Config`
+            The config instance that contains this field.
+        other : `lsst.pex.config.Config`
+            The copy of ``instance`` being built.
+        keepHistory : `bool`
+            Whether copies of subconfigs keep their history.
+
+        Notes
+        -----
+        This method is invoked by `lsst.pex.config.Config.copy` and should not
+        be called directly. The value is already valid, so it is neither
+        validated again nor recorded in the history.
+
+        Simple values are shared. Fields that hold proxies or subconfigs must
+        give ``other`` its own copies, bound to ``other``.
+        """
+        if self.name in instance._storage:
+            other._storage[self.name] = instance._storage[self.name]
+
+    def _getState(self, instance):
+        """Get the value of this field in a form that can be pickled (for
+        internal use only).
+
+        Parameters
+        ----------
+        instance : `lsst.pex.config.Config`
+            The config instance that contains this field.
+
+        Returns
+        -------
+        state : object
+            A picklable description of the field's value, built only from
+            built-in types, that `_setState` accepts.
+
+        Notes
+        -----
+        This method is invoked by `lsst.pex.config.Config.__reduce__` and
+        should not be called directly. Fields that hold proxies or subconfigs
+        must override it, together with `_setState`.
+        """
+        return self.__get__(instance)
+
+    def _setState(self, instance, state, at):
+        """Set the value of this field from the output of `_getState` (for
+        internal use only).
+
+        Parameters
+        ----------
+        instance : `lsst.pex.config.Config`
+            The config instance that contains this field.
+        state : object
+            The state returned by `_getState`.
+        at : `list` of `lsst.pex.config.callStack.StackFrame`
+            The call stack.
+        """
+        self.__set__(instance, state, at=at)
 
     def toDict(self, instance):
         """Convert the field value so that it can be set as the value of an
@@ -761,7 +1358,7 @@ class Field(Generic[FieldTypeVar]):
             Value to set on this field.
         at : `list` of `lsst.pex.config.callStack.StackFrame`
             The call stack (created by
-            `lsst.pex.config.callStack.getCallStack`).
+            `lsst.pex.config.callStack.getLazyCallStack`).
         label : `str`, optional
             Event label for the history.
 
@@ -794,19 +1391,45 @@ class Field(Generic[FieldTypeVar]):
         if instance._frozen:
             raise FieldValidationError(self, instance, "Cannot modify a frozen Config")
 
-        history = instance._history.setdefault(self.name, [])
+        if at is None:
+            at = instance._getCallStack()
         if value is not None:
             value = _autocast(value, self.dtype)
+            if not _deferValidation(instance, self, at):
+                try:
+                    self._validateValue(value)
+                except BaseException as e:
+                    raise FieldValidationError(self, instance, str(e))
+
+        instance._storage[self.name] = value
+        instance._recordHistory(self.name, value, at, label)
+
+    def _validateDeferred(self, instance):
+        """Run the checks of an assignment to this field that were deferred
+        by `lsst.pex.config.deferredValidation` (for internal use only).
+
+        Parameters
+        ----------
+        instance : `lsst.pex.config.Config`
+            The config instance that contains this field.
+
+        Raises
+        ------
+        lsst.pex.config.FieldValidationError
+            Raised if the value of the field does not pass the checks made
+            when it is set.
+
+        Notes
+        -----
+        Fields whose ``__set__`` defers checks must implement this method.
+        """
+        value = instance._storage[self.name]
+        if value is not None:
             try:
                 self._validateValue(value)
             except BaseException as e:
                 raise FieldValidationError(self, instance, str(e))
 
-        instance._storage[self.name] = value
-        if at is None:
-            at = getCallStack()
-        history.append((value, at, label))
-
     def __delete__(self, instance, at=None, label="deletion"):
         """Delete an attribute from a `lsst.pex.config.Config` instance.
 
@@ -816,7 +1439,7 @@ class Field(Generic[FieldTypeVar]):
             The config instance that contains this field.
         at : `list` of `lsst.pex.config.callStack.StackFrame`
             The call stack (created by
-            `lsst.pex.config.callStack.getCallStack`).
+            `lsst.pex.config.callStack.getLazyCallStack`).
         label : `str`, optional
             Event label for the history.
 
@@ -826,7 +1449,7 @@ class Field(Generic[FieldTypeVar]):
         should not be called directly.
         """
         if at is None:
-            at = getCallStack()
+            at = instance._getCallStack()
         self.__set__(instance, None, at=at, label=label)
 
     def _compare(self, instance1, instance2, shortcut, rtol, atol, output):
@@ -840,7 +1463,7 @@ class Field(Generic[FieldTypeVar]):
         instance2 : `lsst.pex.config.Config`
             Right-hand side `Config` instance to compare.
         shortcut : `bool`, optional
-            **Unused.**
+            If `True`, return as soon as an inequality is found.
         rtol : `float`, optional
             Relative tolerance for floating point comparisons.
         atol : `float`, optional
@@ -849,20 +1472,51 @@ class Field(Generic[FieldTypeVar]):
             A callable that takes a string, used (possibly repeatedly) to
             report inequalities.
 
+        Returns
+        -------
+        isEqual : bool
+            `True` if the fields are equal, `False` otherwise.
+
         Notes
         -----
-        This method must be overridden by more complex `Field` subclasses.
+        `Field` subclasses should override `_gatherComparison` rather than
+        this method, so that their floating-point values are compared along
+        with all the others in `lsst.pex.config.compareConfigs`.
 
         See also
         --------
         lsst.pex.config.compareScalars
         """
+        comparison = _Comparison(shortcut, rtol, atol)
+        return comparison.run(self._gatherComparison, instance1, instance2, comparison, output=output)
+
+    def _gatherComparison(self, instance1, instance2, comparison):
+        """Add the comparison of a field (named `Field.name`) in two
+        `~lsst.pex.config.Config` instances to a comparison of configs.
+
+        Parameters
+        ----------
+        instance1 : `lsst.pex.config.Config`
+            Left-hand side `Config` instance to compare.
+        instance2 : `lsst.pex.config.Config`
+            Right-hand side `Config` instance to compare.
+        comparison : `lsst.pex.config.comparison._Comparison`
+            The comparison to add to. Its ``compareScalars``,
+            ``compareSequences``, ``compareMappings``, ``compareArrays`` and
+            ``compareConfigs`` methods compare values and report differences;
+            floating-point values are only compared once the whole tree has
+            been gathered.
+
+        Notes
+        -----
+        This method must be overridden by more complex `Field` subclasses.
+        """
         v1 = getattr(instance1, self.name)
         v2 = getattr(instance2, self.name)
         name = getComparisonName(
             _joinNamePath(instance1._name, self.name), _joinNamePath(instance2._name, self.name)
         )
-        return compareScalars(name, v1, v2, dtype=self.dtype, rtol=rtol, atol=atol, output=output)
+        comparison.compareScalars(name, v1, v2, dtype=self.dtype)
 
 
 class RecordingImporter:
@@ -965,7 +1619,9 @@ class Config(metaclass=ConfigMeta):  # type: ignore
     _storage: dict[str, Any]
     _fields: dict[str, Field]
     _history: dict[str, list[Any]]
+    _decodedHistory: Optional[dict[str, list[Any]]]
     _imports: set[Any]
+    _historyLimit: Optional[int] = None
 
     def __iter__(self):
         """Iterate over fields."""
@@ -993,6 +1649,7 @@ class Config(metaclass=ConfigMeta):  # type: ignore
         values : `dict_values`
             Iterator of field values.
         """
+        self._materializeFields()
         return self._storage.values()
 
     def items(self):
@@ -1006,8 +1663,16 @@ class Config(metaclass=ConfigMeta):  # type: ignore
             0. Field name.
             1. Field value.
         """
+        self._materializeFields()
         return self._storage.items()
 
+    def _materializeFields(self):
+        """Build any field values whose construction has been deferred, so
+        that ``_storage`` holds only real values.
+        """
+        for field in self._fields.values():
+            field._materialize(self)
+
     def __contains__(self, name):
         """!Return True if the specified field exists in this config
 
@@ -1028,38 +1693,215 @@ class Config(metaclass=ConfigMeta):  # type: ignore
         when or even the base ``Config.__init__`` should be called.
         """
         name = kw.pop("__name", None)
-        at = kw.pop("__at", getCallStack())
+        at = kw.pop("__at", None)
         # remove __label and ignore it
         kw.pop("__label", "default")
 
         instance = object.__new__(cls)
         instance._frozen = False
+        instance._fingerprint = None
+        instance._validated = False
+        instance._parent = None
         instance._name = name
         instance._storage = {}
         instance._history = {}
+        instance._decodedHistory = None
         instance._imports = set()
-        # load up defaults
-        for field in instance._fields.values():
-            instance._history[field.name] = []
-            field.__set__(instance, field.default, at=at + [field.source], label="default")
+        instance._historyLimit = kw.pop("__historyLimit", cls._historyLimit)
+        if at is None:
+            at = instance._getCallStack()
+        # load up defaults; they are always checked at once, since they are
+        # cached for the class
+        defaults = cls._getDefaultCache()
+        with _suspendDeferredValidation():
+            for name, field in instance._fields.items():
+                instance._history[name] = instance._newHistory()
+                cached = defaults.get(name)
+                if cached is not None and cached[0] is field and cached[1] is field.default:
+                    instance._storage[name] = cached[2]
+                    instance._recordHistory(name, cached[2], at + [field.source], "default")
+                    continue
+                field.__set__(instance, field.default, at=at + [field.source], label="default")
+                if type(field).__set__ is Field.__set__:
+                    defaults[name] = (field, field.default, instance._storage[name])
         # set custom default-overides
         instance.setDefaults()
         # set constructor overides
         instance.update(__at=at, **kw)
         return instance
 
+    @classmethod
+    def _getDefaultCache(cls):
+        """Return the cache of validated default values for this class.
+
+        Returns
+        -------
+        defaults : `dict`
+            Mapping of field name to ``(field, default, value)``, where
+            ``value`` is what setting ``default`` on ``field`` stores. Only
+            fields using `Field.__set__` are cached, since their stored
+            values are immutable scalars.
+
+        Notes
+        -----
+        The cache belongs to the class itself rather than being inherited,
+        and is cleared when a field of the class is replaced. An entry is
+        only used while its field and default are still the ones in place.
+        """
+        try:
+            return cls.__dict__["_defaultCache"]
+        except KeyError:
+            defaults = {}
+            type.__setattr__(cls, "_defaultCache", defaults)
+            return defaults
+
+    @classmethod
+    def _getDefaultPrototype(cls):
+        """Return a shared, frozen, default-constructed instance of this
+        class.
+
+        Returns
+        -------
+        prototype : `lsst.pex.config.Config`
+            Instance standing in for default subconfigs that have not been
+            built yet (see ``lazy`` in `~lsst.pex.config.ConfigField`). It
+            records no history and must never be handed out to users.
+
+        Notes
+        -----
+        Like `_getDefaultCache`, the prototype belongs to the class itself
+        and is discarded when a field of the class is replaced.
+        """
+        try:
+            return cls.__dict__["_defaultPrototype"]
+        except KeyError:
+            with _suspendDeferredValidation():
+                prototype = cls(__historyLimit=0)
+            prototype.freeze()
+            type.__setattr__(cls, "_defaultPrototype", prototype)
+            return prototype
+
+    @classmethod
+    def _getValidators(cls):
+        """Return the functions validating the fields of this class.
+
+        Returns
+        -------
+        validators : `tuple` [callable]
+            The validators made by ``Field._makeValidator``, in field order,
+            leaving out fields with nothing to validate.
+
+        Notes
+        -----
+        Like `_getDefaultCache`, the validators belong to the class itself
+        and are discarded when a field of the class is replaced. They are
+        also made again after an attribute of any field is set, since they
+        capture the attributes of their fields.
+        """
+        cached = cls.__dict__.get("_validators")
+        if cached is not None and cached[0] == _fieldGeneration:
+            return cached[1]
+        generation = _fieldGeneration
+        validators = []
+        for field in cls._fields.values():
+            if _overridesValidate(type(field)):
+                validators.append(field.validate)
+            else:
+                validator = field._makeValidator()
+                if validator is not None:
+                    validators.append(validator)
+        validators = tuple(validators)
+        type.__setattr__(cls, "_validators", (generation, validators))
+        return validators
+
+    def copy(self, keepHistory=True):
+        """Make a deep copy of this config.
+
+        Parameters
+        ----------
+        keepHistory : `bool`, optional
+            If `True` (default), the copy starts with the history of this
+            config and its subconfigs; otherwise its history starts out empty.
+
+        Returns
+        -------
+        copy : `lsst.pex.config.Config`
+            A copy of this config with the same field values, including
+            copies of all subconfigs. The copy is never frozen.
+
+        Notes
+        -----
+        The copy is built directly from the stored values, which are already
+        valid, rather than by saving and reloading this config; this is also
+        what `copy.deepcopy` uses.
+        """
+        other = object.__new__(type(self))
+        other._frozen = False
+        other._fingerprint = None
+        other._validated = False
+        other._parent = None
+        other._name = self._name
+        other._storage = {}
+        other._imports = set(self._imports)
+        other._historyLimit = self._historyLimit
+        other._decodedHistory = None
+        if keepHistory:
+            other._history = {name: other._newHistory(h) for name, h in self._history.items()}
+        else:
+            other._history = {name: other._newHistory() for name in self._fields}
+        for key, value in self.__dict__.items():
+            if key not in other.__dict__:
+                other.__dict__[key] = copy.deepcopy(value)
+        for field in self._fields.values():
+            field._copy(self, other, keepHistory)
+        return other
+
+    def __deepcopy__(self, memo):
+        return self.copy()
+
     def __reduce__(self):
         """Reduction for pickling (function with arguments to reproduce).
 
         We need to condense and reconstitute the `~lsst.pex.config.Config`,
         since it may contain lambdas (as the ``check`` elements) that cannot
-        be pickled.
+        be pickled. Only the class and a tree of field values built from
+        built-in types are pickled (see `_getState`), so unpickling does not
+        need to execute any code. The modules that saving would import are
+        recorded and imported again on unpickling, so that plugins that
+        register themselves on import are available.
         """
-        # The stream must be in characters to match the API but pickle
-        # requires bytes
-        stream = io.StringIO()
-        self.saveToStream(stream)
-        return (unreduceConfig, (self.__class__, stream.getvalue().encode()))
+        imports = set(self._imports)
+        for field in self._fields.values():
+            field._collectImports(self, imports)
+        imports = sorted(imp for imp in imports if sys.modules.get(imp) is not None)
+        return (_unreduceConfigState, (self.__class__, self._getState(), imports))
+
+    def _getState(self):
+        """Get the field values of this config in a form that can be pickled.
+
+        Returns
+        -------
+        state : `dict`
+            Mapping of field name to the state returned by each field's
+            `~lsst.pex.config.Field._getState`.
+        """
+        return {name: field._getState(self) for name, field in self._fields.items()}
+
+    def _setState(self, state, at=None):
+        """Set the field values of this config from the output of
+        `_getState`.
+
+        Parameters
+        ----------
+        state : `dict`
+            Mapping of field name to field state.
+        at : `list` of `lsst.pex.config.callStack.StackFrame`, optional
+            The call stack.
+        """
+        if at is None:
+            at = self._getCallStack()
+        for name, fieldState in state.items():
+            self._fields[name]._setState(self, fieldState, at)
 
     def setDefaults(self):
         """Subclass hook for computing defaults.
@@ -1124,7 +1966,9 @@ class Config(metaclass=ConfigMeta):  # type: ignore
         fieldB: True
         fieldC: 'Updated!'
         """
-        at = kw.pop("__at", getCallStack())
+        at = kw.pop("__at", None)
+        if at is None:
+            at = self._getCallStack()
         label = kw.pop("__label", "update")
 
         for name, value in kw.items():
@@ -1161,10 +2005,15 @@ class Config(metaclass=ConfigMeta):  # type: ignore
         lsst.pex.config.Config.save
         lsst.pex.config.Config.saveToStream
         lsst.pex.config.Config.saveToString
+
+        Notes
+        -----
+        The compiled file is cached (see
+        `lsst.pex.config.codeCache.CodeCache`), so loading an unchanged file
+        again does not compile it again.
         """
-        with open(filename, "r") as f:
-            code = compile(f.read(), filename=filename, mode="exec")
-            self.loadFromString(code, root=root, filename=filename)
+        code = getDefaultCodeCache().compileFile(filename)
+        self.loadFromString(code, root=root, filename=filename)
 
     def loadFromStream(self, stream, root="config", filename=None):
         """Modify this Config in place by executing the Python code in the
@@ -1206,7 +2055,7 @@ class Config(metaclass=ConfigMeta):  # type: ignore
         if hasattr(stream, "read"):
             if filename is None:
                 filename = getattr(stream, "name", "?")
-            code = compile(stream.read(), filename=filename, mode="exec")
+            code = getDefaultCodeCache().compileSource(stream.read(), filename)
         else:
             code = stream
         self.loadFromString(code, root=root, filename=filename)
@@ -1217,8 +2066,9 @@ class Config(metaclass=ConfigMeta):  # type: ignore
 
         Parameters
         ----------
-        code : `str`, `bytes`, or compiled string
-            Stream containing configuration override code.
+        code : `str`, `bytes`, compiled string, or `DeclarativeOverride`
+            Stream containing configuration override code, or an override
+            compiled by `lsst.pex.config.declarative.compileOverride`.
         root : `str`, optional
             Name of the variable in file that refers to the config being
             overridden.
@@ -1233,6 +2083,13 @@ class Config(metaclass=ConfigMeta):  # type: ignore
             Name of the configuration file, or `None` if unknown or contained
             in the stream. Used for error reporting.
 
+        Notes
+        -----
+        Code that only imports modules and assigns values to parts of the
+        config (see `lsst.pex.config.declarative.DeclarativeOverride`) is
+        applied without being executed; other code is executed. Which of the
+        two happened is logged at debug level.
+
         See also
         --------
         lsst.pex.config.Config.load
@@ -1244,7 +2101,15 @@ class Config(metaclass=ConfigMeta):  # type: ignore
         if filename is None:
             # try to determine the file name; a compiled string
             # has attribute "co_filename",
-            filename = getattr(code, "co_filename", "?")
+            filename = getattr(code, "co_filename", getattr(code, "filename", "?"))
+        if isinstance(code, (str, bytes)):
+            code = getDefaultCodeCache().compileSource(code, filename)
+        if isinstance(code, DeclarativeOverride):
+            if code.apply(self, root):
+                _LOG.debug("Applied config override %s declaratively.", filename)
+                return
+            code = code.compile()
+        _LOG.debug("Executing config override %s.", filename)
         with RecordingImporter() as importer:
             globals = {"__file__": filename}
             local = {root: self}
@@ -1252,7 +2117,7 @@ class Config(metaclass=ConfigMeta):  # type: ignore
 
         self._imports.update(importer.getModules())
 
-    def save(self, filename, root="config"):
+    def save(self, filename, root="config", skipDefaults=False, skipDocs=False):
         """Save a Python script to the named file, which, when loaded,
         reproduces this config.
 
@@ -1263,6 +2128,14 @@ class Config(metaclass=ConfigMeta):  # type: ignore
         root : `str`, optional
             Name to use for the root config variable. The same value must be
             used when loading (see `lsst.pex.config.Config.load`).
+        skipDefaults : `bool`, optional
+            If `True` then only write the values that differ from those of a
+            newly constructed instance of this config's class, along with the
+            retargets and selections needed to reproduce it. The output must
+            then be loaded onto such an instance.
+        skipDocs : `bool`, optional
+            If `True` then do not write the documentation of each field as
+            comments.
 
         See also
         --------
@@ -1274,7 +2147,7 @@ class Config(metaclass=ConfigMeta):  # type: ignore
         """
         d = os.path.dirname(filename)
         with tempfile.NamedTemporaryFile(mode="w", delete=False, dir=d) as outfile:
-            self.saveToStream(outfile, root)
+            self.saveToStream(outfile, root, skipDefaults=skipDefaults, skipDocs=skipDocs)
             # tempfile is hardcoded to create files with mode '0600'
             # for an explantion of these antics see:
             # https://stackoverflow.com/questions/10291131/how-to-use-os-umask-in-python
@@ -1286,7 +2159,7 @@ class Config(metaclass=ConfigMeta):  # type: ignore
             # os.rename may not work across filesystems
             shutil.move(outfile.name, filename)
 
-    def saveToString(self, skipImports=False):
+    def saveToString(self, skipImports=False, skipDefaults=False, skipDocs=False):
         """Return the Python script form of this configuration as an executable
         string.
 
@@ -1296,6 +2169,14 @@ class Config(metaclass=ConfigMeta):  # type: ignore
             If `True` then do not include ``import`` statements in output,
             this is to support human-oriented output from ``pipetask`` where
             additional clutter is not useful.
+        skipDefaults : `bool`, optional
+            If `True` then only write the values that differ from those of a
+            newly constructed instance of this config's class, along with the
+            retargets and selections needed to reproduce it. The output must
+            then be loaded onto such an instance.
+        skipDocs : `bool`, optional
+            If `True` then do not write the documentation of each field as
+            comments.
 
         Returns
         -------
@@ -1311,10 +2192,10 @@ class Config(metaclass=ConfigMeta):  # type: ignore
         lsst.pex.config.Config.loadFromString
         """
         buffer = io.StringIO()
-        self.saveToStream(buffer, skipImports=skipImports)
+        self.saveToStream(buffer, skipImports=skipImports, skipDefaults=skipDefaults, skipDocs=skipDocs)
         return buffer.getvalue()
 
-    def saveToStream(self, outfile, root="config", skipImports=False):
+    def saveToStream(self, outfile, root="config", skipImports=False, skipDefaults=False, skipDocs=False):
         """Save a configuration file to a stream, which, when loaded,
         reproduces this config.
 
@@ -1330,6 +2211,14 @@ class Config(metaclass=ConfigMeta):  # type: ignore
             If `True` then do not include ``import`` statements in output,
             this is to support human-oriented output from ``pipetask`` where
             additional clutter is not useful.
+        skipDefaults : `bool`, optional
+            If `True` then only write the values that differ from those of a
+            newly constructed instance of this config's class, along with the
+            retargets and selections needed to reproduce it. The output must
+            then be loaded onto such an instance.
+        skipDocs : `bool`, optional
+            If `True` then do not write the documentation of each field as
+            comments.
 
         See also
         --------
@@ -1339,34 +2228,99 @@ class Config(metaclass=ConfigMeta):  # type: ignore
         lsst.pex.config.Config.loadFromStream
         lsst.pex.config.Config.loadFromString
         """
-        tmp = self._name
-        self._rename(root)
-        try:
-            if not skipImports:
-                self._collectImports()
-                # Remove self from the set, as it is handled explicitly below
-                self._imports.remove(self.__module__)
-                configType = type(self)
-                typeString = _typeStr(configType)
-                outfile.write(f"import {configType.__module__}\n")
-                outfile.write(
-                    f"assert type({root})=={typeString}, 'config is of type %s.%s instead of "
-                    f"{typeString}' % (type({root}).__module__, type({root}).__name__)\n"
-                )
-                for imp in sorted(self._imports):
-                    if imp in sys.modules and sys.modules[imp] is not None:
-                        outfile.write("import {}\n".format(imp))
-            self._save(outfile)
-        finally:
-            self._rename(tmp)
+        # Write the body first, collecting the imports it needs on the way,
+        # and hand it to the stream in one piece.
+        imports = set()
+        buffer = io.StringIO()
+        reference = type(self)._getDefaultPrototype() if skipDefaults else None
+        self._save(buffer, root, imports, reference, skipDocs)
+        if not skipImports:
+            # Remove self from the set, as it is handled explicitly below
+            imports.discard(self.__module__)
+            configType = type(self)
+            typeString = _typeStr(configType)
+            header = [
+                f"import {configType.__module__}\n",
+                f"assert type({root})=={typeString}, 'config is of type %s.%s instead of "
+                f"{typeString}' % (type({root}).__module__, type({root}).__name__)\n",
+            ]
+            for imp in sorted(imports):
+                if imp in sys.modules and sys.modules[imp] is not None:
+                    header.append("import {}\n".format(imp))
+            outfile.write("".join(header))
+        outfile.write(buffer.getvalue())
 
     def freeze(self):
-        """Make this config, and all subconfigs, read-only."""
+        """Make this config, and all subconfigs, read-only.
+
+        Notes
+        -----
+        A frozen config that was validated successfully is never validated
+        again, unless ``full=True`` is passed to `validate`.
+
+        The items of list and dict fields are then held in a `tuple` or
+        behind a `types.MappingProxyType`, so that they can be shared
+        without copying, and the config and those containers become
+        hashable.
+        """
         self._frozen = True
         for field in self._fields.values():
             field.freeze(self)
 
-    def _save(self, outfile):
+    def fingerprint(self):
+        """Return a digest of the contents of this config.
+
+        Returns
+        -------
+        fingerprint : `str`
+            Hexadecimal SHA-256 digest of the type of this config and the
+            values, targets and selections of its fields, recursively. It does
+            not depend on names, history or the process, so it can be used as
+            a key for caching work that depends on the config.
+
+        Notes
+        -----
+        Configs that compare equal do not necessarily have the same
+        fingerprint (e.g. floats are compared with a tolerance), but configs
+        that save to the same output do.
+
+        The fingerprint is remembered by each config in the tree until one of
+        its fields is set, so asking again after a change only computes the
+        changed subconfigs and their parents again. Frozen configs compute it
+        only once.
+        """
+        digest = self._fingerprint
+        if digest is None:
+            hash_ = hashlib.sha256(_typeStr(self).encode())
+            for field in self._fields.values():
+                field._updateFingerprint(self, hash_)
+            digest = hash_.hexdigest()
+            self._fingerprint = digest
+        return digest
+
+    def _getSubconfigFingerprint(self, subconfig):
+        """Return the fingerprint of a subconfig, arranging for changes to it
+        to forget the fingerprint of this config (for internal use only).
+        """
+        if not subconfig._frozen:
+            subconfig._parent = weakref.ref(self)
+        return subconfig.fingerprint()
+
+    def _markModified(self):
+        """Forget the fingerprint and the successful validation of this
+        config and of the configs holding it (for internal use only).
+        """
+        config = self
+        while (
+            config is not None
+            and (config._fingerprint is not None or config._validated)
+            and not config._frozen
+        ):
+            config._fingerprint = None
+            config._validated = False
+            config = config._parent() if config._parent is not None else None
+
+    def _save(self, outfile, name=None, imports=None, reference=None, skipDocs=False):
         """Save this config to an open stream object.
 
         Parameters
@@ -1374,9 +2328,56 @@ class Config(metaclass=ConfigMeta):  # type: ignore
         outfile : file-like object
             Destination file object write the config into. Accepts strings not
             bytes.
+        name : `str`, optional
+            Name to save this config under; defaults to its own name.
+        imports : `set` [`str`], optional
+            Set to add the modules needed to load the output to.
+        reference : `lsst.pex.config.Config`, optional
+            Config of the same type that the output will be loaded onto; if
+            given, only the values that differ from it are saved.
+        skipDocs : `bool`, optional
+            If `True`, do not write field documentation as comments.
+
+        Notes
+        -----
+        The config is saved in a single walk of the tree, with the names of
+        subconfigs derived from ``name`` on the way, so saving does not
+        modify the config.
         """
+        if reference is self:
+            return
+        if name is None:
+            name = self._name
+        if imports is None:
+            imports = set()
+        if type(self)._collectImports is not Config._collectImports:
+            # Honor subclasses that add imports of their own.
+            self._collectImports()
+        imports.add(self.__module__)
+        imports |= self._imports
         for field in self._fields.values():
+            overridesSave, overridesCollectImports = _overridesSave(type(field))
+            if overridesSave or overridesCollectImports:
+                field._collectImports(self, imports)
+            if overridesSave:
+                self._saveField(outfile, field, name)
+            else:
+                field._save(outfile, self, _joinNamePath(name, field.name), imports, reference, skipDocs)
+
+    def _saveField(self, outfile, field, name):
+        """Save a field with a customized ``save`` method, which names the
+        field after its config, so this config is renamed while it runs
+        (for internal use only).
+        """
+        oldName = self._name
+        if oldName == name:
+            field.save(outfile, self)
+            return
+        self._rename(name)
+        try:
             field.save(outfile, self)
+        finally:
+            self._rename(oldName)
 
     def _collectImports(self):
         """Adds module containing self to the list of things to import and
@@ -1421,28 +2422,39 @@ class Config(metaclass=ConfigMeta):  # type: ignore
         -------
         names : `list` of `str`
             Field names.
+
+        See also
+        --------
+        lsst.pex.config.Config.iterNames
+        """
+        return [name for name, _ in self.iterNames()]
+
+    def iterNames(self):
+        """Iterate over all the field names in the config, recursively, along
+        with their values.
+
+        Yields
+        ------
+        name : `str`
+            Name of the field relative to this config, as in
+            `~lsst.pex.config.Config.names`, e.g. ``"a.b"`` or
+            ``"registry['name'].c"``.
+        value : `object`
+            Value of the field.
+
+        Notes
+        -----
+        Subconfigs are visited only as the iteration reaches them, so
+        stopping early does not walk the whole config.
         """
-        #
-        # Rather than sort out the recursion all over again use the
-        # pre-existing saveToStream()
-        #
-        with io.StringIO() as strFd:
-            self.saveToStream(strFd, "config")
-            contents = strFd.getvalue()
-            strFd.close()
-        #
-        # Pull the names out of the dumped config
-        #
-        keys = []
-        for line in contents.split("\n"):
-            if re.search(r"^((assert|import)\s+|\s*$|#)", line):
-                continue
-
-            mat = re.search(r"^(?:config\.)?([^=]+)\s*=\s*.*", line)
-            if mat:
-                keys.append(mat.group(1))
-
-        return keys
+        return self._iterNames(None)
+
+    def _iterNames(self, prefix):
+        """Iterate over the names and values of this config's fields, with
+        names prefixed by ``prefix`` (for internal use only).
+        """
+        for field in self._fields.values():
+            yield from field._iterNames(self, _joinNamePath(prefix, field.name))
 
     def _rename(self, name):
         """Rename this config object in its parent `~lsst.pex.config.Config`.
@@ -1467,9 +2479,15 @@ class Config(metaclass=ConfigMeta):  # type: ignore
         for field in self._fields.values():
             field.rename(self)
 
-    def validate(self):
+    def validate(self, full=False):
         """Validate the Config, raising an exception if invalid.
 
+        Parameters
+        ----------
+        full : `bool`, optional
+            If `True`, validate this config and all its subconfigs even if
+            they were validated successfully and have not changed since.
+
         Raises
         ------
         lsst.pex.config.FieldValidationError
@@ -1488,10 +2506,44 @@ class Config(metaclass=ConfigMeta):  # type: ignore
 
         Inter-field relationships should only be checked in derived
         `~lsst.pex.config.Config` classes after calling this method, and base
-        validation is complete.
+        validation is complete. Derived classes should accept ``full`` and
+        pass it on.
+
+        The checks each field makes are turned into a function the first time
+        a config of a given class is validated, and reused for all the
+        configs of that class.
+
+        Once a config has been validated successfully, the checks made by this
+        method, including the validation of subconfigs, are skipped until one
+        of its fields, or a field of one of its subconfigs, is set, or an
+        attribute of any field (such as ``check``) is set (checks made by
+        derived classes after calling this method still run). Use
+        ``full=True`` if a config may have become invalid in any other way,
+        e.g. if a ``check`` function depends on something outside the config.
         """
-        for field in self._fields.values():
-            field.validate(self)
+        outerFull = getattr(_validationState, "full", False)
+        full = full or outerFull
+        if self._validated:
+            if not full and self._validated == _fieldGeneration:
+                return
+            self._validated = False
+        # Fields are always created first, so the generation is never 0.
+        generation = _fieldGeneration
+        _validationState.full = full
+        try:
+            for validator in type(self)._getValidators():
+                validator(self)
+        finally:
+            _validationState.full = outerFull
+        self._validated = generation
+
+    def _validateSubconfig(self, subconfig):
+        """Validate a subconfig, arranging for changes to it to make this
+        config be validated again (for internal use only).
+        """
+        if not subconfig._frozen:
+            subconfig._parent = weakref.ref(self)
+        subconfig.validate()
 
     def formatHistory(self, name, **kwargs):
         """Format a configuration field's history to a human-readable format.
@@ -1516,9 +2568,220 @@ class Config(metaclass=ConfigMeta):  # type: ignore
 
         return pexHist.format(self, name, **kwargs)
 
-    history = property(lambda x: x._history)
-    """Read-only history.
-    """
+    @property
+    def history(self):
+        """Histories of the fields of this config, as a `dict` of field name
+        to a `list` of ``(value, stack, label)`` tuples.
+
+        A new `dict` is returned on each access, so adding or removing its
+        items does not change the history of the config. The histories it
+        holds must not be modified.
+        """
+        return {name: self._decodeHistory(name) for name in self._history}
+
+    @classmethod
+    def setDefaultHistoryLimit(cls, limit):
+        """Set the history policy used by new instances of this class.
+
+        Parameters
+        ----------
+        limit : `int` or `None`
+            `None` records the full history of every field, ``0`` disables
+            history recording, and a positive number keeps only that many
+            of the most recent history entries for each field.
+
+        Raises
+        ------
+        ValueError
+            Raised if ``limit`` is not `None` or a non-negative `int`; `bool`
+            is rejected.
+
+        Notes
+        -----
+        Calling this on `Config` itself sets the process-wide default; calling
+        it on a subclass only affects that subclass and its descendants.
+        Instances that already exist are not affected; use `setHistoryLimit`
+        for those.
+        """
+        cls._historyLimit = _checkHistoryLimit(limit)
+
+    def setHistoryLimit(self, limit):
+        """Set the history policy of this config and all of its subconfigs.
+
+        Parameters
+        ----------
+        limit : `int` or `None`
+            `None` records the full history of every field, ``0`` disables
+            history recording, and a positive number keeps only that many
+            of the most recent history entries for each field.
+
+        Raises
+        ------
+        ValueError
+            Raised if ``limit`` is not `None` or a non-negative `int`; `bool`
+            is rejected.
+
+        Notes
+        -----
+        Existing history is trimmed to the new limit. Subconfigs created
+        later by this config's fields inherit the limit.
+        """
+        self._historyLimit = _checkHistoryLimit(limit)
+        for name in self._history:
+            self._history[name] = self._newHistory(self._decodeHistory(name))
+        self._decodedHistory = None
+        for field in self._fields.values():
+            field._setHistoryLimit(self, limit)
+
+    def _newHistory(self, entries=()):
+        """Make an empty history container for a field of this config,
+        following its history policy.
+
+        Parameters
+        ----------
+        entries : iterable, optional
+            Initial history entries; with a limited history only the most
+            recent ones are kept.
+        """
+        limit = self._historyLimit
+        if limit is None:
+            return list(entries)
+        elif limit == 0:
+            return []
+        return collections.deque(entries, maxlen=limit)
+
+    def _fieldHistory(self, name):
+        """Return the history container for a field, creating it if
+        necessary.
+        """
+        try:
+            return self._history[name]
+        except KeyError:
+            history = self._history[name] = self._newHistory()
+            return history
+
+    def _decodeHistory(self, name):
+        """Return the history of a field with any `_HistoryDelta` entries
+        expanded into full values (for internal use only).
+
+        Parameters
+        ----------
+        name : `str`
+            Name of the field.
+
+        Returns
+        -------
+        history : `list` or `collections.deque`
+            The history of the field itself if it has no `_HistoryDelta`
+            entries, or else a list of the expanded entries.
+
+        Notes
+        -----
+        The expanded entries are kept, so that only the entries recorded
+        since the last call are expanded. Limited histories always hold
+        full values.
+        """
+        history = self._fieldHistory(name)
+        if not isinstance(history, list):
+            return history
+        if self._decodedHistory is None:
+            self._decodedHistory = {}
+        cached = self._decodedHistory.get(name)
+        if cached is None or cached[0] is not history or cached[2] > len(history):
+            cached = self._decodedHistory[name] = [history, None, 0]
+        _, decoded, start = cached
+        for i in range(start, len(history)):
+            entry = history[i]
+            if isinstance(entry[0], _HistoryDelta):
+                if decoded is None:
+                    decoded = history[:i]
+                value = entry[0].apply(decoded[-1][0] if decoded else None)
+                decoded.append((value,) + tuple(entry[1:]))
+            elif decoded is not None:
+                decoded.append(entry)
+        cached[1] = decoded
+        cached[2] = len(history)
+        return history if decoded is None else decoded
+
+    def _recordHistory(self, name, value, at, label):
+        """Add an entry to the history of a field, if this config records
+        history.
+
+        Parameters
+        ----------
+        name : `str`
+            Name of the field.
+        value : object
+            Value (or description of the change) to record.
+        at : `list` of `lsst.pex.config.callStack.StackFrame`
+            The call stack.
+        label : `str`
+            Event label for the history.
+        """
+        if self._fingerprint is not None or self._validated:
+            self._markModified()
+        if self._historyLimit == 0:
+            return
+        self._fieldHistory(name).append((value, at, label))
+
+    def _recordHistoryDelta(self, name, delta, value, at, label):
+        """Add an entry recording a change to a container field to the
+        history of the field, if this config records history.
+
+        Parameters
+        ----------
+        name : `str`
+            Name of the field.
+        delta : `_HistoryDelta`
+            The change made to the previous value.
+        value : `list` or `dict`
+            The new value of the field; it is copied when a full value is
+            recorded instead of ``delta``.
+        at : `list` of `lsst.pex.config.callStack.StackFrame`
+            The call stack.
+        label : `str`
+            Event label for the history.
+
+        Notes
+        -----
+        Only unlimited histories record changes; a full copy is still
+        recorded every ``_HISTORY_SNAPSHOT_INTERVAL`` entries (and for the
+        first entry) so that expanding the history does not need to start
+        from the beginning. Limited histories always record full values,
+        since their oldest entries are discarded.
+        """
+        if self._fingerprint is not None or self._validated:
+            self._markModified()
+        limit = self._historyLimit
+        if limit == 0:
+            return
+        history = self._fieldHistory(name)
+        if limit is not None or len(history) % _HISTORY_SNAPSHOT_INTERVAL == 0:
+            delta = copy.copy(value)
+        history.append((delta, at, label))
+
+    def _getCallStack(self, skip=0):
+        """Capture the call stack for a history entry of this config.
+
+        Parameters
+        ----------
+        skip : `int`, non-negative
+            Number of stack frames above the caller to skip.
+
+        Returns
+        -------
+        stack : `lsst.pex.config.callStack.LazyCallStack` or `list`
+            The call stack, or an empty `list` if this config does not record
+            history.
+
+        Notes
+        -----
+        This method and its caller are excluded from the call stack, just as
+        for `lsst.pex.config.callStack.getLazyCallStack`.
+        """
+        if self._historyLimit == 0:
+            return []
+        return getLazyCallStack(skip + 1)
 
     def __setattr__(self, attr, value, at=None, label="assignment"):
         """Set an attribute (such as a field's value).
@@ -1542,13 +2805,24 @@ class Config(metaclass=ConfigMeta):  # type: ignore
                     stacklevel=2,
                 )
             if at is None:
-                at = getCallStack()
+                at = self._getCallStack()
             # This allows Field descriptors to work.
             self._fields[attr].__set__(self, value, at=at, label=label)
         elif hasattr(getattr(self.__class__, attr, None), "__set__"):
             # This allows properties and other non-Field descriptors to work.
             return object.__setattr__(self, attr, value)
-        elif attr in self.__dict__ or attr in ("_name", "_history", "_storage", "_frozen", "_imports"):
+        elif attr in self.__dict__ or attr in (
+            "_name",
+            "_history",
+            "_decodedHistory",
+            "_storage",
+            "_frozen",
+            "_imports",
+            "_historyLimit",
+            "_fingerprint",
+            "_validated",
+            "_parent",
+        ):
             # This allows specific private attributes to work.
             self.__dict__[attr] = value
         else:
@@ -1558,20 +2832,15 @@ class Config(metaclass=ConfigMeta):  # type: ignore
     def __delattr__(self, attr, at=None, label="deletion"):
         if attr in self._fields:
             if at is None:
-                at = getCallStack()
+                at = self._getCallStack()
             self._fields[attr].__delete__(self, at=at, label=label)
         else:
             object.__delattr__(self, attr)
 
     def __eq__(self, other):
         if type(other) == type(self):
-            for name in self._fields:
-                thisValue = getattr(self, name)
-                otherValue = getattr(other, name)
-                if isinstance(thisValue, float) and math.isnan(thisValue):
-                    if not math.isnan(otherValue):
-                        return False
-                elif thisValue != otherValue:
+            for name, field in self._fields.items():
+                if not field._equal(getattr(self, name), getattr(other, name)):
                     return False
             return True
         return False
@@ -1579,6 +2848,13 @@ class Config(metaclass=ConfigMeta):  # type: ignore
     def __ne__(self, other):
         return not self.__eq__(other)
 
+    def __hash__(self):
+        # Only frozen configs are hashable, since the hash must not change.
+        # It is built from the same values as __eq__ compares.
+        if not self._frozen:
+            raise TypeError("unhashable type: '%s' (the config is not frozen)" % _typeStr(self))
+        return hash(tuple(field._hash(getattr(self, name)) for name, field in self._fields.items()))
+
     def __str__(self):
         return str(self.toDict())
 
@@ -1631,6 +2907,124 @@ class Config(metaclass=ConfigMeta):  # type: ignore
         name = getComparisonName(name1, name2)
         return compareConfigs(name, self, other, shortcut=shortcut, rtol=rtol, atol=atol, output=output)
 
+    def diff(self, other):
+        """Find the differences between this config and another of the same
+        type.
+
+        Parameters
+        ----------
+        other : `lsst.pex.config.Config`
+            Config to compare this one with.
+
+        Returns
+        -------
+        differences : `list` [`lsst.pex.config.ConfigDifference`]
+            The differences, each giving the value in this config as ``old``
+            and the value in ``other`` as ``new``, in field order.
+
+        Raises
+        ------
+        TypeError
+            Raised if ``other`` is not of the same type as this config.
+
+        See also
+        --------
+        lsst.pex.config.Config.applyDiff
+        lsst.pex.config.Config.compare
+
+        Notes
+        -----
+        Unlike `compare`, values are compared exactly (in the sense that they
+        save the same), and all the configs held by
+        `~lsst.pex.config.ConfigChoiceField` and
+        `~lsst.pex.config.RegistryField` fields are considered, selected or
+        not. Subconfigs with the same `fingerprint` are not looked into, so
+        comparing many configs against the same one is cheap.
+
+        After a `~lsst.pex.config.ConfigurableField` is retargeted to a new
+        ``ConfigClass``, the differences inside it are relative to what the
+        retarget builds rather than to this config.
+        """
+        if type(other) is not type(self):
+            raise TypeError("Cannot diff %s against %s" % (_typeStr(self), _typeStr(other)))
+        differences = []
+        self._diff(other, None, (), differences)
+        return differences
+
+    def _diff(self, other, prefix, steps, differences):
+        """Add the differences between this config and another to a list
+        (for internal use only).
+
+        Parameters
+        ----------
+        other : `lsst.pex.config.Config`
+            Config of the same type to compare with.
+        prefix : `str` or `None`
+            Name of this config relative to the root of the diff.
+        steps : `tuple`
+            ``(fieldName, key)`` pairs leading from the root of the diff to
+            this config.
+        differences : `list` [`lsst.pex.config.ConfigDifference`]
+            List to add the differences to.
+        """
+        if self is other or self.fingerprint() == other.fingerprint():
+            return
+        for field in self._fields.values():
+            field._diff(self, other, _joinNamePath(prefix, field.name), steps, differences)
+
+    def applyDiff(self, differences):
+        """Apply differences found by `diff` to this config.
+
+        Parameters
+        ----------
+        differences : iterable of `lsst.pex.config.ConfigDifference`
+            The differences to apply; the ``new`` value of each is set.
+
+        Raises
+        ------
+        ValueError
+            Raised if a difference was not found by `diff`, and so does not
+            know where it applies.
+
+        Notes
+        -----
+        This is typically used to replay ``a.diff(b)`` onto a config equal to
+        ``a``, making it equal to ``b``. The changes are recorded in the
+        history with the same call stack and a ``"diff"`` label, one entry
+        for each field changed.
+
+        This method is not called ``apply``, which would be hidden by
+        `~lsst.pex.config.ConfigurableInstance.apply` for configs held by a
+        `~lsst.pex.config.ConfigurableField`.
+        """
+        at = self._getCallStack()
+        # The differences for a field are next to each other, and are
+        # applied together. Subconfigs are only looked up once the earlier
+        # differences are applied, since those may retarget them.
+        batch = []
+        for difference in differences:
+            if difference._location is None:
+                raise ValueError(
+                    "Difference at %r was not found by Config.diff and cannot be applied" % difference.path
+                )
+            if batch and batch[-1]._location[:2] != difference._location[:2]:
+                self._applyDiffBatch(batch, at)
+                batch = []
+            batch.append(difference)
+        if batch:
+            self._applyDiffBatch(batch, at)
+
+    def _applyDiffBatch(self, batch, at):
+        """Apply differences to a single field, found by `diff` (for
+        internal use only).
+        """
+        steps, name, _ = batch[0]._location
+        config = self
+        for stepName, stepKey in steps:
+            config = config._fields[stepName]._getDiffSubconfig(config, stepKey)
+        differences = [(difference._location[2], difference) for difference in batch]
+        config._fields[name]._applyDiff(config, differences, at, "diff")
+
     @classmethod
     def __init_subclass__(cls, **kwargs):
         """Run initialization for every subclass.
@@ -1714,6 +3108,33 @@ def _classFromPython(config_py):
     return pytype
 
 
+def _unreduceConfigState(cls, state, imports):
+    """Create a `~lsst.pex.config.Config` from the output of
+    `~lsst.pex.config.Config._getState` (for unpickling).
+
+    Parameters
+    ----------
+    cls : `lsst.pex.config.Config`-type
+        The type of config to create.
+    state : `dict`
+        Mapping of field name to field state.
+    imports : `list` of `str`
+        Modules imported by the pickled config. They are imported before the
+        state is set.
+
+    Returns
+    -------
+    config : `lsst.pex.config.Config`
+        Config instance.
+    """
+    for name in imports:
+        importlib.import_module(name)
+    config = cls()
+    config._setState(state)
+    config._imports.update(imports)
+    return config
+
+
 def unreduceConfig(cls, stream):
     """Create a `~lsst.pex.config.Config` from a stream.
 
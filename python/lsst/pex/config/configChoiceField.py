@@ -34,8 +34,8 @@ import sys
 import weakref
 from typing import Any, ForwardRef, Optional, Union, overload
 
-from .callStack import getCallStack, getStackFrame
-from .comparison import compareConfigs, compareScalars, getComparisonName
+from .callStack import getStackFrame
+from .comparison import ConfigDifference, getComparisonName
 from .config import Config, Field, FieldValidationError, UnexpectedProxyUsageError, _joinNamePath, _typeStr
 
 
@@ -66,11 +66,10 @@ class SelectionSet(collections.abc.MutableSet):
 
     def __init__(self, dict_, value, at=None, label="assignment", setHistory=True):
         if at is None:
-            at = getCallStack()
+            at = dict_._config._getCallStack()
         self._dict = dict_
         self._field = self._dict._field
         self._config_ = weakref.ref(self._dict._config)
-        self.__history = self._config._history.setdefault(self._field.name, [])
         if value is not None:
             try:
                 for v in value:
@@ -85,7 +84,7 @@ class SelectionSet(collections.abc.MutableSet):
             self._set = set()
 
         if setHistory:
-            self.__history.append(("Set selection to %s" % self, at, label))
+            self._config._recordHistory(self._field.name, "Set selection to %s" % self, at, label)
 
     @property
     def _config(self) -> Config:
@@ -100,13 +99,13 @@ class SelectionSet(collections.abc.MutableSet):
             raise FieldValidationError(self._field, self._config, "Cannot modify a frozen Config")
 
         if at is None:
-            at = getCallStack()
+            at = self._config._getCallStack()
 
         if value not in self._dict:
             # invoke __getitem__ to make sure it's present
             self._dict.__getitem__(value, at=at)
 
-        self.__history.append(("added %s to selection" % value, at, "selection"))
+        self._config._recordHistory(self._field.name, "added %s to selection" % value, at, "selection")
         self._set.add(value)
 
     def discard(self, value, at=None):
@@ -118,9 +117,9 @@ class SelectionSet(collections.abc.MutableSet):
             return
 
         if at is None:
-            at = getCallStack()
+            at = self._config._getCallStack()
 
-        self.__history.append(("removed %s from selection" % value, at, "selection"))
+        self._config._recordHistory(self._field.name, "removed %s from selection" % value, at, "selection")
         self._set.discard(value)
 
     def __len__(self):
@@ -138,6 +137,17 @@ class SelectionSet(collections.abc.MutableSet):
     def __str__(self):
         return str(list(self._set))
 
+    def _copyTo(self, dict_):
+        """Return a copy of this selection for a copy of its
+        `ConfigInstanceDict`.
+        """
+        result = object.__new__(type(self))
+        result._dict = dict_
+        result._field = self._field
+        result._config_ = weakref.ref(dict_._config)
+        result._set = set(self._set)
+        return result
+
     def __reduce__(self):
         raise UnexpectedProxyUsageError(
             f"Proxy container for config field {self._field.name} cannot "
@@ -172,7 +182,6 @@ class ConfigInstanceDict(*_bases):
         self._selection = None
         self._config = config
         self._field = field
-        self._history = config._history.setdefault(field.name, [])
         self.__doc__ = field.doc
         self._typemap = None
 
@@ -194,7 +203,7 @@ class ConfigInstanceDict(*_bases):
             raise FieldValidationError(self._field, self._config, "Cannot modify a frozen Config")
 
         if at is None:
-            at = getCallStack(1)
+            at = self._config._getCallStack(1)
 
         if value is None:
             self._selection = None
@@ -204,7 +213,7 @@ class ConfigInstanceDict(*_bases):
             if value not in self._dict:
                 self.__getitem__(value, at=at)  # just invoke __getitem__ to make sure it's present
             self._selection = value
-        self._history.append((value, at, label))
+        self._config._recordHistory(self._field.name, value, at, label)
 
     def _getNames(self):
         if not self._field.multi:
@@ -288,9 +297,12 @@ class ConfigInstanceDict(*_bases):
                 )
             name = _joinNamePath(self._config._name, self._field.name, k)
             if at is None:
-                at = getCallStack()
-                at.insert(0, dtype._source)
-            value = self._dict.setdefault(k, dtype(__name=name, __at=at, __label=label))
+                at = [dtype._source] + self._config._getCallStack()
+            value = self._dict.setdefault(
+                k, dtype(__name=name, __at=at, __label=label, __historyLimit=self._config._historyLimit)
+            )
+            # Changes to the new subconfig must reach the parent config.
+            self._config._markModified()
         return value
 
     def __setitem__(self, k, value, at=None, label="assignment"):
@@ -312,17 +324,20 @@ class ConfigInstanceDict(*_bases):
             raise FieldValidationError(self._field, self._config, msg)
 
         if at is None:
-            at = getCallStack()
+            at = self._config._getCallStack()
         name = _joinNamePath(self._config._name, self._field.name, k)
+        historyLimit = self._config._historyLimit
         oldValue = self._dict.get(k, None)
         if oldValue is None:
             if value == dtype:
-                self._dict[k] = value(__name=name, __at=at, __label=label)
+                self._dict[k] = value(__name=name, __at=at, __label=label, __historyLimit=historyLimit)
             else:
-                self._dict[k] = dtype(__name=name, __at=at, __label=label, **value._storage)
+                self._dict[k] = dtype(
+                    __name=name, __at=at, __label=label, __historyLimit=historyLimit, **value._storage
+                )
         else:
             if value == dtype:
-                value = value()
+                value = value(__historyLimit=0)
             oldValue.update(__at=at, __label=label, **value._storage)
 
     def _rename(self, fullname):
@@ -334,7 +349,6 @@ class ConfigInstanceDict(*_bases):
             # This allows properties to work.
             object.__setattr__(self, attr, value)
         elif attr in self.__dict__ or attr in [
-            "_history",
             "_field",
             "_config",
             "_dict",
@@ -359,6 +373,18 @@ class ConfigInstanceDict(*_bases):
         if self._typemap is None:
             self._typemap = copy.deepcopy(self.types)
 
+    def _copyTo(self, config, keepHistory):
+        """Return a copy of this dict, and of the configs in it, owned by
+        another config.
+        """
+        result = object.__new__(type(self))
+        result.__dict__.update(self.__dict__)
+        result.__dict__["_config"] = config
+        result.__dict__["_dict"] = {k: v.copy(keepHistory) for k, v in self._dict.items()}
+        if isinstance(self._selection, SelectionSet):
+            result.__dict__["_selection"] = self._selection._copyTo(result)
+        return result
+
     def __reduce__(self):
         raise UnexpectedProxyUsageError(
             f"Proxy container for config field {self._field.name} cannot "
@@ -494,12 +520,11 @@ class ConfigChoiceField(Field[ConfigInstanceDict]):
     def _getOrMake(self, instance, label="default"):
         instanceDict = instance._storage.get(self.name)
         if instanceDict is None:
-            at = getCallStack(1)
+            at = instance._getCallStack(1)
             instanceDict = self.dtype(instance, self)
             instanceDict.__doc__ = self.doc
             instance._storage[self.name] = instanceDict
-            history = instance._history.setdefault(self.name, [])
-            history.append(("Initialized from defaults", at, label))
+            instance._recordHistory(self.name, "Initialized from defaults", at, label)
 
         return instanceDict
 
@@ -527,7 +552,7 @@ class ConfigChoiceField(Field[ConfigInstanceDict]):
         if instance._frozen:
             raise FieldValidationError(self, instance, "Cannot modify a frozen Config")
         if at is None:
-            at = getCallStack()
+            at = instance._getCallStack()
         instanceDict = self._getOrMake(instance)
         if isinstance(value, self.instanceDictClass):
             for k, v in value.items():
@@ -550,9 +575,48 @@ class ConfigChoiceField(Field[ConfigInstanceDict]):
         elif instanceDict.active is not None:
             if self.multi:
                 for a in instanceDict.active:
-                    a.validate()
+                    instance._validateSubconfig(a)
+            else:
+                instance._validateSubconfig(instanceDict.active)
+
+    def _makeValidator(self):
+        optional = self.optional
+        multi = self.multi
+
+        def validator(instance):
+            instanceDict = instance._storage.get(self.name)
+            if instanceDict is None:
+                instanceDict = self._getOrMake(instance)
+            active = instanceDict.active
+            if active is None:
+                if not optional:
+                    raise FieldValidationError(self, instance, "Required field cannot be None")
+            elif multi:
+                for a in active:
+                    instance._validateSubconfig(a)
             else:
-                instanceDict.active.validate()
+                instance._validateSubconfig(active)
+
+        return validator
+
+    def _copy(self, instance, other, keepHistory):
+        instanceDict = instance._storage.get(self.name)
+        if instanceDict is not None:
+            other._storage[self.name] = instanceDict._copyTo(other, keepHistory)
+
+    def _getState(self, instance):
+        instanceDict = self.__get__(instance)
+        selection = instanceDict._selection
+        if self.multi and selection is not None:
+            selection = list(selection)
+        return (selection, {k: v._getState() for k, v in instanceDict._dict.items()})
+
+    def _setState(self, instance, state, at):
+        selection, values = state
+        instanceDict = self.__get__(instance)
+        for k, v in values.items():
+            instanceDict.__getitem__(k, at=at)._setState(v, at)
+        instanceDict._setSelection(selection, at=at)
 
     def toDict(self, instance):
         instanceDict = self.__get__(instance)
@@ -570,6 +634,16 @@ class ConfigChoiceField(Field[ConfigInstanceDict]):
 
         return dict_
 
+    def _setHistoryLimit(self, instance, limit):
+        instanceDict = self.__get__(instance)
+        for v in instanceDict._dict.values():
+            v.setHistoryLimit(limit)
+
+    def _hash(self, value):
+        # Instance dicts compare as mappings of all their configs; hashing
+        # only their keys avoids making configs for unused choices.
+        return hash(None if value is None else frozenset(value))
+
     def freeze(self, instance):
         instanceDict = self.__get__(instance)
         instanceDict.freeze()
@@ -582,14 +656,55 @@ class ConfigChoiceField(Field[ConfigInstanceDict]):
             config._collectImports()
             imports |= config._imports
 
-    def save(self, outfile, instance):
+    def _updateFingerprint(self, instance, hash_):
         instanceDict = self.__get__(instance)
-        fullname = _joinNamePath(instance._name, self.name)
-        for v in instanceDict.values():
-            v._save(outfile)
+        for k in sorted(instanceDict._dict):
+            # Configs still at the defaults of their types are left out, so
+            # that building them on access does not change the fingerprint.
+            digest = instance._getSubconfigFingerprint(instanceDict._dict[k])
+            if digest != instanceDict.types[k]._getDefaultPrototype().fingerprint():
+                hash_.update("{}[{!r}]={}\n".format(self.name, k, digest).encode())
         if self.multi:
-            outfile.write("{}.names={!r}\n".format(fullname, sorted(instanceDict.names)))
+            names = None if instanceDict.names is None else sorted(instanceDict.names)
+            hash_.update("{}.names={!r}\n".format(self.name, names).encode())
         else:
+            hash_.update("{}.name={!r}\n".format(self.name, instanceDict.name).encode())
+
+    def _iterNames(self, instance, fullname):
+        instanceDict = self.__get__(instance)
+        for k, v in instanceDict.items():
+            yield from v._iterNames(_joinNamePath(name=fullname, index=k))
+        if self.multi:
+            yield fullname + ".names", instanceDict.names
+        else:
+            yield fullname + ".name", instanceDict.name
+
+    def _save(self, outfile, instance, fullname, imports, reference=None, skipDocs=False):
+        instanceDict = self.__get__(instance)
+        if reference is None:
+            for k, v in instanceDict.items():
+                v._save(outfile, _joinNamePath(name=fullname, index=k), imports, None, skipDocs)
+        else:
+            # Only the configs built in either dict can differ from the
+            # defaults of their types; those not built are stood in for by
+            # the prototypes, so that saving builds nothing.
+            refDict = self.__get__(reference)
+            for k in instanceDict:
+                value = instanceDict._dict.get(k)
+                refValue = refDict._dict.get(k)
+                if value is None and refValue is None:
+                    continue
+                prototype = instanceDict.types[k]._getDefaultPrototype()
+                if value is None:
+                    value = prototype
+                if refValue is None:
+                    refValue = prototype
+                value._save(outfile, _joinNamePath(name=fullname, index=k), imports, refValue, skipDocs)
+        if self.multi:
+            names = None if instanceDict.names is None else sorted(instanceDict.names)
+            if reference is None or names != (None if refDict.names is None else sorted(refDict.names)):
+                outfile.write("{}.names={!r}\n".format(fullname, names))
+        elif reference is None or instanceDict.name != refDict.name:
             outfile.write("{}.name={!r}\n".format(fullname, instanceDict.name))
 
     def __deepcopy__(self, memo):
@@ -609,58 +724,48 @@ class ConfigChoiceField(Field[ConfigInstanceDict]):
         other.source = self.source
         return other
 
-    def _compare(self, instance1, instance2, shortcut, rtol, atol, output):
-        """Compare two fields for equality.
-
-        Used by `lsst.pex.ConfigChoiceField.compare`.
-
-        Parameters
-        ----------
-        instance1 : `lsst.pex.config.Config`
-            Left-hand side config instance to compare.
-        instance2 : `lsst.pex.config.Config`
-            Right-hand side config instance to compare.
-        shortcut : `bool`
-            If `True`, this function returns as soon as an inequality if found.
-        rtol : `float`
-            Relative tolerance for floating point comparisons.
-        atol : `float`
-            Absolute tolerance for floating point comparisons.
-        output : callable
-            A callable that takes a string, used (possibly repeatedly) to
-            report inequalities.
-
-        Returns
-        -------
-        isEqual : bool
-            `True` if the fields are equal, `False` otherwise.
-
-        Notes
-        -----
-        Only the selected configurations are compared, as the parameters of any
-        others do not matter.
-
-        Floating point comparisons are performed by `numpy.allclose`.
-        """
+    def _diff(self, instance1, instance2, fullname, steps, differences):
+        d1 = self.__get__(instance1)
+        d2 = self.__get__(instance2)
+        for k in d1:
+            # Configs not built on either side are at their defaults.
+            if k in d1._dict or k in d2._dict:
+                prototype = d1.types[k]._getDefaultPrototype()
+                c1 = d1._dict.get(k, prototype)
+                c2 = d2._dict.get(k, prototype)
+                name = _joinNamePath(name=fullname, index=k)
+                c1._diff(c2, name, steps + ((self.name, k),), differences)
+        if self.multi:
+            selection1 = None if d1._selection is None else sorted(d1._selection)
+            selection2 = None if d2._selection is None else sorted(d2._selection)
+        else:
+            selection1 = d1._selection
+            selection2 = d2._selection
+        if selection1 != selection2:
+            location = (steps, self.name, None)
+            differences.append(ConfigDifference(fullname, selection1, selection2, "selection", location))
+
+    def _getDiffSubconfig(self, instance, key):
+        return self.__get__(instance)[key]
+
+    def _applyDiff(self, instance, differences, at, label):
+        self.__get__(instance)._setSelection(differences[-1][1].new, at=at, label=label)
+
+    def _gatherComparison(self, instance1, instance2, comparison):
         d1 = getattr(instance1, self.name)
         d2 = getattr(instance2, self.name)
         name = getComparisonName(
             _joinNamePath(instance1._name, self.name), _joinNamePath(instance2._name, self.name)
         )
-        if not compareScalars("selection for %s" % name, d1._selection, d2._selection, output=output):
-            return False
+        if not comparison.compareScalars("selection for %s" % name, d1._selection, d2._selection):
+            return
         if d1._selection is None:
-            return True
+            return
+        # Only the selected configs are compared, as the parameters of any
+        # others do not matter.
         if self.multi:
             nested = [(k, d1[k], d2[k]) for k in d1._selection]
         else:
             nested = [(d1._selection, d1[d1._selection], d2[d1._selection])]
-        equal = True
         for k, c1, c2 in nested:
-            result = compareConfigs(
-                "%s[%r]" % (name, k), c1, c2, shortcut=shortcut, rtol=rtol, atol=atol, output=output
-            )
-            if not result and shortcut:
-                return False
-            equal = equal and result
-        return equal
+            comparison.compareConfigs("%s[%r]" % (name, k), c1, c2)
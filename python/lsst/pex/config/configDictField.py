@@ -27,8 +27,8 @@
 
 __all__ = ["ConfigDictField"]
 
-from .callStack import getCallStack, getStackFrame
-from .comparison import compareConfigs, compareScalars, getComparisonName
+from .callStack import getStackFrame
+from .comparison import ConfigDifference, getComparisonName
 from .config import Config, FieldValidationError, _autocast, _joinNamePath, _typeStr
 from .dictField import Dict, DictField
 
@@ -40,9 +40,9 @@ class ConfigDict(Dict[str, Config]):
     the history of changes to any of its items.
     """
 
-    def __init__(self, config, field, value, at, label):
-        Dict.__init__(self, config, field, value, at, label, setHistory=False)
-        self.history.append(("Dict initialized", at, label))
+    def __init__(self, config, field, value, at, label, check=True):
+        Dict.__init__(self, config, field, value, at, label, setHistory=False, check=check)
+        config._recordHistory(field.name, "Dict initialized", at, label)
 
     def __setitem__(self, k, x, at=None, label="setitem", setHistory=True):
         if self._config._frozen:
@@ -66,29 +66,50 @@ class ConfigDict(Dict[str, Config]):
             )
             raise FieldValidationError(self._field, self._config, msg)
 
+        config = self._config
         if at is None:
-            at = getCallStack()
-        name = _joinNamePath(self._config._name, self._field.name, k)
+            at = config._getCallStack()
+        name = _joinNamePath(config._name, self._field.name, k)
+        historyLimit = config._historyLimit
         oldValue = self._dict.get(k, None)
         if oldValue is None:
             if x == dtype:
-                self._dict[k] = dtype(__name=name, __at=at, __label=label)
+                self._dict[k] = dtype(__name=name, __at=at, __label=label, __historyLimit=historyLimit)
             else:
-                self._dict[k] = dtype(__name=name, __at=at, __label=label, **x._storage)
+                self._dict[k] = dtype(
+                    __name=name, __at=at, __label=label, __historyLimit=historyLimit, **x._storage
+                )
             if setHistory:
-                self.history.append(("Added item at key %s" % k, at, label))
+                config._recordHistory(self._field.name, "Added item at key %s" % k, at, label)
+            else:
+                config._markModified()
         else:
             if x == dtype:
-                x = dtype()
+                x = dtype(__historyLimit=0)
             oldValue.update(__at=at, __label=label, **x._storage)
             if setHistory:
-                self.history.append(("Modified item at key %s" % k, at, label))
+                config._recordHistory(self._field.name, "Modified item at key %s" % k, at, label)
+
+    def _update(self, items, at=None, label="update", setHistory=True, check=True):
+        # Items are always checked, since subconfigs are made from them.
+        if at is None:
+            at = self._config._getCallStack()
+        for k, x in items:
+            self.__setitem__(k, x, at=at, label=label, setHistory=False)
+        if setHistory and items:
+            keys = ", ".join(str(k) for k, _ in items)
+            self._config._recordHistory(self._field.name, "Updated items at keys %s" % keys, at, label)
 
     def __delitem__(self, k, at=None, label="delitem"):
         if at is None:
-            at = getCallStack()
+            at = self._config._getCallStack()
         Dict.__delitem__(self, k, at, label, False)
-        self.history.append(("Removed item at key %s" % k, at, label))
+        self._config._recordHistory(self._field.name, "Removed item at key %s" % k, at, label)
+
+    def _copyTo(self, config, keepHistory):
+        result = Dict._copyTo(self, config, keepHistory)
+        result.__dict__["_dict"] = {k: v.copy(keepHistory) for k, v in self._dict.items()}
+        return result
 
 
 class ConfigDictField(DictField):
@@ -196,12 +217,34 @@ class ConfigDictField(DictField):
         if value is not None:
             for k in value:
                 item = value[k]
-                item.validate()
+                instance._validateSubconfig(item)
                 if self.itemCheck is not None and not self.itemCheck(item):
                     msg = "Item at key %r is not a valid value: %s" % (k, item)
                     raise FieldValidationError(self, instance, msg)
         DictField.validate(self, instance)
 
+    def _makeValidator(self):
+        optional = self.optional
+        itemCheck = self.itemCheck
+        dictCheck = self.dictCheck
+
+        def validator(instance):
+            value = instance._storage[self.name]
+            if value is None:
+                if not optional:
+                    raise FieldValidationError(self, instance, "Required value cannot be None")
+                return
+            for k, item in value._dict.items():
+                instance._validateSubconfig(item)
+                if itemCheck is not None and not itemCheck(item):
+                    msg = "Item at key %r is not a valid value: %s" % (k, item)
+                    raise FieldValidationError(self, instance, msg)
+            if dictCheck is not None and not dictCheck(value):
+                msg = "%s is not a valid value" % str(value)
+                raise FieldValidationError(self, instance, msg)
+
+        return validator
+
     def toDict(self, instance):
         configDict = self.__get__(instance)
         if configDict is None:
@@ -221,68 +264,124 @@ class ConfigDictField(DictField):
                 v._collectImports()
                 imports |= v._imports
 
-    def save(self, outfile, instance):
+    def _getState(self, instance):
         configDict = self.__get__(instance)
-        fullname = _joinNamePath(instance._name, self.name)
         if configDict is None:
-            outfile.write("{}={!r}\n".format(fullname, configDict))
+            return None
+        return {k: v._getState() for k, v in configDict.items()}
+
+    def _setState(self, instance, state, at):
+        if state is None:
+            self.__set__(instance, None, at=at)
+            return
+        self.__set__(instance, {}, at=at)
+        configDict = self.__get__(instance)
+        for k, v in state.items():
+            configDict.__setitem__(k, self.itemtype, at=at)
+            configDict[k]._setState(v, at)
+
+    def _updateFingerprint(self, instance, hash_):
+        configDict = self.__get__(instance)
+        if configDict is None:
+            hash_.update("{}=None\n".format(self.name).encode())
+            return
+        hash_.update("{}={{}}\n".format(self.name).encode())
+        for k, v in configDict.items():
+            digest = instance._getSubconfigFingerprint(v)
+            hash_.update("{}[{!r}]={}:{}\n".format(self.name, k, _typeStr(v), digest).encode())
+
+    def _iterNames(self, instance, fullname):
+        configDict = self.__get__(instance)
+        yield fullname, configDict
+        if configDict is not None:
+            for k, v in configDict.items():
+                name = _joinNamePath(name=fullname, index=k)
+                yield name, v
+                yield from v._iterNames(name)
+
+    def _save(self, outfile, instance, fullname, imports, reference=None, skipDocs=False):
+        configDict = self.__get__(instance)
+        refDict = None if reference is None else self.__get__(reference)
+        if configDict is None:
+            if reference is None or refDict is not None:
+                outfile.write("{}={!r}\n".format(fullname, configDict))
+            return
+
+        if refDict is not None and [(k, type(v)) for k, v in configDict.items()] == [
+            (k, type(v)) for k, v in refDict.items()
+        ]:
+            # Same keys and types: only the values inside can differ.
+            for k, v in configDict.items():
+                v._save(outfile, _joinNamePath(name=fullname, index=k), imports, refDict[k], skipDocs)
             return
 
         outfile.write("{}={!r}\n".format(fullname, {}))
-        for v in configDict.values():
-            outfile.write("{}={}()\n".format(v._name, _typeStr(v)))
-            v._save(outfile)
+        for k, v in configDict.items():
+            name = _joinNamePath(name=fullname, index=k)
+            outfile.write("{}={}()\n".format(name, _typeStr(v)))
+            refValue = None if reference is None else type(v)._getDefaultPrototype()
+            v._save(outfile, name, imports, refValue, skipDocs)
+
+    def _validateDeferred(self, instance):
+        # Items of a ConfigDict are checked as they are stored.
+        pass
+
+    def _setHistoryLimit(self, instance, limit):
+        configDict = self.__get__(instance)
+        if configDict is not None:
+            for v in configDict.values():
+                v.setHistoryLimit(limit)
 
     def freeze(self, instance):
         configDict = self.__get__(instance)
         if configDict is not None:
             for k in configDict:
                 configDict[k].freeze()
+            configDict._freeze()
+
+    def _diff(self, instance1, instance2, fullname, steps, differences):
+        d1 = self.__get__(instance1)
+        d2 = self.__get__(instance2)
+        if d1 is None or d2 is None:
+            if d1 is not d2:
+                d1 = None if d1 is None else dict(d1)
+                d2 = None if d2 is None else dict(d2)
+                differences.append(ConfigDifference(fullname, d1, d2, "value", (steps, self.name, None)))
+            return
+        for k, v1 in d1.items():
+            name = _joinNamePath(name=fullname, index=k)
+            if k in d2:
+                v1._diff(d2[k], name, steps + ((self.name, k),), differences)
+            else:
+                differences.append(ConfigDifference(name, v1, None, "remove", (steps, self.name, k)))
+        for k, v2 in d2.items():
+            if k not in d1:
+                name = _joinNamePath(name=fullname, index=k)
+                differences.append(ConfigDifference(name, None, v2, "add", (steps, self.name, k)))
+
+    def _getDiffSubconfig(self, instance, key):
+        return self.__get__(instance)[key]
+
+    def _applyDiff(self, instance, differences, at, label):
+        if differences[-1][1].kind not in ("add", "remove"):
+            self.__set__(instance, differences[-1][1].new, at=at, label=label)
+            return
+        configDict = self.__get__(instance)
+        for key, difference in differences:
+            if difference.kind == "add":
+                configDict.__setitem__(key, difference.new, at=at, label=label, setHistory=False)
+            else:
+                Dict.__delitem__(configDict, key, at, label, setHistory=False)
+        keys = ", ".join(str(key) for key, _ in differences)
+        instance._recordHistory(self.name, "Applied differences at keys %s" % keys, at, label)
 
-    def _compare(self, instance1, instance2, shortcut, rtol, atol, output):
-        """Compare two fields for equality.
-
-        Used by `lsst.pex.ConfigDictField.compare`.
-
-        Parameters
-        ----------
-        instance1 : `lsst.pex.config.Config`
-            Left-hand side config instance to compare.
-        instance2 : `lsst.pex.config.Config`
-            Right-hand side config instance to compare.
-        shortcut : `bool`
-            If `True`, this function returns as soon as an inequality if found.
-        rtol : `float`
-            Relative tolerance for floating point comparisons.
-        atol : `float`
-            Absolute tolerance for floating point comparisons.
-        output : callable
-            A callable that takes a string, used (possibly repeatedly) to
-            report inequalities.
-
-        Returns
-        -------
-        isEqual : bool
-            `True` if the fields are equal, `False` otherwise.
-
-        Notes
-        -----
-        Floating point comparisons are performed by `numpy.allclose`.
-        """
+    def _gatherComparison(self, instance1, instance2, comparison):
         d1 = getattr(instance1, self.name)
         d2 = getattr(instance2, self.name)
         name = getComparisonName(
             _joinNamePath(instance1._name, self.name), _joinNamePath(instance2._name, self.name)
         )
-        if not compareScalars("keys for %s" % name, set(d1.keys()), set(d2.keys()), output=output):
-            return False
-        equal = True
+        if not comparison.compareScalars("keys for %s" % name, set(d1.keys()), set(d2.keys())):
+            return
         for k, v1 in d1.items():
-            v2 = d2[k]
-            result = compareConfigs(
-                "%s[%r]" % (name, k), v1, v2, shortcut=shortcut, rtol=rtol, atol=atol, output=output
-            )
-            if not result and shortcut:
-                return False
-            equal = equal and result
-        return equal
+            comparison.compareConfigs("%s[%r]" % (name, k), v1, d2[k])
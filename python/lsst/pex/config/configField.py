@@ -27,12 +27,35 @@
 
 __all__ = ["ConfigField"]
 
+import threading
 from typing import Any, Optional, overload
 
-from .callStack import getCallStack, getStackFrame
-from .comparison import compareConfigs, getComparisonName
+from .callStack import getStackFrame
+from .comparison import getComparisonName
 from .config import Config, Field, FieldTypeVar, FieldValidationError, _joinNamePath, _typeStr
 
+_prototypeLock = threading.RLock()
+"""Lock held while a shared default prototype is renamed and used."""
+
+
+class _LazySubconfig:
+    """Placeholder stored by a lazy `ConfigField` until its default subconfig
+    is needed.
+
+    Parameters
+    ----------
+    at : `list` of `lsst.pex.config.callStack.StackFrame`
+        The call stack at which the default was set.
+    label : `str`
+        Event label for the history.
+    """
+
+    __slots__ = ("at", "label")
+
+    def __init__(self, at, label):
+        self.at = at
+        self.label = label
+
 
 class ConfigField(Field[FieldTypeVar]):
     """A configuration field (`~lsst.pex.config.Field` subclass) that takes a
@@ -58,6 +81,9 @@ class ConfigField(Field[FieldTypeVar]):
     deprecated : None or `str`, optional
         A description of why this Field is deprecated, including removal date.
         If not None, the string is appended to the docstring for this Field.
+    lazy : `bool`, optional
+        If `True`, a default-constructed subconfig is only built when it is
+        first accessed. If `None` (default), use `ConfigField.defaultLazy`.
 
     See also
     --------
@@ -78,13 +104,27 @@ class ConfigField(Field[FieldTypeVar]):
 
     Assigning to ``ConfigField`` will update all of the fields in the
     configuration.
+
+    A lazy ``ConfigField`` whose default is ``dtype`` does not build its
+    subconfig when the containing config is constructed. Until the subconfig
+    is read or modified, saving, converting to a `dict`, comparing and
+    validating use a shared default instance of ``dtype`` instead, so large
+    trees of rarely used subconfigs are cheap to construct.
     """
 
-    def __init__(self, doc, dtype=None, default=None, check=None, deprecated=None):
+    defaultLazy = False
+    """Whether ``ConfigField`` instances created without an explicit ``lazy``
+    argument defer building their default subconfig (`bool`).
+    """
+
+    def __init__(self, doc, dtype=None, default=None, check=None, deprecated=None, lazy=None):
         if dtype is None or not issubclass(dtype, Config):
             raise ValueError("dtype=%s is not a subclass of Config" % _typeStr(dtype))
         if default is None:
             default = dtype
+        self.lazy = self.defaultLazy if lazy is None else bool(lazy)
+        """Whether the default subconfig is built on first access (`bool`).
+        """
         source = getStackFrame()
         self._setup(
             doc=doc,
@@ -114,11 +154,53 @@ class ConfigField(Field[FieldTypeVar]):
         else:
             value = instance._storage.get(self.name, None)
             if value is None:
-                at = getCallStack()
-                at.insert(0, self.source)
+                at = [self.source] + instance._getCallStack()
                 self.__set__(instance, self.default, at=at, label="default")
+            elif type(value) is _LazySubconfig:
+                value = self._build(instance, value)
             return value
 
+    def _build(self, instance, lazy):
+        """Build the subconfig a placeholder stands for and store it in the
+        config.
+
+        Frozen configs may be read by several threads at once, so only the
+        first subconfig built is stored, and returned to every thread.
+        """
+        value = self.dtype(
+            __name=_joinNamePath(prefix=instance._name, name=self.name),
+            __at=lazy.at,
+            __label=lazy.label,
+            __historyLimit=instance._historyLimit,
+        )
+        if instance._frozen:
+            value.freeze()
+        with _prototypeLock:
+            stored = instance._storage.get(self.name)
+            if stored is not lazy:
+                return stored
+            instance._storage[self.name] = value
+        if not instance._frozen:
+            # Changes to the new subconfig must reach the parent config.
+            instance._markModified()
+        return value
+
+    def _updateFingerprint(self, instance, hash_):
+        value, _ = self._peek(instance)
+        hash_.update("{}={}\n".format(self.name, instance._getSubconfigFingerprint(value)).encode())
+
+    def _materialize(self, instance):
+        self.__get__(instance)
+
+    def _peek(self, instance):
+        """Return the subconfig without building it, along with whether it
+        is the shared default prototype.
+        """
+        value = instance._storage.get(self.name, None)
+        if type(value) is _LazySubconfig:
+            return self.dtype._getDefaultPrototype(), True
+        return self.__get__(instance), False
+
     def __set__(
         self, instance: Config, value: Optional[FieldTypeVar], at: Any = None, label: str = "assignment"
     ) -> None:
@@ -126,6 +208,10 @@ class ConfigField(Field[FieldTypeVar]):
             raise FieldValidationError(self, instance, "Cannot modify a frozen Config")
         name = _joinNamePath(prefix=instance._name, name=self.name)
 
+        if type(value) is _LazySubconfig:
+            # An unbuilt default subconfig copied from another config.
+            value = self.dtype
+
         if value != self.dtype and type(value) != self.dtype:
             msg = "Value %s is of incorrect type %s. Expected %s" % (
                 value,
@@ -135,22 +221,32 @@ class ConfigField(Field[FieldTypeVar]):
             raise FieldValidationError(self, instance, msg)
 
         if at is None:
-            at = getCallStack()
+            at = instance._getCallStack()
 
+        historyLimit = instance._historyLimit
         oldValue = instance._storage.get(self.name, None)
-        if oldValue is None:
+        if type(oldValue) is _LazySubconfig:
             if value == self.dtype:
-                instance._storage[self.name] = self.dtype(__name=name, __at=at, __label=label)
+                # Still the default; there is nothing to build.
+                instance._recordHistory(self.name, "config value set", at, label)
+                return
+            oldValue = self._build(instance, oldValue)
+        if oldValue is None and value == self.dtype and self.lazy:
+            instance._storage[self.name] = _LazySubconfig(at, label)
+        elif oldValue is None:
+            if value == self.dtype:
+                instance._storage[self.name] = self.dtype(
+                    __name=name, __at=at, __label=label, __historyLimit=historyLimit
+                )
             else:
                 instance._storage[self.name] = self.dtype(
-                    __name=name, __at=at, __label=label, **value._storage
+                    __name=name, __at=at, __label=label, __historyLimit=historyLimit, **value._storage
                 )
         else:
             if value == self.dtype:
-                value = value()
+                value = value(__historyLimit=0)
             oldValue.update(__at=at, __label=label, **value._storage)
-        history = instance._history.setdefault(self.name, [])
-        history.append(("config value set", at, label))
+        instance._recordHistory(self.name, "config value set", at, label)
 
     def rename(self, instance):
         """Rename the field in a `~lsst.pex.config.Config` (for internal use
@@ -171,37 +267,38 @@ class ConfigField(Field[FieldTypeVar]):
         rename each subconfig with the full field name as generated by
         `lsst.pex.config.config._joinNamePath`.
         """
+        value = instance._storage.get(self.name, None)
+        if type(value) is _LazySubconfig:
+            return
         value = self.__get__(instance)
         value._rename(_joinNamePath(instance._name, self.name))
 
-    def _collectImports(self, instance, imports):
-        value = self.__get__(instance)
-        value._collectImports()
-        imports |= value._imports
-
-    def save(self, outfile, instance):
-        """Save this field to a file (for internal use only).
+    def _setHistoryLimit(self, instance, limit):
+        value, isPrototype = self._peek(instance)
+        if not isPrototype:
+            value.setHistoryLimit(limit)
 
-        Parameters
-        ----------
-        outfile : file-like object
-            A writeable field handle.
-        instance : `Config`
-            The `Config` instance that contains this field.
-
-        Notes
-        -----
-        This method is invoked by the `~lsst.pex.config.Config` object that
-        contains this field and should not be called directly.
+    def _collectImports(self, instance, imports):
+        value, isPrototype = self._peek(instance)
+        if isPrototype:
+            with _prototypeLock:
+                value._collectImports()
+                imports |= value._imports
+        else:
+            value._collectImports()
+            imports |= value._imports
 
-        The output consists of the documentation string
-        (`lsst.pex.config.Field.doc`) formatted as a Python comment. The second
-        line is formatted as an assignment: ``{fullname}={value}``.
+    def _iterNames(self, instance, fullname):
+        # docstring inherited from Field
+        value, _ = self._peek(instance)
+        return value._iterNames(fullname)
 
-        This output can be executed with Python.
-        """
-        value = self.__get__(instance)
-        value._save(outfile)
+    def _save(self, outfile, instance, fullname, imports, reference=None, skipDocs=False):
+        # docstring inherited from Field
+        value, _ = self._peek(instance)
+        if reference is not None:
+            reference, _ = self._peek(reference)
+        value._save(outfile, fullname, imports, reference, skipDocs)
 
     def freeze(self, instance):
         """Make this field read-only.
@@ -218,8 +315,26 @@ class ConfigField(Field[FieldTypeVar]):
 
         **Subclasses should implement this method.**
         """
-        value = self.__get__(instance)
-        value.freeze()
+        value, isPrototype = self._peek(instance)
+        if not isPrototype:
+            value.freeze()
+
+    def _copy(self, instance, other, keepHistory):
+        value = instance._storage.get(self.name)
+        if isinstance(value, Config):
+            value = value.copy(keepHistory)
+        other._storage[self.name] = value
+
+    def _getState(self, instance):
+        value = instance._storage.get(self.name, None)
+        if type(value) is _LazySubconfig:
+            # Still the default, which is what unpickling starts from.
+            return None
+        return self.__get__(instance)._getState()
+
+    def _setState(self, instance, state, at):
+        if state is not None:
+            self.__get__(instance)._setState(state, at)
 
     def toDict(self, instance):
         """Convert the field value so that it can be set as the value of an
@@ -246,7 +361,7 @@ class ConfigField(Field[FieldTypeVar]):
         where the keys are the field names in the subconfig, and the values are
         the field values in the subconfig.
         """
-        value = self.__get__(instance)
+        value, _ = self._peek(instance)
         return value.toDict()
 
     def validate(self, instance):
@@ -274,46 +389,46 @@ class ConfigField(Field[FieldTypeVar]):
         `lsst.pex.config.field.Field.validate` if they re-implement
         `~lsst.pex.config.field.Field.validate`.
         """
-        value = self.__get__(instance)
-        value.validate()
+        value, isPrototype = self._peek(instance)
+        if isPrototype:
+            with _prototypeLock:
+                value._rename(_joinNamePath(instance._name, self.name))
+                value.validate()
+        else:
+            instance._validateSubconfig(value)
 
         if self.check is not None and not self.check(value):
             msg = "%s is not a valid value" % str(value)
             raise FieldValidationError(self, instance, msg)
 
-    def _compare(self, instance1, instance2, shortcut, rtol, atol, output):
-        """Compare two fields for equality.
-
-        Used by `ConfigField.compare`.
-
-        Parameters
-        ----------
-        instance1 : `lsst.pex.config.Config`
-            Left-hand side config instance to compare.
-        instance2 : `lsst.pex.config.Config`
-            Right-hand side config instance to compare.
-        shortcut : `bool`
-            If `True`, this function returns as soon as an inequality if found.
-        rtol : `float`
-            Relative tolerance for floating point comparisons.
-        atol : `float`
-            Absolute tolerance for floating point comparisons.
-        output : callable
-            A callable that takes a string, used (possibly repeatedly) to
-            report inequalities.
-
-        Returns
-        -------
-        isEqual : bool
-            `True` if the fields are equal, `False` otherwise.
-
-        Notes
-        -----
-        Floating point comparisons are performed by `numpy.allclose`.
-        """
-        c1 = getattr(instance1, self.name)
-        c2 = getattr(instance2, self.name)
+    def _makeValidator(self):
+        check = self.check
+
+        def validator(instance):
+            value = instance._storage.get(self.name)
+            if not isinstance(value, Config):
+                # Unbuilt subconfigs are validated through their prototype.
+                self.validate(instance)
+                return
+            instance._validateSubconfig(value)
+            if check is not None and not check(value):
+                msg = "%s is not a valid value" % str(value)
+                raise FieldValidationError(self, instance, msg)
+
+        return validator
+
+    def _diff(self, instance1, instance2, fullname, steps, differences):
+        c1, _ = self._peek(instance1)
+        c2, _ = self._peek(instance2)
+        c1._diff(c2, fullname, steps + ((self.name, None),), differences)
+
+    def _getDiffSubconfig(self, instance, key):
+        return self.__get__(instance)
+
+    def _gatherComparison(self, instance1, instance2, comparison):
+        c1, _ = self._peek(instance1)
+        c2, _ = self._peek(instance2)
         name = getComparisonName(
             _joinNamePath(instance1._name, self.name), _joinNamePath(instance2._name, self.name)
         )
-        return compareConfigs(name, c1, c2, shortcut=shortcut, rtol=rtol, atol=atol, output=output)
+        comparison.compareConfigs(name, c1, c2)
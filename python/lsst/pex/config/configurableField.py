@@ -33,8 +33,8 @@ import copy
 import weakref
 from typing import Any, Generic, Mapping, Union, overload
 
-from .callStack import getCallStack, getStackFrame
-from .comparison import compareConfigs, getComparisonName
+from .callStack import getStackFrame
+from .comparison import ConfigDifference, getComparisonName
 from .config import (
     Config,
     Field,
@@ -76,7 +76,9 @@ class ConfigurableInstance(Generic[FieldTypeVar]):
             storage = self._field.default._storage
         else:
             storage = {}
-        value = self._ConfigClass(__name=name, __at=at, __label=label, **storage)
+        value = self._ConfigClass(
+            __name=name, __at=at, __label=label, __historyLimit=self._config._historyLimit, **storage
+        )
         object.__setattr__(self, "_value", value)
 
     def __init__(self, config, field, at=None, label="default"):
@@ -88,12 +90,11 @@ class ConfigurableInstance(Generic[FieldTypeVar]):
         object.__setattr__(self, "_value", None)
 
         if at is None:
-            at = getCallStack()
-        at += [self._field.source]
+            at = config._getCallStack()
+        at = at + [self._field.source]
         self.__initValue(at, label)
 
-        history = config._history.setdefault(field.name, [])
-        history.append(("Targeted and initialized from defaults", at, label))
+        config._recordHistory(field.name, "Targeted and initialized from defaults", at, label)
 
     @property
     def _config(self) -> Config:
@@ -137,15 +138,14 @@ class ConfigurableInstance(Generic[FieldTypeVar]):
             raise FieldValidationError(self._field, self._config, e.message)
 
         if at is None:
-            at = getCallStack()
+            at = self._config._getCallStack()
         object.__setattr__(self, "_target", target)
         if ConfigClass != self.ConfigClass:
             object.__setattr__(self, "_ConfigClass", ConfigClass)
             self.__initValue(at, label)
 
-        history = self._config._history.setdefault(self._field.name, [])
         msg = "retarget(target=%s, ConfigClass=%s)" % (_typeStr(target), _typeStr(ConfigClass))
-        history.append((msg, at, label))
+        self._config._recordHistory(self._field.name, msg, at, label)
 
     def __getattr__(self, name):
         return getattr(self._value, name)
@@ -164,7 +164,7 @@ class ConfigurableInstance(Generic[FieldTypeVar]):
             object.__setattr__(self, name, value)
         else:
             if at is None:
-                at = getCallStack()
+                at = self._config._getCallStack()
             self._value.__setattr__(name, value, at=at, label=label)
 
     def __delattr__(self, name, at=None, label="delete"):
@@ -181,9 +181,20 @@ class ConfigurableInstance(Generic[FieldTypeVar]):
             object.__delattr__(self, name)
         except AttributeError:
             if at is None:
-                at = getCallStack()
+                at = self._config._getCallStack()
             self._value.__delattr__(name, at=at, label=label)
 
+    def _copyTo(self, config, keepHistory):
+        """Return a copy of this instance, and of its config, owned by
+        another config.
+        """
+        result = object.__new__(type(self))
+        result.__dict__.update(self.__dict__)
+        result.__dict__["_config_"] = weakref.ref(config)
+        result.__dict__["__doc__"] = config
+        result.__dict__["_value"] = self._value.copy(keepHistory)
+        return result
+
     def __reduce__(self):
         raise UnexpectedProxyUsageError(
             f"Proxy object for config field {self._field.name} cannot "
@@ -320,7 +331,7 @@ class ConfigurableField(Field[ConfigurableInstance[FieldTypeVar]]):
         value = instance._storage.get(self.name, None)
         if value is None:
             if at is None:
-                at = getCallStack(1)
+                at = instance._getCallStack(1)
             value = ConfigurableInstance(instance, self, at=at, label=label)
             instance._storage[self.name] = value
         return value
@@ -347,7 +358,7 @@ class ConfigurableField(Field[ConfigurableInstance[FieldTypeVar]]):
         if instance._frozen:
             raise FieldValidationError(self, instance, "Cannot modify a frozen Config")
         if at is None:
-            at = getCallStack()
+            at = instance._getCallStack()
         oldValue = self.__getOrMake(instance, at=at)
 
         if isinstance(value, ConfigurableInstance):
@@ -356,7 +367,7 @@ class ConfigurableField(Field[ConfigurableInstance[FieldTypeVar]]):
         elif type(value) == oldValue._ConfigClass:
             oldValue.update(__at=at, __label=label, **value._storage)
         elif value == oldValue.ConfigClass:
-            value = oldValue.ConfigClass()
+            value = oldValue.ConfigClass(__historyLimit=0)
             oldValue.update(__at=at, __label=label, **value._storage)
         else:
             msg = "Value %s is of incorrect type %s. Expected %s" % (
@@ -378,39 +389,95 @@ class ConfigurableField(Field[ConfigurableInstance[FieldTypeVar]]):
         value.value._collectImports()
         imports |= value.value._imports
 
-    def save(self, outfile, instance):
-        fullname = _joinNamePath(instance._name, self.name)
+    def _updateFingerprint(self, instance, hash_):
+        value = self.__getOrMake(instance)
+        digest = instance._getSubconfigFingerprint(value._value)
+        target = _typeStr(value.target)
+        hash_.update("{}={}:{}:{}\n".format(self.name, target, _typeStr(value.ConfigClass), digest).encode())
+
+    def _iterNames(self, instance, fullname):
+        return self.__getOrMake(instance)._value._iterNames(fullname)
+
+    def _save(self, outfile, instance, fullname, imports, reference=None, skipDocs=False):
         value = self.__getOrMake(instance)
         target = value.target
+        ConfigClass = value.ConfigClass
+        imports.add(target.__module__)
 
-        if target != self.target:
+        if reference is None:
             # not targeting the field-default target.
             # save target information
-            ConfigClass = value.ConfigClass
+            retarget = target != self.target
+            refValue = None
+        else:
+            refInstance = self.__getOrMake(reference)
+            retarget = target != refInstance.target or ConfigClass != refInstance.ConfigClass
+            if ConfigClass == refInstance.ConfigClass:
+                refValue = refInstance._value
+            elif type(self.default) is ConfigClass:
+                # What retarget builds for a new ConfigClass.
+                refValue = self.default
+            else:
+                refValue = ConfigClass._getDefaultPrototype()
+        if retarget:
             outfile.write(
                 "{}.retarget(target={}, ConfigClass={})\n\n".format(
                     fullname, _typeStr(target), _typeStr(ConfigClass)
                 )
             )
         # save field values
-        value._save(outfile)
+        value._value._save(outfile, fullname, imports, refValue, skipDocs)
+
+    def _setHistoryLimit(self, instance, limit):
+        value = self.__getOrMake(instance)
+        value._value.setHistoryLimit(limit)
 
     def freeze(self, instance):
         value = self.__getOrMake(instance)
         value.freeze()
 
+    def _copy(self, instance, other, keepHistory):
+        value = instance._storage.get(self.name)
+        if value is not None:
+            other._storage[self.name] = value._copyTo(other, keepHistory)
+
+    def _getState(self, instance):
+        value = self.__getOrMake(instance)
+        return (value.target, value.ConfigClass, value._value._getState())
+
+    def _setState(self, instance, state, at):
+        target, ConfigClass, valueState = state
+        value = self.__getOrMake(instance, at=at)
+        if target != value.target or ConfigClass != value.ConfigClass:
+            value.retarget(target, ConfigClass, at=at)
+        value._value._setState(valueState, at)
+
     def toDict(self, instance):
         value = self.__get__(instance)
         return value.toDict()
 
     def validate(self, instance):
         value = self.__get__(instance)
-        value.validate()
+        instance._validateSubconfig(value._value)
 
         if self.check is not None and not self.check(value):
             msg = "%s is not a valid value" % str(value)
             raise FieldValidationError(self, instance, msg)
 
+    def _makeValidator(self):
+        check = self.check
+
+        def validator(instance):
+            value = instance._storage.get(self.name)
+            if value is None:
+                value = self.__get__(instance)
+            instance._validateSubconfig(value._value)
+            if check is not None and not check(value):
+                msg = "%s is not a valid value" % str(value)
+                raise FieldValidationError(self, instance, msg)
+
+        return validator
+
     def __deepcopy__(self, memo):
         """Customize deep-copying, because we always want a reference to the
         original typemap.
@@ -425,39 +492,33 @@ class ConfigurableField(Field[ConfigurableInstance[FieldTypeVar]]):
             default=copy.deepcopy(self.default),
         )
 
-    def _compare(self, instance1, instance2, shortcut, rtol, atol, output):
-        """Compare two fields for equality.
-
-        Used by `lsst.pex.ConfigDictField.compare`.
-
-        Parameters
-        ----------
-        instance1 : `lsst.pex.config.Config`
-            Left-hand side config instance to compare.
-        instance2 : `lsst.pex.config.Config`
-            Right-hand side config instance to compare.
-        shortcut : `bool`
-            If `True`, this function returns as soon as an inequality if found.
-        rtol : `float`
-            Relative tolerance for floating point comparisons.
-        atol : `float`
-            Absolute tolerance for floating point comparisons.
-        output : callable
-            A callable that takes a string, used (possibly repeatedly) to
-            report inequalities. For example: `print`.
-
-        Returns
-        -------
-        isEqual : bool
-            `True` if the fields are equal, `False` otherwise.
-
-        Notes
-        -----
-        Floating point comparisons are performed by `numpy.allclose`.
-        """
+    def _diff(self, instance1, instance2, fullname, steps, differences):
+        v1 = self.__getOrMake(instance1)
+        v2 = self.__getOrMake(instance2)
+        c1 = v1._value
+        if v1.target != v2.target or v1.ConfigClass != v2.ConfigClass:
+            old = (v1.target, v1.ConfigClass)
+            new = (v2.target, v2.ConfigClass)
+            differences.append(ConfigDifference(fullname, old, new, "retarget", (steps, self.name, None)))
+            if v1.ConfigClass != v2.ConfigClass:
+                # Compare with what the retarget builds.
+                if type(self.default) is v2.ConfigClass:
+                    c1 = self.default
+                else:
+                    c1 = v2.ConfigClass._getDefaultPrototype()
+        c1._diff(v2._value, fullname, steps + ((self.name, None),), differences)
+
+    def _getDiffSubconfig(self, instance, key):
+        return self.__getOrMake(instance)._value
+
+    def _applyDiff(self, instance, differences, at, label):
+        target, ConfigClass = differences[-1][1].new
+        self.__getOrMake(instance).retarget(target, ConfigClass, at=at, label=label)
+
+    def _gatherComparison(self, instance1, instance2, comparison):
         c1 = getattr(instance1, self.name)._value
         c2 = getattr(instance2, self.name)._value
         name = getComparisonName(
             _joinNamePath(instance1._name, self.name), _joinNamePath(instance2._name, self.name)
         )
-        return compareConfigs(name, c1, c2, shortcut=shortcut, rtol=rtol, atol=atol, output=output)
+        comparison.compareConfigs(name, c1, c2)
@@ -0,0 +1,403 @@
+# This file is part of pex_config.
+#
+# Developed for the LSST Data Management System.
+# This product includes software developed by the LSST Project
+# (http://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This software is dual licensed under the GNU General Public License and also
+# under a 3-clause BSD license. Recipients may choose which of these licenses
+# to use; please see the files gpl-3.0.txt and/or bsd_license.txt,
+# respectively.  If you choose the GPL option then the following text applies
+# (but note that there is still no warranty even if you opt for BSD instead):
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+__all__ = ("DeclarativeOverride", "compileOverride")
+
+import ast
+import importlib
+import sys
+
+from .callStack import StackFrame
+
+_BUILTINS = {"float": float, "int": int, "complex": complex, "str": str, "bool": bool}
+"""Builtins that declarative overrides may call, e.g. ``float('nan')``."""
+
+_METHODS = frozenset(("retarget",))
+"""Methods that declarative overrides may call on part of a config."""
+
+_COMPARISONS = {
+    ast.Eq: lambda a, b: a == b,
+    ast.NotEq: lambda a, b: a != b,
+    ast.Is: lambda a, b: a is b,
+    ast.IsNot: lambda a, b: a is not b,
+}
+
+
+class _NotDeclarative(Exception):
+    """Raised when an override uses code outside the declarative subset."""
+
+
+def _convertTarget(node):
+    """Convert the target of an assignment or method call into the name of
+    the root variable and a path of ``("attr", name)`` and ``("item", key)``
+    steps.
+    """
+    path = []
+    while not isinstance(node, ast.Name):
+        if isinstance(node, ast.Attribute):
+            path.append(("attr", node.attr))
+            node = node.value
+        elif isinstance(node, ast.Subscript):
+            key = node.slice
+            if type(key).__name__ == "Index":
+                # Python 3.8 wraps subscripts.
+                key = key.value
+            path.append(("item", _convertValue(key)))
+            node = node.value
+        else:
+            raise _NotDeclarative()
+    if not path:
+        raise _NotDeclarative()
+    path.reverse()
+    return node.id, tuple(path)
+
+
+def _convertValue(node):
+    """Convert an expression into nested tuples that `_Evaluator` accepts."""
+    if isinstance(node, ast.Constant):
+        return ("const", node.value)
+    elif isinstance(node, ast.Name):
+        return ("name", node.id)
+    elif isinstance(node, ast.Attribute):
+        return ("attr", _convertValue(node.value), node.attr)
+    elif isinstance(node, ast.Call):
+        if any(kw.arg is None for kw in node.keywords):
+            raise _NotDeclarative()
+        return (
+            "call",
+            _convertValue(node.func),
+            tuple(_convertValue(arg) for arg in node.args),
+            tuple((kw.arg, _convertValue(kw.value)) for kw in node.keywords),
+        )
+    elif isinstance(node, (ast.Tuple, ast.List, ast.Set)):
+        return (type(node).__name__.lower(), tuple(_convertValue(elt) for elt in node.elts))
+    elif isinstance(node, ast.Dict):
+        if any(key is None for key in node.keys):
+            raise _NotDeclarative()
+        return (
+            "dict",
+            tuple(_convertValue(key) for key in node.keys),
+            tuple(_convertValue(value) for value in node.values),
+        )
+    elif isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+        return ("neg" if isinstance(node.op, ast.USub) else "pos", _convertValue(node.operand))
+    elif isinstance(node, ast.BinOp) and isinstance(node.op, ast.Mod):
+        return ("mod", _convertValue(node.left), _convertValue(node.right))
+    elif isinstance(node, ast.Compare) and len(node.ops) == 1 and type(node.ops[0]) in _COMPARISONS:
+        op = type(node.ops[0]).__name__
+        return ("compare", op, _convertValue(node.left), _convertValue(node.comparators[0]))
+    raise _NotDeclarative()
+
+
+def _convertStatement(node):
+    """Convert a statement into a list of operations."""
+    if isinstance(node, ast.Import):
+        return [("import", node.lineno, alias.name, alias.asname) for alias in node.names]
+    elif isinstance(node, ast.ImportFrom):
+        if node.level or any(alias.name == "*" for alias in node.names):
+            raise _NotDeclarative()
+        names = tuple((alias.name, alias.asname) for alias in node.names)
+        return [("from", node.lineno, node.module, names)]
+    elif isinstance(node, ast.Assign) and len(node.targets) == 1:
+        root, path = _convertTarget(node.targets[0])
+        return [("set", node.lineno, root, path, _convertValue(node.value))]
+    elif isinstance(node, ast.Assert):
+        msg = _convertValue(node.msg) if node.msg is not None else None
+        return [("assert", node.lineno, _convertValue(node.test), msg)]
+    elif isinstance(node, ast.Expr):
+        value = node.value
+        if isinstance(value, ast.Constant):
+            # A docstring or other bare literal does nothing.
+            return []
+        if isinstance(value, ast.Call) and isinstance(value.func, ast.Attribute):
+            if value.func.attr in _METHODS:
+                call = _convertValue(value)
+                root, path = _convertTarget(value.func.value)
+                return [("call", node.lineno, root, path, value.func.attr, call[2], call[3])]
+    elif isinstance(node, ast.Pass):
+        return []
+    raise _NotDeclarative()
+
+
+class _Evaluator:
+    """Evaluate converted expressions for a particular config.
+
+    Parameters
+    ----------
+    config : `lsst.pex.config.Config`
+        The config being overridden.
+    root : `str`
+        Name of the variable that refers to ``config``.
+    """
+
+    def __init__(self, config, root):
+        self.config = config
+        self.root = root
+        self.namespace = {}
+
+    def doImport(self, module, asname):
+        """Execute ``import module [as asname]``."""
+        value = importlib.import_module(module)
+        if asname is None:
+            asname = module.partition(".")[0]
+            value = sys.modules[asname]
+        self.namespace[asname] = value
+
+    def doImportFrom(self, module, names):
+        """Execute ``from module import name [as asname], ...``."""
+        value = importlib.import_module(module)
+        for name, asname in names:
+            try:
+                self.namespace[asname or name] = getattr(value, name)
+            except AttributeError:
+                self.namespace[asname or name] = importlib.import_module(f"{module}.{name}")
+
+    def evaluate(self, node):
+        """Evaluate a converted expression."""
+        kind = node[0]
+        if kind == "const":
+            return node[1]
+        elif kind == "name":
+            if node[1] in self.namespace:
+                return self.namespace[node[1]]
+            elif node[1] in _BUILTINS:
+                return _BUILTINS[node[1]]
+            # Reading the config, or an unknown name.
+            raise _NotDeclarative()
+        elif kind == "attr":
+            return getattr(self.evaluate(node[1]), node[2])
+        elif kind == "call":
+            _, func, args, kwargs = node
+            if func == ("name", "type") and args == (("name", self.root),) and "type" not in self.namespace:
+                return type(self.config)
+            func = self.evaluate(func)
+            args = [self.evaluate(arg) for arg in args]
+            kwargs = {name: self.evaluate(value) for name, value in kwargs}
+            if any(func is f for f in _BUILTINS.values()):
+                return func(*args, **kwargs)
+            from .config import Config
+
+            if isinstance(func, type) and issubclass(func, Config) and not args and not kwargs:
+                return func()
+            raise _NotDeclarative()
+        elif kind in ("tuple", "list", "set"):
+            return {"tuple": tuple, "list": list, "set": set}[kind](self.evaluate(elt) for elt in node[1])
+        elif kind == "dict":
+            return {self.evaluate(k): self.evaluate(v) for k, v in zip(node[1], node[2])}
+        elif kind in ("neg", "pos"):
+            value = self.evaluate(node[1])
+            if not isinstance(value, (int, float, complex)):
+                raise _NotDeclarative()
+            return -value if kind == "neg" else +value
+        elif kind == "mod":
+            left = self.evaluate(node[1])
+            if not isinstance(left, str):
+                raise _NotDeclarative()
+            return left % self.evaluate(node[2])
+        elif kind == "compare":
+            compare = _COMPARISONS[getattr(ast, node[1])]
+            return compare(self.evaluate(node[2]), self.evaluate(node[3]))
+        raise _NotDeclarative()
+
+    def evaluatePath(self, root, path):
+        """Evaluate the keys in the path of an assignment or call."""
+        if root != self.root:
+            raise _NotDeclarative()
+        return [(kind, self.evaluate(key) if kind == "item" else key) for kind, key in path]
+
+
+class DeclarativeOverride:
+    """Config override code that only assigns values to parts of a config,
+    applied without executing it.
+
+    Parameters
+    ----------
+    operations : `tuple`
+        The operations of the override, as converted by `compileOverride`.
+    source : `str` or `bytes`
+        The source of the override, compiled if it cannot be applied
+        declaratively after all.
+    filename : `str`
+        Name of the file the override came from.
+
+    Notes
+    -----
+    A declarative override consists only of imports, the type assertion
+    written by `lsst.pex.config.Config.saveToStream`, and assignments to
+    attributes and items of the config, whose values are literals,
+    ``float('nan')`` and similar builtin conversions, names imported by the
+    override, or default-constructed configs (``module.SomeConfig()``). It
+    may also call ``retarget`` on parts of the config with such values.
+
+    Applying the override runs its imports first and then evaluates every
+    value, so an override that turns out not to be declarative (for example
+    because it reads the config) is detected before the config is modified.
+    Assignments go through the usual field descriptors, with the history
+    recording the line of the override that made each of them.
+
+    See also
+    --------
+    compileOverride
+    """
+
+    __slots__ = ("operations", "source", "filename", "_code")
+
+    def __init__(self, operations, source, filename):
+        self.operations = operations
+        self.source = source
+        self.filename = filename
+        self._code = None
+
+    def compile(self):
+        """Compile the override as ordinary Python code.
+
+        Returns
+        -------
+        code : `types.CodeType`
+            The compiled code.
+        """
+        if self._code is None:
+            self._code = compile(self.source, filename=self.filename, mode="exec")
+        return self._code
+
+    def apply(self, config, root="config"):
+        """Apply the override to a config, if it is declarative.
+
+        Parameters
+        ----------
+        config : `lsst.pex.config.Config`
+            The config to override.
+        root : `str`, optional
+            Name of the variable in the override that refers to ``config``.
+
+        Returns
+        -------
+        applied : `bool`
+            `True` if the override was applied; `False` if it does more than
+            assign values to ``root``, in which case ``config`` is unchanged
+            and the override must be executed instead (see `compile`).
+        """
+        evaluator = _Evaluator(config, root)
+        modules = set(sys.modules)
+        for op in self.operations:
+            if op[0] == "import":
+                evaluator.doImport(op[2], op[3])
+            elif op[0] == "from":
+                evaluator.doImportFrom(op[2], op[3])
+        config._imports.update(set(sys.modules) - modules)
+
+        actions = []
+        try:
+            for op in self.operations:
+                kind, lineno = op[:2]
+                if kind == "set":
+                    path = evaluator.evaluatePath(op[2], op[3])
+                    actions.append((lineno, path, None, evaluator.evaluate(op[4]), None))
+                elif kind == "call":
+                    path = evaluator.evaluatePath(op[2], op[3])
+                    args = [evaluator.evaluate(arg) for arg in op[5]]
+                    kwargs = {name: evaluator.evaluate(value) for name, value in op[6]}
+                    actions.append((lineno, path, op[4], args, kwargs))
+                elif kind == "assert" and not evaluator.evaluate(op[2]):
+                    if op[3] is None:
+                        raise AssertionError()
+                    raise AssertionError(evaluator.evaluate(op[3]))
+        except _NotDeclarative:
+            return False
+
+        stack = config._getCallStack()
+        for lineno, path, method, value, kwargs in actions:
+            at = stack + [StackFrame(self.filename, lineno, "<module>")]
+            if method is None:
+                _assign(config, path, value, at)
+            else:
+                getattr(_walk(config, path), method)(*value, at=at, **kwargs)
+        return True
+
+
+def _walk(config, path):
+    """Return the object that a path leads to."""
+    obj = config
+    for kind, key in path:
+        obj = getattr(obj, key) if kind == "attr" else obj[key]
+    return obj
+
+
+def _assign(config, path, value, at):
+    """Assign a value to the end of a path, recording ``at`` in the history
+    where the object being modified supports it.
+    """
+    from .config import Config
+    from .configChoiceField import ConfigInstanceDict
+    from .configurableField import ConfigurableInstance
+    from .dictField import Dict
+    from .listField import List
+
+    obj = _walk(config, path[:-1])
+    kind, key = path[-1]
+    if kind == "attr":
+        if isinstance(obj, (Config, ConfigurableInstance, ConfigInstanceDict, List, Dict)):
+            obj.__setattr__(key, value, at=at)
+        else:
+            setattr(obj, key, value)
+    elif isinstance(obj, (ConfigInstanceDict, List, Dict)):
+        obj.__setitem__(key, value, at=at)
+    else:
+        obj[key] = value
+
+
+def compileOverride(source, filename):
+    """Compile config override code, declaratively if possible.
+
+    Parameters
+    ----------
+    source : `str` or `bytes`
+        The override code.
+    filename : `str`
+        Name of the file the code came from, used for error reporting.
+
+    Returns
+    -------
+    override : `DeclarativeOverride` or `types.CodeType`
+        The declarative form of the override, or the compiled code if it is
+        not declarative.
+
+    Raises
+    ------
+    SyntaxError
+        Raised if the code is not valid Python.
+    """
+    try:
+        tree = ast.parse(source, filename=filename, mode="exec")
+    except (SyntaxError, ValueError):
+        # Let compile report the problem.
+        return compile(source, filename=filename, mode="exec")
+    try:
+        operations = tuple(op for node in tree.body for op in _convertStatement(node))
+    except _NotDeclarative:
+        return compile(tree, filename=filename, mode="exec")
+    return DeclarativeOverride(operations, source, filename)
@@ -31,21 +31,62 @@ __all__ = ["DictField"]
 
 import collections.abc
 import sys
+import types
 import weakref
 from typing import Any, ForwardRef, Generic, Iterator, Mapping, Type, TypeVar, Union, cast
 
-from .callStack import getCallStack, getStackFrame
-from .comparison import compareScalars, getComparisonName
+from .callStack import getStackFrame
+from .comparison import ConfigDifference, getComparisonName
 from .config import (
     Config,
     Field,
     FieldValidationError,
     UnexpectedProxyUsageError,
     _autocast,
+    _deferValidation,
+    _HistoryDelta,
     _joinNamePath,
     _typeStr,
 )
 
+
+class _DictDelta(_HistoryDelta):
+    """History entry recording an assignment to, or deletion of, a key of a
+    `Dict`.
+    """
+
+    __slots__ = ("key", "item", "delete")
+
+    def __init__(self, key, item=None, delete=False):
+        self.key = key
+        self.item = item
+        self.delete = delete
+
+    def apply(self, value):
+        value = dict(value)
+        if self.delete:
+            del value[self.key]
+        else:
+            value[self.key] = self.item
+        return value
+
+
+class _DictUpdateDelta(_HistoryDelta):
+    """History entry recording an assignment to several keys of a `Dict`
+    at once.
+    """
+
+    __slots__ = ("items",)
+
+    def __init__(self, items):
+        self.items = items
+
+    def apply(self, value):
+        value = dict(value)
+        value.update(self.items)
+        return value
+
+
 KeyTypeVar = TypeVar("KeyTypeVar")
 ItemTypeVar = TypeVar("ItemTypeVar")
 
@@ -62,22 +103,21 @@ class Dict(*_bases):
     This class emulates a `dict`, but adds validation and provenance.
     """
 
-    def __init__(self, config, field, value, at, label, setHistory=True):
+    def __init__(self, config, field, value, at, label, setHistory=True, check=True):
         self._field = field
         self._config_ = weakref.ref(config)
         self._dict = {}
-        self._history = self._config._history.setdefault(self._field.name, [])
         self.__doc__ = field.doc
         if value is not None:
             try:
-                for k in value:
-                    # do not set history per-item
-                    self.__setitem__(k, value[k], at=at, label=label, setHistory=False)
+                # do not set history per-item
+                items = [(k, value[k]) for k in value]
+                self._update(items, at=at, label=label, setHistory=False, check=check)
             except TypeError:
                 msg = "Value %s is of incorrect type %s. Mapping type expected." % (value, _typeStr(value))
                 raise FieldValidationError(self._field, self._config, msg)
         if setHistory:
-            self._history.append((dict(self._dict), at, label))
+            config._recordHistory(self._field.name, dict(self._dict), at, label)
 
     @property
     def _config(self) -> Config:
@@ -87,7 +127,7 @@ class Dict(*_bases):
         assert value is not None
         return value
 
-    history = property(lambda x: x._history)
+    history = property(lambda x: x._config._decodeHistory(x._field.name))
     """History (read-only).
     """
 
@@ -103,15 +143,35 @@ class Dict(*_bases):
     def __contains__(self, k: Any) -> bool:
         return k in self._dict
 
-    def __setitem__(
-        self, k: KeyTypeVar, x: ItemTypeVar, at: Any = None, label: str = "setitem", setHistory: bool = True
-    ) -> None:
-        if self._config._frozen:
-            msg = "Cannot modify a frozen Config. Attempting to set item at key %r to value %s" % (k, x)
-            raise FieldValidationError(self._field, self._config, msg)
+    def _castItem(self, k, x, check=True):
+        """Cast and validate a key and its item.
 
-        # validate keytype
+        Parameters
+        ----------
+        k : object
+            The key.
+        x : object
+            The item.
+        check : `bool`, optional
+            If `False`, the key and item are cast but not validated.
+
+        Returns
+        -------
+        k, x : `tuple`
+            The cast key and item.
+
+        Raises
+        ------
+        FieldValidationError
+            Raised if the key or item does not have the appropriate type for
+            this field, or the item does not pass the field's
+            `DictField.itemCheck` method.
+        """
         k = _autocast(k, self._field.keytype)
+        if not check:
+            return k, _autocast(x, self._field.itemtype)
+
+        # validate keytype
         if type(k) != self._field.keytype:
             msg = "Key %r is of type %s, expected type %s" % (k, _typeStr(k), _typeStr(self._field.keytype))
             raise FieldValidationError(self._field, self._config, msg)
@@ -136,13 +196,72 @@ class Dict(*_bases):
         if self._field.itemCheck is not None and not self._field.itemCheck(x):
             msg = "Item at key %r is not a valid value: %s" % (k, x)
             raise FieldValidationError(self._field, self._config, msg)
+        return k, x
 
-        if at is None:
-            at = getCallStack()
+    def __setitem__(
+        self, k: KeyTypeVar, x: ItemTypeVar, at: Any = None, label: str = "setitem", setHistory: bool = True
+    ) -> None:
+        if self._config._frozen:
+            msg = "Cannot modify a frozen Config. Attempting to set item at key %r to value %s" % (k, x)
+            raise FieldValidationError(self._field, self._config, msg)
 
+        k, x = self._castItem(k, x)
         self._dict[k] = x
         if setHistory:
-            self._history.append((dict(self._dict), at, label))
+            if at is None:
+                at = self._config._getCallStack()
+            delta = _DictDelta(k, x)
+            self._config._recordHistoryDelta(self._field.name, delta, self._dict, at, label)
+        else:
+            self._config._markModified()
+
+    def update(self, other=(), /, **kwds):
+        """Update the mapping from a mapping or iterable of key-value pairs
+        and from keyword arguments, like `dict.update`.
+
+        All items are validated before any is stored, and a single history
+        entry is recorded for them.
+        """
+        if isinstance(other, collections.abc.Mapping):
+            items = [(k, other[k]) for k in other]
+        elif hasattr(other, "keys"):
+            items = [(k, other[k]) for k in other.keys()]
+        else:
+            items = list(other)
+        items.extend(kwds.items())
+        self._update(items)
+
+    def _update(self, items, at=None, label="update", setHistory=True, check=True):
+        """Store several items at once.
+
+        Parameters
+        ----------
+        items : `list` of `tuple`
+            Key-value pairs to store.
+        at : `list` of `lsst.pex.config.callStack.StackFrame`, optional
+            The call stack (created by
+            `lsst.pex.config.callStack.getLazyCallStack`).
+        label : `str`, optional
+            Event label for the history.
+        setHistory : `bool`, optional
+            Enable setting the field's history, using the value of the ``at``
+            parameter. Default is `True`.
+        check : `bool`, optional
+            If `False`, items are cast but not validated.
+        """
+        if self._config._frozen:
+            raise FieldValidationError(self._field, self._config, "Cannot modify a frozen Config")
+        if not items:
+            return
+        castItems = dict(self._castItem(k, x, check) for k, x in items)
+        self._dict.update(castItems)
+        if setHistory:
+            if at is None:
+                at = self._config._getCallStack()
+            delta = _DictUpdateDelta(castItems)
+            self._config._recordHistoryDelta(self._field.name, delta, self._dict, at, label)
+        else:
+            self._config._markModified()
 
     def __delitem__(
         self, k: KeyTypeVar, at: Any = None, label: str = "delitem", setHistory: bool = True
@@ -153,20 +272,28 @@ class Dict(*_bases):
         del self._dict[k]
         if setHistory:
             if at is None:
-                at = getCallStack()
-            self._history.append((dict(self._dict), at, label))
+                at = self._config._getCallStack()
+            delta = _DictDelta(k, delete=True)
+            self._config._recordHistoryDelta(self._field.name, delta, self._dict, at, label)
+        else:
+            self._config._markModified()
 
     def __repr__(self):
-        return repr(self._dict)
+        return repr(dict(self._dict))
 
     def __str__(self):
-        return str(self._dict)
+        return str(dict(self._dict))
+
+    def __hash__(self):
+        if not isinstance(self._dict, types.MappingProxyType):
+            raise TypeError("unhashable type: 'Dict' (the config is not frozen)")
+        return hash(frozenset(self._dict.items()))
 
     def __setattr__(self, attr, value, at=None, label="assignment"):
         if hasattr(getattr(self.__class__, attr, None), "__set__"):
             # This allows properties to work.
             object.__setattr__(self, attr, value)
-        elif attr in self.__dict__ or attr in ["_field", "_config_", "_history", "_dict", "__doc__"]:
+        elif attr in self.__dict__ or attr in ["_field", "_config_", "_dict", "__doc__"]:
             # This allows specific private attributes to work.
             object.__setattr__(self, attr, value)
         else:
@@ -174,6 +301,22 @@ class Dict(*_bases):
             msg = "%s has no attribute %s" % (_typeStr(self._field), attr)
             raise FieldValidationError(self._field, self._config, msg)
 
+    def _freeze(self):
+        """Replace the items by a read-only view, once the config is
+        frozen.
+        """
+        self.__dict__["_dict"] = types.MappingProxyType(self._dict)
+
+    def _copyTo(self, config, keepHistory):
+        """Return a copy of this dict owned by another config, without
+        validating its items again or recording history.
+        """
+        result = object.__new__(type(self))
+        result.__dict__.update(self.__dict__)
+        result.__dict__["_config_"] = weakref.ref(config)
+        result.__dict__["_dict"] = dict(self._dict)
+        return result
+
     def __reduce__(self):
         raise UnexpectedProxyUsageError(
             f"Proxy container for config field {self._field.name} cannot "
@@ -350,6 +493,23 @@ class DictField(Field[Dict[KeyTypeVar, ItemTypeVar]], Generic[KeyTypeVar, ItemTy
             msg = "%s is not a valid value" % str(value)
             raise FieldValidationError(self, instance, msg)
 
+    def _makeValidator(self):
+        optional = self.optional
+        dictCheck = self.dictCheck
+        if optional and dictCheck is None:
+            return None
+
+        def validator(instance):
+            value = instance._storage[self.name]
+            if value is None:
+                if not optional:
+                    raise FieldValidationError(self, instance, "Required value cannot be None")
+            elif dictCheck is not None and not dictCheck(value):
+                msg = "%s is not a valid value" % str(value)
+                raise FieldValidationError(self, instance, msg)
+
+        return validator
+
     def __set__(
         self,
         instance: Config,
@@ -362,15 +522,36 @@ class DictField(Field[Dict[KeyTypeVar, ItemTypeVar]], Generic[KeyTypeVar, ItemTy
             raise FieldValidationError(self, instance, msg)
 
         if at is None:
-            at = getCallStack()
+            at = instance._getCallStack()
         if value is not None:
-            value = self.DictClass(instance, self, value, at=at, label=label)
+            check = not _deferValidation(instance, self, at)
+            value = self.DictClass(instance, self, value, at=at, label=label, check=check)
         else:
-            history = instance._history.setdefault(self.name, [])
-            history.append((value, at, label))
+            instance._recordHistory(self.name, value, at, label)
 
         instance._storage[self.name] = value
 
+    def _validateDeferred(self, instance):
+        value = instance._storage[self.name]
+        if value is not None:
+            for k, x in value.items():
+                value._castItem(k, x)
+
+    def freeze(self, instance):
+        value = instance._storage.get(self.name)
+        if value is not None:
+            value._freeze()
+
+    def _copy(self, instance, other, keepHistory):
+        value = instance._storage.get(self.name)
+        if value is not None:
+            value = value._copyTo(other, keepHistory)
+        other._storage[self.name] = value
+
+    def _getState(self, instance):
+        value = self.__get__(instance)
+        return dict(value) if value is not None else None
+
     def toDict(self, instance):
         """Convert this field's key-value pairs into a regular `dict`.
 
@@ -389,54 +570,24 @@ class DictField(Field[Dict[KeyTypeVar, ItemTypeVar]], Generic[KeyTypeVar, ItemTy
         value = self.__get__(instance)
         return dict(value) if value is not None else None
 
-    def _compare(self, instance1, instance2, shortcut, rtol, atol, output):
-        """Compare two fields for equality.
-
-        Used by `lsst.pex.ConfigDictField.compare`.
+    def _diff(self, instance1, instance2, fullname, steps, differences):
+        d1 = self.__get__(instance1)
+        d2 = self.__get__(instance2)
+        d1 = None if d1 is None else dict(d1)
+        d2 = None if d2 is None else dict(d2)
+        if repr(d1) != repr(d2):
+            differences.append(ConfigDifference(fullname, d1, d2, "value", (steps, self.name, None)))
 
-        Parameters
-        ----------
-        instance1 : `lsst.pex.config.Config`
-            Left-hand side config instance to compare.
-        instance2 : `lsst.pex.config.Config`
-            Right-hand side config instance to compare.
-        shortcut : `bool`
-            If `True`, this function returns as soon as an inequality if found.
-        rtol : `float`
-            Relative tolerance for floating point comparisons.
-        atol : `float`
-            Absolute tolerance for floating point comparisons.
-        output : callable
-            A callable that takes a string, used (possibly repeatedly) to
-            report inequalities.
-
-        Returns
-        -------
-        isEqual : bool
-            `True` if the fields are equal, `False` otherwise.
-
-        Notes
-        -----
-        Floating point comparisons are performed by `numpy.allclose`.
-        """
+    def _gatherComparison(self, instance1, instance2, comparison):
         d1 = getattr(instance1, self.name)
         d2 = getattr(instance2, self.name)
         name = getComparisonName(
             _joinNamePath(instance1._name, self.name), _joinNamePath(instance2._name, self.name)
         )
-        if not compareScalars("isnone for %s" % name, d1 is None, d2 is None, output=output):
-            return False
+        if not comparison.compareScalars("isnone for %s" % name, d1 is None, d2 is None):
+            return
         if d1 is None and d2 is None:
-            return True
-        if not compareScalars("keys for %s" % name, set(d1.keys()), set(d2.keys()), output=output):
-            return False
-        equal = True
-        for k, v1 in d1.items():
-            v2 = d2[k]
-            result = compareScalars(
-                "%s[%r]" % (name, k), v1, v2, dtype=self.itemtype, rtol=rtol, atol=atol, output=output
-            )
-            if not result and shortcut:
-                return False
-            equal = equal and result
-        return equal
+            return
+        if not comparison.compareScalars("keys for %s" % name, set(d1.keys()), set(d2.keys())):
+            return
+        comparison.compareMappings(name, d1, d2, self.itemtype)
@@ -32,8 +32,8 @@ import sys
 import weakref
 from typing import Any, Generic, Iterable, MutableSequence, Union, overload
 
-from .callStack import getCallStack, getStackFrame
-from .comparison import compareScalars, getComparisonName
+from .callStack import getStackFrame
+from .comparison import ConfigDifference, getComparisonName
 from .config import (
     Config,
     Field,
@@ -41,10 +41,34 @@ from .config import (
     FieldValidationError,
     UnexpectedProxyUsageError,
     _autocast,
+    _deferValidation,
+    _HistoryDelta,
     _joinNamePath,
     _typeStr,
 )
 
+
+class _ListDelta(_HistoryDelta):
+    """History entry recording an assignment to, or deletion of, an index or
+    slice of a `List`.
+    """
+
+    __slots__ = ("index", "items", "delete")
+
+    def __init__(self, index, items=None, delete=False):
+        self.index = index
+        self.items = items
+        self.delete = delete
+
+    def apply(self, value):
+        value = list(value)
+        if self.delete:
+            del value[self.index]
+        else:
+            value[self.index] = self.items
+        return value
+
+
 if int(sys.version_info.minor) < 9:
     _bases = (collections.abc.MutableSequence, Generic[FieldTypeVar])
 else:
@@ -63,12 +87,15 @@ class List(*_bases):
     value : sequence
         Sequence of values that are inserted into this ``List``.
     at : `list` of `lsst.pex.config.callStack.StackFrame`
-        The call stack (created by `lsst.pex.config.callStack.getCallStack`).
+        The call stack (created by
+        `lsst.pex.config.callStack.getLazyCallStack`).
     label : `str`
         Event label for the history.
     setHistory : `bool`, optional
         Enable setting the field's history, using the value of the ``at``
         parameter. Default is `True`.
+    check : `bool`, optional
+        If `False`, items are cast but not checked. Default is `True`.
 
     Raises
     ------
@@ -78,21 +105,19 @@ class List(*_bases):
         `ListField.itemCheck` method of the ``field`` parameter.
     """
 
-    def __init__(self, config, field, value, at, label, setHistory=True):
+    def __init__(self, config, field, value, at, label, setHistory=True, check=True):
         self._field = field
         self._config_ = weakref.ref(config)
-        self._history = self._config._history.setdefault(self._field.name, [])
         self._list = []
         self.__doc__ = field.doc
         if value is not None:
             try:
-                for i, x in enumerate(value):
-                    self.insert(i, x, setHistory=False)
+                self._list = self._castItems(value, check=check)
             except TypeError:
                 msg = "Value %s is of incorrect type %s. Sequence type expected" % (value, _typeStr(value))
                 raise FieldValidationError(self._field, config, msg)
         if setHistory:
-            self.history.append((list(self._list), at, label))
+            config._recordHistory(self._field.name, list(self._list), at, label)
 
     @property
     def _config(self) -> Config:
@@ -133,11 +158,51 @@ class List(*_bases):
             msg = "Item at position %d is not a valid value: %s" % (i, x)
             raise FieldValidationError(self._field, self._config, msg)
 
+    def _castItems(self, values, start=0, step=1, check=True):
+        """Cast and validate a sequence of items in a single pass.
+
+        Parameters
+        ----------
+        values : iterable
+            Items to cast and validate.
+        start : `int`, optional
+            Position of the first item in the list, used in error messages.
+        step : `int`, optional
+            Distance between the positions of consecutive items.
+        check : `bool`, optional
+            If `False`, items are cast but not validated.
+
+        Returns
+        -------
+        items : `list`
+            The cast items.
+
+        Raises
+        ------
+        FieldValidationError
+            Raised if an item fails `validateItem`.
+        """
+        itemtype = self._field.itemtype
+        itemCheck = self._field.itemCheck
+        items = [_autocast(x, itemtype) for x in values]
+        if not check:
+            return items
+        for j, x in enumerate(items):
+            if x is not None and not isinstance(x, itemtype):
+                self.validateItem(start + j * step, x)
+            elif itemCheck is not None and not itemCheck(x):
+                self.validateItem(start + j * step, x)
+        return items
+
     def list(self):
-        """Sequence of items contained by the `List` (`list`)."""
+        """Sequence of items contained by the `List` (`list`; a copy once
+        the config is frozen).
+        """
+        if isinstance(self._list, tuple):
+            return list(self._list)
         return self._list
 
-    history = property(lambda x: x._history)
+    history = property(lambda x: x._config._decodeHistory(x._field.name))
     """Read-only history.
     """
 
@@ -169,11 +234,7 @@ class List(*_bases):
             raise FieldValidationError(self._field, self._config, "Cannot modify a frozen Config")
         if isinstance(i, slice):
             k, stop, step = i.indices(len(self))
-            for j, xj in enumerate(x):
-                xj = _autocast(xj, self._field.itemtype)
-                self.validateItem(k, xj)
-                x[j] = xj
-                k += step
+            x = self._castItems(x, k, step)
         else:
             x = _autocast(x, self._field.itemtype)
             self.validateItem(i, x)
@@ -181,8 +242,11 @@ class List(*_bases):
         self._list[i] = x
         if setHistory:
             if at is None:
-                at = getCallStack()
-            self.history.append((list(self._list), at, label))
+                at = self._config._getCallStack()
+            delta = _ListDelta(i, list(x) if isinstance(i, slice) else x)
+            self._config._recordHistoryDelta(self._field.name, delta, self._list, at, label)
+        else:
+            self._config._markModified()
 
     @overload
     def __getitem__(self, i: int) -> FieldTypeVar:
@@ -193,6 +257,9 @@ class List(*_bases):
         ...
 
     def __getitem__(self, i):
+        if isinstance(i, slice) and isinstance(self._list, tuple):
+            # Slices are lists whether or not the config is frozen.
+            return list(self._list[i])
         return self._list[i]
 
     def __delitem__(self, i, at=None, label="delitem", setHistory=True):
@@ -201,8 +268,11 @@ class List(*_bases):
         del self._list[i]
         if setHistory:
             if at is None:
-                at = getCallStack()
-            self.history.append((list(self._list), at, label))
+                at = self._config._getCallStack()
+            delta = _ListDelta(i, delete=True)
+            self._config._recordHistoryDelta(self._field.name, delta, self._list, at, label)
+        else:
+            self._config._markModified()
 
     def __iter__(self):
         return iter(self._list)
@@ -218,22 +288,85 @@ class List(*_bases):
             Item that is inserted.
         at : `list` of `lsst.pex.config.callStack.StackFrame`, optional
             The call stack (created by
-            `lsst.pex.config.callStack.getCallStack`).
+            `lsst.pex.config.callStack.getLazyCallStack`).
         label : `str`, optional
             Event label for the history.
         setHistory : `bool`, optional
             Enable setting the field's history, using the value of the ``at``
             parameter. Default is `True`.
         """
-        if at is None:
-            at = getCallStack()
+        if at is None and setHistory:
+            at = self._config._getCallStack()
         self.__setitem__(slice(i, i), [x], at=at, label=label, setHistory=setHistory)
 
+    def extend(self, values, at=None, label="extend", setHistory=True):
+        """Append items to the end of the list.
+
+        All items are validated before any is added, and a single history
+        entry is recorded for them.
+
+        Parameters
+        ----------
+        values : iterable
+            Items that are appended.
+        at : `list` of `lsst.pex.config.callStack.StackFrame`, optional
+            The call stack (created by
+            `lsst.pex.config.callStack.getLazyCallStack`).
+        label : `str`, optional
+            Event label for the history.
+        setHistory : `bool`, optional
+            Enable setting the field's history, using the value of the ``at``
+            parameter. Default is `True`.
+        """
+        if self._config._frozen:
+            raise FieldValidationError(self._field, self._config, "Cannot modify a frozen Config")
+        n = len(self._list)
+        items = self._castItems(values, n)
+        if not items:
+            return
+        self._list.extend(items)
+        if setHistory:
+            if at is None:
+                at = self._config._getCallStack()
+            delta = _ListDelta(slice(n, n), items)
+            self._config._recordHistoryDelta(self._field.name, delta, self._list, at, label)
+        else:
+            self._config._markModified()
+
+    def replaceAll(self, values, at=None, label="assignment", setHistory=True):
+        """Replace all items of the list.
+
+        All items are validated before the list is changed, and a single
+        history entry is recorded for them.
+
+        Parameters
+        ----------
+        values : iterable
+            The new items.
+        at : `list` of `lsst.pex.config.callStack.StackFrame`, optional
+            The call stack (created by
+            `lsst.pex.config.callStack.getLazyCallStack`).
+        label : `str`, optional
+            Event label for the history.
+        setHistory : `bool`, optional
+            Enable setting the field's history, using the value of the ``at``
+            parameter. Default is `True`.
+        """
+        if self._config._frozen:
+            raise FieldValidationError(self._field, self._config, "Cannot modify a frozen Config")
+        self._list[:] = self._castItems(values)
+        if setHistory:
+            if at is None:
+                at = self._config._getCallStack()
+            self._config._recordHistory(self._field.name, list(self._list), at, label)
+        else:
+            self._config._markModified()
+
     def __repr__(self):
-        return repr(self._list)
+        return repr(list(self._list))
 
     def __str__(self):
-        return str(self._list)
+        return str(list(self._list))
 
     def __eq__(self, other):
         try:
@@ -251,11 +384,16 @@ class List(*_bases):
     def __ne__(self, other):
         return not self.__eq__(other)
 
+    def __hash__(self):
+        if not isinstance(self._list, tuple):
+            raise TypeError("unhashable type: 'List' (the config is not frozen)")
+        return hash(self._list)
+
     def __setattr__(self, attr, value, at=None, label="assignment"):
         if hasattr(getattr(self.__class__, attr, None), "__set__"):
             # This allows properties to work.
             object.__setattr__(self, attr, value)
-        elif attr in self.__dict__ or attr in ["_field", "_config_", "_history", "_list", "__doc__"]:
+        elif attr in self.__dict__ or attr in ["_field", "_config_", "_list", "__doc__"]:
             # This allows specific private attributes to work.
             object.__setattr__(self, attr, value)
         else:
@@ -263,6 +401,20 @@ class List(*_bases):
             msg = "%s has no attribute %s" % (_typeStr(self._field), attr)
             raise FieldValidationError(self._field, self._config, msg)
 
+    def _freeze(self):
+        """Replace the items by a `tuple`, once the config is frozen."""
+        self.__dict__["_list"] = tuple(self._list)
+
+    def _copyTo(self, config, keepHistory):
+        """Return a copy of this list owned by another config, without
+        validating its items again or recording history.
+        """
+        result = object.__new__(type(self))
+        result.__dict__.update(self.__dict__)
+        result.__dict__["_config_"] = weakref.ref(config)
+        result.__dict__["_list"] = list(self._list)
+        return result
+
     def __reduce__(self):
         raise UnexpectedProxyUsageError(
             f"Proxy container for config field {self._field.name} cannot "
@@ -434,6 +586,37 @@ class ListField(Field[List[FieldTypeVar]], Generic[FieldTypeVar]):
                 msg = "%s is not a valid value" % str(value)
                 raise FieldValidationError(self, instance, msg)
 
+    def _makeValidator(self):
+        optional = self.optional
+        length = self.length
+        minLength = self.minLength
+        maxLength = self.maxLength
+        listCheck = self.listCheck
+        if optional and length is None and minLength is None and maxLength is None and listCheck is None:
+            return None
+
+        def validator(instance):
+            value = instance._storage[self.name]
+            if value is None:
+                if not optional:
+                    raise FieldValidationError(self, instance, "Required value cannot be None")
+                return
+            lenValue = len(value)
+            if length is not None and not lenValue == length:
+                msg = "Required list length=%d, got length=%d" % (length, lenValue)
+                raise FieldValidationError(self, instance, msg)
+            elif minLength is not None and lenValue < minLength:
+                msg = "Minimum allowed list length=%d, got length=%d" % (minLength, lenValue)
+                raise FieldValidationError(self, instance, msg)
+            elif maxLength is not None and lenValue > maxLength:
+                msg = "Maximum allowed list length=%d, got length=%d" % (maxLength, lenValue)
+                raise FieldValidationError(self, instance, msg)
+            elif listCheck is not None and not listCheck(value):
+                msg = "%s is not a valid value" % str(value)
+                raise FieldValidationError(self, instance, msg)
+
+        return validator
+
     def __set__(
         self,
         instance: Config,
@@ -445,16 +628,36 @@ class ListField(Field[List[FieldTypeVar]], Generic[FieldTypeVar]):
             raise FieldValidationError(self, instance, "Cannot modify a frozen Config")
 
         if at is None:
-            at = getCallStack()
+            at = instance._getCallStack()
 
         if value is not None:
-            value = List(instance, self, value, at, label)
+            check = not _deferValidation(instance, self, at)
+            value = List(instance, self, value, at, label, check=check)
         else:
-            history = instance._history.setdefault(self.name, [])
-            history.append((value, at, label))
+            instance._recordHistory(self.name, value, at, label)
 
         instance._storage[self.name] = value
 
+    def _validateDeferred(self, instance):
+        value = instance._storage[self.name]
+        if value is not None:
+            value._castItems(value)
+
+    def freeze(self, instance):
+        value = instance._storage.get(self.name)
+        if value is not None:
+            value._freeze()
+
+    def _copy(self, instance, other, keepHistory):
+        value = instance._storage.get(self.name)
+        if value is not None:
+            value = value._copyTo(other, keepHistory)
+        other._storage[self.name] = value
+
+    def _getState(self, instance):
+        value = self.__get__(instance)
+        return list(value) if value is not None else None
+
     def toDict(self, instance):
         """Convert the value of this field to a plain `list`.
 
@@ -473,56 +676,24 @@ class ListField(Field[List[FieldTypeVar]], Generic[FieldTypeVar]):
         value = self.__get__(instance)
         return list(value) if value is not None else None
 
-    def _compare(self, instance1, instance2, shortcut, rtol, atol, output):
-        """Compare two config instances for equality with respect to this
-        field.
-
-        `lsst.pex.config.config.compare` is the primary user of this method.
-
-        Parameters
-        ----------
-        instance1 : `lsst.pex.config.Config`
-            Left-hand-side `~lsst.pex.config.Config` instance in the
-            comparison.
-        instance2 : `lsst.pex.config.Config`
-            Right-hand-side `~lsst.pex.config.Config` instance in the
-            comparison.
-        shortcut : `bool`
-            If `True`, return as soon as an **inequality** is found.
-        rtol : `float`
-            Relative tolerance for floating point comparisons.
-        atol : `float`
-            Absolute tolerance for floating point comparisons.
-        output : callable
-            If not None, a callable that takes a `str`, used (possibly
-            repeatedly) to report inequalities.
-
-        Returns
-        -------
-        equal : `bool`
-            `True` if the fields are equal; `False` otherwise.
+    def _diff(self, instance1, instance2, fullname, steps, differences):
+        l1 = self.__get__(instance1)
+        l2 = self.__get__(instance2)
+        l1 = None if l1 is None else list(l1)
+        l2 = None if l2 is None else list(l2)
+        if repr(l1) != repr(l2):
+            differences.append(ConfigDifference(fullname, l1, l2, "value", (steps, self.name, None)))
 
-        Notes
-        -----
-        Floating point comparisons are performed by `numpy.allclose`.
-        """
+    def _gatherComparison(self, instance1, instance2, comparison):
         l1 = getattr(instance1, self.name)
         l2 = getattr(instance2, self.name)
         name = getComparisonName(
             _joinNamePath(instance1._name, self.name), _joinNamePath(instance2._name, self.name)
         )
-        if not compareScalars("isnone for %s" % name, l1 is None, l2 is None, output=output):
-            return False
+        if not comparison.compareScalars("isnone for %s" % name, l1 is None, l2 is None):
+            return
         if l1 is None and l2 is None:
-            return True
-        if not compareScalars("size for %s" % name, len(l1), len(l2), output=output):
-            return False
-        equal = True
-        for n, v1, v2 in zip(range(len(l1)), l1, l2):
-            result = compareScalars(
-                "%s[%d]" % (name, n), v1, v2, dtype=self.dtype, rtol=rtol, atol=atol, output=output
-            )
-            if not result and shortcut:
-                return False
-            equal = equal and result
-        return equal
+            return
+        if not comparison.compareScalars("size for %s" % name, len(l1), len(l2)):
+            return
+        comparison.compareSequences(name, l1, l2, self.itemtype)
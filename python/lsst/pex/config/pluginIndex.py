@@ -0,0 +1,259 @@
+# This file is part of pex_config.
+#
+# Developed for the LSST Data Management System.
+# This product includes software developed by the LSST Project
+# (http://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This software is dual licensed under the GNU General Public License and also
+# under a 3-clause BSD license. Recipients may choose which of these licenses
+# to use; please see the files gpl-3.0.txt and/or bsd_license.txt,
+# respectively.  If you choose the GPL option then the following text applies
+# (but note that there is still no warranty even if you opt for BSD instead):
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+__all__ = ("PluginIndex", "getDefaultPluginIndex")
+
+import hashlib
+import importlib.metadata
+import json
+import os
+import sys
+import tempfile
+import threading
+
+_INDEX_VERSION = 2
+"""Version of the layout of on-disk index files."""
+
+
+class PluginIndex:
+    """Index of the entry points of the installed distributions.
+
+    Reading the entry points of every installed distribution is slow when
+    many are installed, so the index is kept in memory and in a file, and
+    is only rebuilt when the installed distributions change. Nothing is
+    imported to build it.
+
+    Parameters
+    ----------
+    cacheDir : `str`, optional
+        Directory of the on-disk index. If `None`, the directory given by
+        the environment variable ``PEX_CONFIG_CACHE_DIR`` is used, or else
+        ``pex_config`` in ``XDG_CACHE_HOME`` (``~/.cache`` by default).
+    useDisk : `bool`, optional
+        If `False`, the index is only kept in memory.
+
+    Notes
+    -----
+    The index is considered out of date if the interpreter, `sys.path`, or
+    the modification time of any directory in `sys.path`, of any
+    ``*.dist-info`` or ``*.egg-info`` metadata directory in them, or of
+    their ``entry_points.txt`` has changed. Installing, upgrading or
+    removing a distribution changes the modification time of the directory
+    it is installed in, and editing the entry points of a distribution in
+    place (as an editable install does) changes that of its metadata.
+    Failing to read or write the on-disk index is not an error.
+
+    Only the directories in `sys.path` are checked on every request: the
+    metadata in a directory is read again when the directory changes, so
+    entry points edited in place since the first request of this index are
+    only seen after `clear`. Each interpreter and `sys.path` has its own
+    on-disk index.
+
+    See also
+    --------
+    getDefaultPluginIndex
+    """
+
+    def __init__(self, cacheDir=None, useDisk=True):
+        if cacheDir is None:
+            cacheDir = os.environ.get("PEX_CONFIG_CACHE_DIR")
+        if cacheDir is None:
+            cacheHome = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+            cacheDir = os.path.join(cacheHome, "pex_config")
+        self.cacheDir = cacheDir
+        """Directory of the on-disk index (`str`)."""
+
+        self.useDisk = useDisk
+        """Whether the index is kept on disk (`bool`)."""
+
+        self._lock = threading.Lock()
+        self._signature = None
+        self._entryPoints = None
+        # Modification time and metadata signature of each directory.
+        self._metadata = {}
+
+    def getEntryPoints(self, group):
+        """Return the entry points of a group.
+
+        Parameters
+        ----------
+        group : `str`
+            Name of the entry point group.
+
+        Returns
+        -------
+        entryPoints : `list` [`tuple` [`str`, `str`]]
+            Name and value (e.g. ``"module:Class"``) of each entry point in
+            the group, in the order of `sys.path`. Only the first of several
+            installed copies of a distribution is used.
+        """
+        with self._lock:
+            signature = self._getSignature()
+            if self._entryPoints is None or self._signature != signature:
+                self._entryPoints = self._load(signature)
+                self._signature = signature
+            return [tuple(entry) for entry in self._entryPoints.get(group, ())]
+
+    def clear(self):
+        """Forget the index held in memory and delete the on-disk index, so
+        that the next request scans the installed distributions again.
+        """
+        with self._lock:
+            self._signature = None
+            self._entryPoints = None
+            self._metadata = {}
+            if self.useDisk:
+                try:
+                    os.remove(self._getIndexFile())
+                except OSError:
+                    pass
+
+    def _load(self, signature):
+        indexFile = self._getIndexFile() if self.useDisk else None
+        if indexFile is not None:
+            entryPoints = _readIndexFile(indexFile, signature)
+            if entryPoints is not None:
+                return entryPoints
+        entryPoints = _scanEntryPoints()
+        if indexFile is not None:
+            _writeIndexFile(indexFile, signature, entryPoints)
+        return entryPoints
+
+    def _getIndexFile(self):
+        # Each interpreter and sys.path has its own index, so that processes
+        # with different paths do not keep replacing each other's.
+        key = hashlib.sha256("\0".join([sys.executable] + sys.path).encode()).hexdigest()[:16]
+        return os.path.join(self.cacheDir, "entryPoints-%s.json" % key)
+
+    def _getSignature(self):
+        """Return a description of the installed distributions that changes
+        when any of them is installed, upgraded or removed.
+        """
+        signature = [sys.version]
+        for path in sys.path:
+            directory = path or os.curdir
+            mtime = _getMtime(directory)
+            cached = self._metadata.get(directory)
+            if cached is None or cached[0] != mtime:
+                cached = self._metadata[directory] = (mtime, _getMetadataSignature(directory))
+            signature.append([path, mtime, cached[1]])
+        return signature
+
+
+def _getMtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _getMetadataSignature(directory):
+    """Return the name and modification times of the distribution metadata
+    in a directory, and of the entry points file in each.
+    """
+    metadata = []
+    try:
+        with os.scandir(directory) as entries:
+            names = sorted(
+                entry.name for entry in entries if entry.name.endswith((".dist-info", ".egg-info"))
+            )
+    except OSError:
+        return metadata
+    for name in names:
+        path = os.path.join(directory, name)
+        metadata.append([name, _getMtime(path), _getMtime(os.path.join(path, "entry_points.txt"))])
+    return metadata
+
+
+def _scanEntryPoints():
+    """Read the entry points of all installed distributions.
+
+    Returns
+    -------
+    entryPoints : `dict` [`str`, `list` [`list` [`str`, `str`]]]
+        Name and value of the entry points of each group.
+    """
+    entryPoints = {}
+    seen = set()
+    for dist in importlib.metadata.distributions():
+        name = dist.metadata["Name"]
+        if name is not None:
+            name = name.lower().replace("-", "_")
+            if name in seen:
+                continue
+            seen.add(name)
+        for entryPoint in dist.entry_points:
+            entryPoints.setdefault(entryPoint.group, []).append([entryPoint.name, entryPoint.value])
+    return entryPoints
+
+
+def _readIndexFile(indexFile, signature):
+    try:
+        with open(indexFile) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or data.get("version") != _INDEX_VERSION:
+        return None
+    if data.get("signature") != signature:
+        return None
+    return data.get("entryPoints")
+
+
+def _writeIndexFile(indexFile, signature, entryPoints):
+    data = {"version": _INDEX_VERSION, "signature": signature, "entryPoints": entryPoints}
+    directory = os.path.dirname(indexFile)
+    tempName = None
+    try:
+        os.makedirs(directory, exist_ok=True)
+        with tempfile.NamedTemporaryFile(mode="w", delete=False, dir=directory) as outfile:
+            tempName = outfile.name
+            json.dump(data, outfile)
+        # Replace atomically so that readers never see a partial file.
+        os.replace(tempName, indexFile)
+    except OSError:
+        if tempName is not None:
+            try:
+                os.unlink(tempName)
+            except OSError:
+                pass
+
+
+_defaultPluginIndex = PluginIndex(useDisk=os.environ.get("PEX_CONFIG_PLUGIN_INDEX", "1") != "0")
+
+
+def getDefaultPluginIndex():
+    """Return the index used by `lsst.pex.config.Registry.discover`.
+
+    Returns
+    -------
+    index : `PluginIndex`
+        The process-wide index. It is only kept in memory if the environment
+        variable ``PEX_CONFIG_PLUGIN_INDEX`` is ``0`` at import time; set its
+        ``useDisk`` attribute to change that later.
+    """
+    return _defaultPluginIndex
@@ -29,9 +29,74 @@ __all__ = ("Registry", "makeRegistry", "RegistryField", "registerConfig", "regis
 
 import collections.abc
 import copy
+import importlib
 
 from .config import Config, FieldValidationError, _typeStr
 from .configChoiceField import ConfigChoiceField, ConfigInstanceDict
+from .pluginIndex import getDefaultPluginIndex
+
+
+def _checkImportPath(path):
+    """Check that a string has the ``"module:qualname"`` form of an import
+    path.
+
+    Raises
+    ------
+    ValueError
+        Raised if ``path`` does not have that form.
+    """
+    moduleName, sep, qualname = path.partition(":")
+    if not sep or not moduleName or not qualname:
+        raise ValueError("Import path %r must have the form 'module:Class'" % path)
+
+
+def _importObject(path):
+    """Import an object given by a ``"module:qualname"`` import path.
+
+    Parameters
+    ----------
+    path : `str`
+        Import path; ``qualname`` may name an attribute of an attribute,
+        e.g. ``"module:Class.NestedClass"``.
+
+    Returns
+    -------
+    obj : object
+        The imported object.
+
+    Raises
+    ------
+    ImportError
+        Raised if the module cannot be imported or does not have the object.
+    """
+    moduleName, _, qualname = path.partition(":")
+    obj = importlib.import_module(moduleName)
+    try:
+        for attr in qualname.split("."):
+            obj = getattr(obj, attr)
+    except AttributeError as e:
+        raise ImportError("Cannot import %r: %s" % (path, e)) from e
+    return obj
+
+
+class _LazyRegistryEntry:
+    """An entry of a `Registry` whose target or config class is given by an
+    import path and has not been imported yet.
+
+    Parameters
+    ----------
+    target : obj or `str`
+        The configurable, or its import path.
+    ConfigClass : `lsst.pex.config.Config`-type, `str` or `None`
+        The config class, its import path, or `None` to use the target's
+        ``ConfigClass`` attribute.
+    """
+
+    __slots__ = ("target", "ConfigClass")
+
+    def __init__(self, target, ConfigClass):
+        self.target = target
+        self.ConfigClass = ConfigClass
 
 
 class ConfigurableWrapper:
@@ -77,6 +142,10 @@ class Registry(collections.abc.Mapping):
       return a PSF matching class that has a ``psfMatch`` method with a
       particular call signature.
 
+    Configurables and their config classes can also be registered by import
+    path (``"module:Class"``), so that registering them does not import
+    them; see `register`.
+
     Examples
     --------
     This examples creates a configurable class ``Foo`` and adds it to a
@@ -133,12 +202,14 @@ class Registry(collections.abc.Mapping):
             Name that the ``target`` is registered under. The target can
             be accessed later with `dict`-like patterns using ``name`` as
             the key.
-        target : obj
-            A configurable type, usually a subclass of `lsst.pipe.base.Task`.
-        ConfigClass : `lsst.pex.config.Config`-type, optional
+        target : obj or `str`
+            A configurable type, usually a subclass of `lsst.pipe.base.Task`,
+            or its import path in the form ``"module:Class"``.
+        ConfigClass : `lsst.pex.config.Config`-type or `str`, optional
             A subclass of `lsst.pex.config.Config` used to configure the
-            configurable. If `None` then the configurable's ``ConfigClass``
-            attribute is used.
+            configurable, or its import path in the form
+            ``"module:Class"``. If `None` then the configurable's
+            ``ConfigClass`` attribute is used.
 
         Raises
         ------
@@ -147,15 +218,77 @@ class Registry(collections.abc.Mapping):
         AttributeError
             Raised if ``ConfigClass`` is `None` and ``target`` does not have
             a ``ConfigClass`` attribute.
+        ValueError
+            Raised if an import path does not have the form
+            ``"module:Class"``.
 
         Notes
         -----
         If ``ConfigClass`` is provided then the ``target`` configurable is
         wrapped in a new object that forwards function calls to it. Otherwise
         the original ``target`` is stored.
+
+        Import paths are only imported when they are needed: the config
+        class when a config for this entry is made, and the target when the
+        entry is looked up in the registry. The checks above are made at
+        that time for such entries.
         """
         if name in self._dict:
             raise RuntimeError("An item with name %r already exists" % name)
+        if isinstance(target, str) or isinstance(ConfigClass, str):
+            for path in (target, ConfigClass):
+                if isinstance(path, str):
+                    _checkImportPath(path)
+            self._dict[name] = _LazyRegistryEntry(target, ConfigClass)
+        else:
+            self._dict[name] = self._makeWrapper(target, ConfigClass)
+
+    def discover(self, group, index=None):
+        """Register the configurables advertised by installed distributions
+        as entry points, without importing them.
+
+        Parameters
+        ----------
+        group : `str`
+            Name of the entry point group. Each entry point in the group is
+            registered under its name, with its value (``"module:Class"``)
+            as an import path (see `register`).
+        index : `lsst.pex.config.pluginIndex.PluginIndex`, optional
+            Index of the installed entry points. If `None`, the index
+            returned by `lsst.pex.config.pluginIndex.getDefaultPluginIndex`
+            is used.
+
+        Returns
+        -------
+        names : `list` [`str`]
+            Names of the entries that were added.
+
+        Notes
+        -----
+        Entry points whose names are already in the registry, or whose
+        values do not name an object in a module, are skipped; this method
+        can be called again to pick up newly installed distributions.
+        """
+        if index is None:
+            index = getDefaultPluginIndex()
+        names = []
+        for name, value in index.getEntryPoints(group):
+            if name in self._dict:
+                continue
+            # Drop any extras, as in "module:Class [extra]".
+            path = value.partition("[")[0].strip()
+            try:
+                _checkImportPath(path)
+            except ValueError:
+                continue
+            self._dict[name] = _LazyRegistryEntry(path, None)
+            names.append(name)
+        return names
+
+    def _makeWrapper(self, target, ConfigClass):
+        """Check a configurable and wrap it with its config class, if that is
+        given.
+        """
         if ConfigClass is None:
             wrapper = target
         else:
@@ -165,10 +298,36 @@ class Registry(collections.abc.Mapping):
                 "ConfigClass=%s is not a subclass of %r"
                 % (_typeStr(wrapper.ConfigClass), _typeStr(self._configBaseType))
             )
-        self._dict[name] = wrapper
+        return wrapper
+
+    def _getConfigClass(self, key):
+        """Return the config class of an entry, importing only that class if
+        it was registered by import path.
+        """
+        entry = self._dict[key]
+        if isinstance(entry, _LazyRegistryEntry) and entry.ConfigClass is not None:
+            if isinstance(entry.ConfigClass, str):
+                ConfigClass = _importObject(entry.ConfigClass)
+                if not isinstance(ConfigClass, type) or not issubclass(ConfigClass, self._configBaseType):
+                    raise TypeError(
+                        "ConfigClass=%s is not a subclass of %r"
+                        % (_typeStr(ConfigClass), _typeStr(self._configBaseType))
+                    )
+                entry.ConfigClass = ConfigClass
+            return entry.ConfigClass
+        return self[key].ConfigClass
 
     def __getitem__(self, key):
-        return self._dict[key]
+        entry = self._dict[key]
+        if isinstance(entry, _LazyRegistryEntry):
+            target = entry.target
+            if isinstance(target, str):
+                target = _importObject(target)
+            ConfigClass = entry.ConfigClass
+            if isinstance(ConfigClass, str):
+                ConfigClass = _importObject(ConfigClass)
+            entry = self._dict[key] = self._makeWrapper(target, ConfigClass)
+        return entry
 
     def __len__(self):
         return len(self._dict)
@@ -217,7 +376,7 @@ class RegistryAdaptor(collections.abc.Mapping):
         self.registry = registry
 
     def __getitem__(self, k):
-        return self.registry[k].ConfigClass
+        return self.registry._getConfigClass(k)
 
     def __iter__(self):
         return iter(self.registry)
@@ -345,7 +504,7 @@ class RegistryField(ConfigChoiceField):
         return other
 
 
-def makeRegistry(doc, configBaseType=Config):
+def makeRegistry(doc, configBaseType=Config, entryPointGroup=None):
     """Create a `Registry`.
 
     Parameters
@@ -356,6 +515,9 @@ def makeRegistry(doc, configBaseType=Config):
     configBaseType : `lsst.pex.config.Config`-type
         Base type of config classes in the `Registry`
         (`lsst.pex.config.Registry.configBaseType`).
+    entryPointGroup : `str`, optional
+        If not `None`, the registry is populated from the entry points of
+        this group (see `Registry.discover`).
 
     Returns
     -------
@@ -364,7 +526,10 @@ def makeRegistry(doc, configBaseType=Config):
         set.
     """
     cls = type("Registry", (Registry,), {"__doc__": doc})
-    return cls(configBaseType=configBaseType)
+    registry = cls(configBaseType=configBaseType)
+    if entryPointGroup is not None:
+        registry.discover(entryPointGroup)
+    return registry
 
 
 def registerConfigurable(name, registry, ConfigClass=None):
@@ -377,9 +542,10 @@ def registerConfigurable(name, registry, ConfigClass=None):
         Name of the target (the decorated class) in the ``registry``.
     registry : `Registry`
         The `Registry` instance that the decorated class is added to.
-    ConfigClass : `lsst.pex.config.Config`-type, optional
-        Config class associated with the configurable. If `None`, the class's
-        ``ConfigClass`` attribute is used instead.
+    ConfigClass : `lsst.pex.config.Config`-type or `str`, optional
+        Config class associated with the configurable, or its import path in
+        the form ``"module:Class"``. If `None`, the class's ``ConfigClass``
+        attribute is used instead.
 
     See also
     --------
@@ -407,8 +573,9 @@ def registerConfig(name, registry, target):
         Name of the ``target`` in the ``registry``.
     registry : `Registry`
         The registry containing the ``target``.
-    target : obj
-        A configurable type, such as a subclass of `lsst.pipe.base.Task`.
+    target : obj or `str`
+        A configurable type, such as a subclass of `lsst.pipe.base.Task`, or
+        its import path in the form ``"module:Class"``.
 
     See also
     --------
@@ -31,7 +31,7 @@ import importlib
 import inspect
 import re
 
-from .callStack import StackFrame, getCallerFrame, getCallStack
+from .callStack import StackFrame, getCallerFrame
 from .config import Config, Field
 from .configField import ConfigField
 from .listField import List, ListField
@@ -232,7 +232,7 @@ def makeConfigClass(ctrl, name=None, base=Config, doc=None, module=None, cls=Non
                 value = value.makeControl()
             if value is not None:
                 if isinstance(value, List):
-                    setattr(r, k, value._list)
+                    setattr(r, k, value.list())
                 else:
                     setattr(r, k, value)
         return r
@@ -252,7 +252,7 @@ def makeConfigClass(ctrl, name=None, base=Config, doc=None, module=None, cls=Non
         use only; they are used to remove internal calls from the history.
         """
         if __at is None:
-            __at = getCallStack()
+            __at = self._getCallStack()
         values = {}
         for k, f in fields.items():
             if isinstance(f, ConfigField):
@@ -263,11 +263,11 @@ def makeConfigClass(ctrl, name=None, base=Config, doc=None, module=None, cls=Non
             self._history = {}
         self.update(__at=__at, __label=__label, **values)
 
-    def validate(self):
+    def validate(self, full=False):
         """Validate the config object by constructing a control object and
         using a C++ ``validate()`` implementation.
         """
-        super(cls, self).validate()
+        super(cls, self).validate(full=full)
         r = self.makeControl()
         r.validate()
 
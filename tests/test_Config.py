@@ -25,12 +25,20 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import concurrent.futures
+import copy
 import io
 import itertools
 import os
 import pickle
 import re
+import subprocess
+import sys
+import tempfile
+import textwrap
+import threading
 import unittest
+import unittest.mock
 
 try:
     import yaml
@@ -101,6 +109,25 @@ class Deprecation(pexConfig.Config):
     old = pexConfig.Field("Something.", int, default=10, deprecated="not used!")
 
 
+class CustomSaveField(pexConfig.Field):
+    """Field written for the save API before saving took names."""
+
+    def save(self, outfile, instance):
+        fullname = pexConfig.config._joinNamePath(instance._name, self.name)
+        outfile.write("{}={!r}  # custom\n".format(fullname, self.__get__(instance)))
+
+    def _collectImports(self, instance, imports):
+        imports.add("unittest.mock")
+
+
+class CustomSave(pexConfig.Config):
+    custom = CustomSaveField("custom", int, default=3)
+
+
+class CustomSaveParent(pexConfig.Config):
+    sub = pexConfig.ConfigField("sub", CustomSave)
+
+
 class ConfigTest(unittest.TestCase):
     def setUp(self):
         self.simple = Simple()
@@ -156,6 +183,83 @@ class ConfigTest(unittest.TestCase):
         self.assertEqual(self.comp.r.active.f, 3.0)
         self.assertEqual(self.comp.r["BBB"].f, 0.0)
 
+    def testDefaultCache(self):
+        """Test that cached defaults are reused only while they are valid."""
+        calls = []
+
+        class Checked(pexConfig.Config):
+            f = pexConfig.Field("checked", float, default=1, check=lambda x: calls.append(x) or True)
+
+        first = Checked()
+        second = Checked()
+        self.assertEqual(calls, [1.0])
+        self.assertEqual(second.f, 1.0)
+        self.assertIsInstance(second.f, float)
+        self.assertEqual([h[0] for h in second.history["f"]], [1.0])
+
+        # Changing the default or replacing the field invalidates the cache.
+        Checked.f.default = 2.0
+        self.assertEqual(Checked().f, 2.0)
+        Checked.f = pexConfig.Field("replaced", float, default=3.0)
+        self.assertEqual(Checked().f, 3.0)
+        self.assertEqual(first.f, 1.0)
+
+    def testLazyConfigField(self):
+        """Test that lazy subconfigs behave like eager ones without being
+        built until used.
+        """
+
+        class Lazy(pexConfig.Config):
+            c = pexConfig.ConfigField("lazy inner", InnerConfig, lazy=True)
+            d = pexConfig.ConfigField("eager inner", InnerConfig)
+
+        lazy = Lazy()
+        self.assertNotIsInstance(lazy._storage["c"], InnerConfig)
+        self.assertEqual(lazy.toDict(), {"c": {"f": 0.0}, "d": {"f": 0.0}})
+        self.assertTrue(lazy.compare(Lazy()))
+        lazy.validate()
+        self.assertIn("config.c.f=0.0", lazy.saveToString())
+        self.assertNotIsInstance(lazy._storage["c"], InnerConfig)
+
+        # Reading or modifying the subconfig builds it.
+        other = Lazy()
+        other.c.f = 2.0
+        self.assertIsInstance(other._storage["c"], InnerConfig)
+        self.assertEqual(other.c._name, "c")
+        self.assertFalse(lazy.compare(other))
+        lazy.c = other.c
+        self.assertEqual(lazy.c.f, 2.0)
+
+        # Unbuilt subconfigs copy as defaults, and are frozen when built.
+        copied = Lazy(c=Lazy().c)
+        frozen = Lazy(**Lazy()._storage)
+        frozen.freeze()
+        self.assertEqual(copied.c.f, 0.0)
+        self.assertTrue(frozen.c._frozen)
+        with self.assertRaises(pexConfig.FieldValidationError):
+            frozen.c.f = 1.0
+
+        # Threads reading a frozen config all get the same subconfig.
+        frozen = Lazy()
+        frozen.freeze()
+        barrier = threading.Barrier(8)
+
+        def read():
+            barrier.wait()
+            return frozen.c
+
+        with concurrent.futures.ThreadPoolExecutor(8) as pool:
+            subconfigs = list(pool.map(lambda _: read(), range(8)))
+        self.assertTrue(all(c is frozen.c for c in subconfigs))
+        # Even a thread that built the subconfig after another one stored
+        # it gets the stored one.
+        placeholder = Lazy()
+        placeholder.freeze()
+        stale = placeholder._storage["c"]
+        built = Lazy.c._build(placeholder, stale)
+        self.assertIs(placeholder.c, built)
+        self.assertIs(Lazy.c._build(placeholder, stale), built)
+
     def testDeprecationWarning(self):
         """Test that a deprecated field emits a warning when it is set."""
         with self.assertWarns(FutureWarning) as w:
@@ -202,6 +306,190 @@ class ConfigTest(unittest.TestCase):
         self.comp.r = "BBB"
         self.comp.validate()
 
+    def testValidators(self):
+        """Test that the validation functions made per class match the
+        fields' own validation.
+        """
+        calls = []
+
+        class CustomField(pexConfig.Field):
+            def validate(self, instance):
+                calls.append(instance)
+                pexConfig.Field.validate(self, instance)
+
+        class Validated(pexConfig.Config):
+            a = pexConfig.Field("optional", int, optional=True)
+            b = pexConfig.Field("required", int, default=None)
+            ll = pexConfig.ListField("list", int, default=[], minLength=1)
+            d = pexConfig.DictField("dict", str, int, default={}, dictCheck=lambda d: "k" in d)
+            c = CustomField("custom", int, default=0)
+
+        validators = Validated._getValidators()
+        self.assertIs(Validated._getValidators(), validators)
+        self.assertEqual(len(validators), 4)
+
+        config = Validated()
+        messages = []
+        for name, value in [("b", 1), ("ll", [1]), ("d", {"k": 1})]:
+            with self.assertRaises(pexConfig.FieldValidationError) as cm:
+                config.validate()
+            with self.assertRaises(pexConfig.FieldValidationError) as expected:
+                Validated._fields[name].validate(config)
+            self.assertEqual(str(cm.exception), str(expected.exception))
+            messages.append(cm.exception.fieldName)
+            setattr(config, name, value)
+        self.assertEqual(messages, ["b", "ll", "d"])
+        config.validate()
+        self.assertIn(config, calls)
+
+        # Changing the attributes of a field makes new validators.
+        Validated.ll.minLength = 2
+        self.assertIsNot(Validated._getValidators(), validators)
+        self.assertRaises(pexConfig.FieldValidationError, config.validate)
+        Validated.ll.minLength = 1
+        Validated.a.optional = False
+        self.assertRaises(pexConfig.FieldValidationError, config.validate)
+        Validated.a.optional = True
+        config.validate()
+
+        # Replacing a field makes new validators.
+        validators = Validated._getValidators()
+        Validated.a = pexConfig.Field("required", int, default=None)
+        self.assertIsNot(Validated._getValidators(), validators)
+        self.assertRaises(pexConfig.FieldValidationError, Validated().validate)
+
+    def testDeferredValidation(self):
+        # Values that are replaced before the block ends are not checked.
+        with pexConfig.deferredValidation():
+            self.simple.r = 1.0
+            self.simple.c = "Goodbye"
+            self.simple.ll = [1, -2]
+            self.simple.d = {"key": "bad"}
+            self.simple.r = 4
+            self.simple.c = "World"
+            self.simple.ll = [1, 2]
+            self.simple.d = {"key": "value2"}
+        self.assertEqual(self.simple.r, 4.0)
+        self.assertIsInstance(self.simple.r, float)
+        self.assertEqual(self.simple.ll, [1, 2])
+
+        # Errors point to the assignment of the bad value.
+        for limit in (None, 0):
+            self.simple.setHistoryLimit(limit)
+            with self.assertRaises(pexConfig.FieldValidationError) as cm:
+                with pexConfig.deferredValidation():
+                    self.simple.ll = [1, -2]  # bad assignment
+                    self.simple.f = 5.0
+            self.assertIn("test_Config.py", str(cm.exception).splitlines()[-1])
+            self.assertIn("testDeferredValidation", str(cm.exception).splitlines()[-1])
+        self.assertEqual(self.simple.f, 5.0)
+
+        # Nested blocks are checked when the outermost one ends.
+        with self.assertRaises(pexConfig.FieldValidationError):
+            with pexConfig.deferredValidation():
+                with pexConfig.deferredValidation():
+                    self.comp.c.f = 1.0
+                    self.simple.r = 1.0
+                self.assertEqual(self.simple.r, 1.0)
+        self.assertEqual(self.simple.r, 4.0)
+        self.assertEqual(self.comp.c.f, 1.0)
+
+        # All the bad values are reported together.
+        with self.assertRaises(pexConfig.FieldValidationError) as cm:
+            with pexConfig.deferredValidation():
+                self.simple.r = 1.0
+                self.simple.ll = [1, -2]
+        self.assertIn("2 values failed validation", str(cm.exception))
+        self.assertIn("'r'", str(cm.exception))
+        self.assertIn("'ll'", str(cm.exception))
+        self.assertEqual((self.simple.r, self.simple.ll), (4.0, [1, 2]))
+
+        # Errors from checks other than FieldValidationError are raised
+        # after all the checks are run, and never replace the error raised
+        # by the block.
+        class Fragile(pexConfig.Config):
+            ll = pexConfig.ListField("list", int, default=[], itemCheck=lambda x: 10 // (x - 5) > 0)
+            r = pexConfig.RangeField("r", int, default=0, min=0)
+
+        fragile = Fragile()
+        with self.assertRaises(ZeroDivisionError):
+            with pexConfig.deferredValidation():
+                fragile.ll = [5]
+                fragile.r = -1
+        self.assertEqual((fragile.ll, fragile.r), ([], 0))
+        with self.assertRaises(RuntimeError):
+            with pexConfig.deferredValidation():
+                fragile.ll = [5]
+                raise RuntimeError("failed override")
+        self.assertEqual(fragile.ll, [])
+
+        # Without a block, bad values are rejected at once.
+        with self.assertRaises(pexConfig.FieldValidationError) as cm:
+            self.simple.r = 1.0
+        self.assertNotIn("assigned at", str(cm.exception))
+
+        # If the block raises, bad values are set back to their old ones.
+        self.simple.setHistoryLimit(None)
+        with self.assertRaises(RuntimeError):
+            with pexConfig.deferredValidation():
+                self.simple.r = -10.0
+                self.simple.f = 6.0
+                self.simple.ll = [-1]
+                raise RuntimeError("failed override")
+        self.assertEqual(self.simple.r, 4.0)
+        self.assertEqual(self.simple.f, 6.0)
+        self.assertEqual(self.simple.ll, [1, 2])
+        self.assertEqual(self.simple.history["r"][-1][2], "restore")
+        self.assertEqual(self.simple.history["ll"][-1][0], [1, 2])
+
+        # Defaults are checked even when a config is made inside a block,
+        # so that invalid defaults are never cached.
+        class BadDefault(pexConfig.Config):
+            r = pexConfig.RangeField("r", int, default=-5, min=0)
+
+        with pexConfig.deferredValidation():
+            self.assertRaises(pexConfig.FieldValidationError, BadDefault)
+        self.assertRaises(pexConfig.FieldValidationError, BadDefault)
+        self.assertRaises(pexConfig.FieldValidationError, BadDefault._getDefaultPrototype)
+
+    def testIncrementalValidation(self):
+        """Test that only changed configs are validated again."""
+        checked = []
+
+        class Leaf(pexConfig.Config):
+            ll = pexConfig.ListField("list", int, default=[1], listCheck=lambda x: checked.append(x) or x)
+
+        class Root(pexConfig.Config):
+            a = pexConfig.ConfigField("leaf", Leaf, lazy=False)
+            b = pexConfig.ConfigField("leaf", Leaf, lazy=False)
+            d = pexConfig.ConfigDictField("leaves", str, Leaf, default={})
+
+        root = Root()
+        root.d["x"] = Leaf()
+        root.validate()
+        self.assertEqual(len(checked), 3)
+        root.validate()
+        self.assertEqual(len(checked), 3)
+
+        root.b.ll.append(2)
+        root.validate()
+        self.assertEqual(checked[3:], [[1, 2]])
+
+        # Failures are found again until fixed.
+        root.d["x"].ll.clear()
+        self.assertRaises(pexConfig.FieldValidationError, root.validate)
+        self.assertRaises(pexConfig.FieldValidationError, root.validate)
+        root.d["x"].ll = [3]
+        del checked[:]
+        root.validate()
+        self.assertEqual(checked, [[3]])
+
+        root.validate(full=True)
+        self.assertEqual(len(checked), 4)
+        root.freeze()
+        root.validate()
+        self.assertEqual(len(checked), 4)
+
     def testRangeFieldConstructor(self):
         """Test RangeField constructor's checking of min, max"""
         val = 3
@@ -340,6 +628,137 @@ class ConfigTest(unittest.TestCase):
         self.assertEqual(self.comp.c.f, roundTrip.c.f)
         self.assertEqual(self.comp.r.name, roundTrip.r.name)
 
+    def testSaveSkipDefaults(self):
+        # Saving builds nothing and leaves the config as it was.
+        self.comp.validate()
+        fingerprint = self.comp.fingerprint()
+        built = (set(self.comp.r._dict), set(self.comp.p._dict))
+        self.assertNotIn("\nconfig.", self.comp.saveToString(skipDefaults=True))
+        self.assertEqual((set(self.comp.r._dict), set(self.comp.p._dict)), built)
+        self.assertTrue(self.comp._validated)
+        self.assertEqual(self.comp.fingerprint(), fingerprint)
+
+        self.comp.c.f = -0.0
+        self.comp.r["BBB"].f = 8.0
+        self.comp.r.name = "BBB"
+        self.comp.p.name = None
+        saved = self.comp.saveToString(skipDefaults=True, skipDocs=True)
+        self.assertEqual(
+            saved.splitlines()[2:],
+            ["config.c.f=-0.0", "config.r['BBB'].f=8.0", "config.r.name='BBB'", "config.p.name=None"],
+        )
+        roundTrip = Complex()
+        roundTrip.loadFromString(saved)
+        self.assertEqual(roundTrip.saveToString(), self.comp.saveToString())
+
+        saved = self.simple.saveToString(skipDocs=True)
+        self.assertNotIn("#", saved)
+        roundTrip = Simple()
+        roundTrip.loadFromString(saved)
+        self.assertTrue(self.simple.compare(roundTrip))
+
+    def testFingerprint(self):
+        fingerprint = self.comp.fingerprint()
+        self.assertEqual(fingerprint, Complex().fingerprint())
+        self.assertEqual(fingerprint, self.comp.copy().fingerprint())
+        self.assertNotEqual(fingerprint, self.simple.fingerprint())
+
+        # Changes anywhere in the tree are seen, and undoing them restores
+        # the fingerprint.
+        self.comp.r["AAA"].ll.append(1)
+        changed = self.comp.fingerprint()
+        self.assertNotEqual(changed, fingerprint)
+        self.comp.r["AAA"].ll.pop()
+        self.assertEqual(self.comp.fingerprint(), fingerprint)
+        self.comp.p.name = "AAA"
+        self.assertNotEqual(self.comp.fingerprint(), fingerprint)
+        self.comp.p.name = "BBB"
+        self.comp.c.f = 1.0
+        self.assertNotEqual(self.comp.fingerprint(), fingerprint)
+        self.comp.c.f = 0.0
+        self.assertEqual(self.comp.fingerprint(), fingerprint)
+
+        # Building a default subconfig is not a change.
+        self.comp.p["AAA"]
+        self.assertEqual(self.comp.fingerprint(), fingerprint)
+
+        roundTrip = Complex()
+        roundTrip.loadFromString(self.comp.saveToString())
+        self.assertEqual(roundTrip.fingerprint(), fingerprint)
+
+        # Once frozen, the fingerprint is computed only once.
+        self.comp.freeze()
+        self.assertEqual(self.comp.fingerprint(), fingerprint)
+        with unittest.mock.patch.object(pexConfig.Field, "_updateFingerprint") as update:
+            self.assertEqual(self.comp.fingerprint(), fingerprint)
+        update.assert_not_called()
+
+    def testDiff(self):
+        self.assertEqual(self.comp.diff(Complex()), [])
+        with self.assertRaises(TypeError):
+            self.comp.diff(self.simple)
+
+        other = Complex()
+        other.c.f = 2.0
+        other.r["AAA"].ll = [4, 5]
+        other.r["BBB"].f = 1.0
+        other.p.name = "AAA"
+        diff = self.comp.diff(other)
+        self.assertEqual(
+            diff,
+            [
+                pexConfig.ConfigDifference("c.f", 0.0, 2.0, "value"),
+                pexConfig.ConfigDifference("r['AAA'].ll", [1, 2, 3], [4, 5], "value"),
+                pexConfig.ConfigDifference("r['BBB'].f", 0.0, 1.0, "value"),
+                pexConfig.ConfigDifference("p", "BBB", "AAA", "selection"),
+            ],
+        )
+
+        # Applying the diff makes the configs equal, with one history entry
+        # per field changed.
+        patched = self.comp.copy()
+        patched.applyDiff(diff)
+        self.assertEqual(patched.fingerprint(), other.fingerprint())
+        self.assertEqual(patched.diff(other), [])
+        self.assertEqual(patched.c.history["f"][-1][2], "diff")
+        self.assertEqual(len(patched.c.history["f"]), len(self.comp.c.history["f"]) + 1)
+
+        # Subconfigs with matching fingerprints are not looked into.
+        other.c.f = 0.0
+        with unittest.mock.patch.object(pexConfig.Field, "_diff") as fieldDiff:
+            self.assertEqual(self.comp.c.diff(other.c), [])
+        fieldDiff.assert_not_called()
+
+    def testCustomSave(self):
+        # Fields customizing save and _collectImports are still used.
+        config = CustomSaveParent()
+        config.sub.custom = 4
+        name = config.sub._name
+        for skipDefaults in (False, True):
+            stream = io.StringIO()
+            config.saveToStream(stream, root="root", skipDefaults=skipDefaults)
+            saved = stream.getvalue()
+            self.assertIn("\nroot.sub.custom=4  # custom\n", saved)
+            self.assertIn("\nimport unittest.mock\n", saved)
+        self.assertEqual(config.sub._name, name)
+        roundTrip = CustomSaveParent()
+        roundTrip.loadFromString(saved, root="root")
+        self.assertEqual(roundTrip.sub.custom, 4)
+
+    def testSaveDoesNotModify(self):
+        self.comp.freeze()
+        names = (self.comp._name, self.comp.c._name, self.comp.r["AAA"]._name)
+        imports = set(self.comp._imports)
+        saved = self.comp.saveToString()
+        self.assertEqual((self.comp._name, self.comp.c._name, self.comp.r["AAA"]._name), names)
+        self.assertEqual(self.comp._imports, imports)
+
+        # A shared frozen config can be saved from several threads at once.
+        with concurrent.futures.ThreadPoolExecutor(4) as pool:
+            results = list(pool.map(lambda _: self.comp.saveToString(), range(16)))
+        self.assertEqual(results, [saved] * 16)
+        self.assertIn("config.r['AAA'].f=", saved)
+
     def testDuplicateRegistryNames(self):
         self.comp.r["AAA"].f = 5.0
         self.assertEqual(self.comp.p["AAA"].f, 3.0)
@@ -422,6 +841,52 @@ class ConfigTest(unittest.TestCase):
         self.assertRaises(pexConfig.FieldValidationError, setattr, self.comp, "p", "AAA")
         self.assertRaises(pexConfig.FieldValidationError, setattr, self.comp.p["AAA"], "f", 5.0)
 
+    def testFrozenHash(self):
+        self.assertRaises(TypeError, hash, self.simple)
+        self.assertRaises(TypeError, hash, self.simple.ll)
+        self.assertRaises(TypeError, hash, self.simple.d)
+
+        self.simple.freeze()
+        self.assertEqual(self.simple.ll, [1, 2, 3])
+        # Reads give lists, as before the config was frozen.
+        self.assertEqual(self.simple.ll.list(), [1, 2, 3])
+        self.assertEqual(self.simple.ll[1:] + [4], [2, 3, 4])
+        self.assertEqual(self.simple.ll.list() + [4], [1, 2, 3, 4])
+        self.assertEqual(self.simple.d, {"key": "value"})
+        self.assertEqual(repr(self.simple.ll), "[1, 2, 3]")
+        self.assertEqual(repr(self.simple.d), "{'key': 'value'}")
+        self.assertEqual(hash(self.simple.ll), hash((1, 2, 3)))
+        self.assertEqual(hash(self.simple.d), hash(frozenset({("key", "value")})))
+        self.assertRaises(pexConfig.FieldValidationError, self.simple.ll.append, 4)
+        self.assertRaises(pexConfig.FieldValidationError, self.simple.d.__setitem__, "key2", "value2")
+
+        other = Simple()
+        other.freeze()
+        cache = {self.simple: 1}
+        self.assertEqual(cache[other], 1)
+
+        # Copies are not frozen, and hold mutable containers again.
+        copied = self.simple.copy()
+        copied.ll.append(4)
+        copied.d["key2"] = "value2"
+        self.assertEqual(self.simple.ll, [1, 2, 3])
+
+        self.comp.freeze()
+        compCopy = self.comp.copy()
+        compCopy.freeze()
+        self.assertEqual(hash(compCopy), hash(self.comp))
+
+        # Equal configs hash equally even if their values differ in repr.
+        c1 = Simple(f=0.0, n=float("nan"))
+        c2 = Simple(f=-0.0, n=float("nan"))
+        c3 = Simple(f=0)
+        for c in (c1, c2, c3):
+            c.freeze()
+        self.assertEqual(c1, c2)
+        self.assertEqual(hash(c1), hash(c2))
+        self.assertEqual(hash(c1), hash(c3))
+        self.assertEqual(len({c1, c2, c3}), 1)
+
     def checkImportRoundTrip(self, importStatement, searchString, shouldBeThere):
         self.comp.c.f = 5.0
 
@@ -472,6 +937,113 @@ except ImportError:
         self.assertIsInstance(comp, Complex)
         self.assertEqual(self.comp.c.f, comp.c.f)
 
+        # Selections, lists and dicts survive, without executing any code.
+        self.simple.ll.append(4)
+        self.simple.d["key2"] = "value2"
+        self.comp.r["AAA"].ll = [7]
+        self.comp.p = None
+        with unittest.mock.patch("lsst.pex.config.config.exec", side_effect=AssertionError, create=True):
+            for config in (self.simple, self.comp, self.outer):
+                copied = pickle.loads(pickle.dumps(config))
+                self.assertTrue(config.compare(copied))
+                self.assertEqual(copied.saveToString(), config.saveToString())
+
+        # Pickles of configs saved as code can still be loaded.
+        simple = pexConfig.config.unreduceConfig(Simple, self.simple.saveToString().encode())
+        self.assertTrue(simple.compare(self.simple))
+
+    def testPickleImports(self):
+        # Plugins that register themselves on import are imported again
+        # when a config is unpickled in a fresh process.
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with open(os.path.join(tmpdir, "pickleTestRegistry.py"), "w") as f:
+                f.write(
+                    textwrap.dedent(
+                        """
+                        import lsst.pex.config as pexConfig
+
+                        registry = pexConfig.makeRegistry("plugins")
+
+                        class ParentConfig(pexConfig.Config):
+                            plugin = registry.makeField("plugin")
+                        """
+                    )
+                )
+            with open(os.path.join(tmpdir, "pickleTestPlugin.py"), "w") as f:
+                f.write(
+                    textwrap.dedent(
+                        """
+                        import lsst.pex.config as pexConfig
+                        from pickleTestRegistry import registry
+
+                        class PluginConfig(pexConfig.Config):
+                            number = pexConfig.Field("number", int, default=0)
+
+                        class Plugin:
+                            ConfigClass = PluginConfig
+
+                        registry.register("plugin", Plugin)
+                        """
+                    )
+                )
+            sys.path.insert(0, tmpdir)
+            try:
+                import pickleTestPlugin
+                import pickleTestRegistry
+
+                config = pickleTestRegistry.ParentConfig()
+                config.plugin.name = "plugin"
+                config.plugin["plugin"].number = 3
+                pickled = pickle.dumps(config)
+            finally:
+                sys.path.remove(tmpdir)
+                del sys.modules[pickleTestPlugin.__name__], sys.modules[pickleTestRegistry.__name__]
+
+            env = dict(os.environ)
+            env["PYTHONPATH"] = os.pathsep.join([tmpdir] + sys.path)
+            script = (
+                "import pickle, sys\n"
+                "config = pickle.loads(sys.stdin.buffer.read())\n"
+                "print(config.plugin.name, config.plugin.active.number)\n"
+            )
+            result = subprocess.run(
+                [sys.executable, "-c", script], input=pickled, env=env, capture_output=True, check=True
+            )
+            self.assertEqual(result.stdout.decode().split(), ["plugin", "3"])
+
+    def testCopy(self):
+        self.simple.f = 5
+        self.simple.ll.append(4)
+        self.simple.d["key2"] = "value2"
+        self.comp.c.f = 5
+        self.comp.r["AAA"].ll = [7]
+        self.comp.p = "AAA"
+        self.comp.freeze()
+        for config in (self.simple, self.comp, self.outer):
+            for copied in (config.copy(), copy.deepcopy(config), config.copy(keepHistory=False)):
+                self.assertIsInstance(copied, type(config))
+                self.assertTrue(config.compare(copied))
+                self.assertEqual(copied.saveToString(), config.saveToString())
+        self.assertEqual(len(self.simple.copy(keepHistory=False).history["ll"]), 0)
+        self.assertEqual(self.simple.copy().history["ll"], self.simple.history["ll"])
+
+        # The copy is independent of the original, and not frozen.
+        simple = self.simple.copy()
+        simple.ll.append(5)
+        simple.d["key3"] = "value3"
+        self.assertEqual(list(self.simple.ll), [1, 2, 3, 4])
+        self.assertNotIn("key3", self.simple.d)
+        with self.assertRaises(pexConfig.FieldValidationError):
+            simple.ll.append(-1)
+        comp = self.comp.copy()
+        comp.r["AAA"].ll.append(8)
+        comp.c.f = 6
+        comp.p = "BBB"
+        self.assertEqual(list(self.comp.r["AAA"].ll), [7])
+        self.assertEqual(self.comp.c.f, 5)
+        self.assertEqual(self.comp.p.name, "AAA")
+        self.assertIs(comp.r._config, comp)
+
     @unittest.skipIf(yaml is None, "Test requires pyyaml")
     def testYaml(self):
         self.simple.f = 5
@@ -538,6 +1110,87 @@ except ImportError:
         # Before DM-16561, this raised.
         self.assertFalse(self.outer.compare(self.inner))
 
+    def testCompareFloats(self):
+        class LegacyField(pexConfig.Field):
+            """A field that only customizes ``_compare``."""
+
+            def _compare(self, instance1, instance2, shortcut, rtol, atol, output):
+                output("legacy")
+                return False
+
+        class FloatConfig(pexConfig.Config):
+            f = pexConfig.Field("float", float, default=1.0)
+            ll = pexConfig.ListField("float list", float, default=[1.0, float("nan"), 3.0])
+            d = pexConfig.DictField("float dict", str, float, default={"a": 1.0, "b": None})
+            i = pexConfig.Field("int", int, default=1)
+            legacy = LegacyField("legacy", int, default=0)
+
+        config1 = FloatConfig()
+        config2 = FloatConfig()
+        config2.legacy = 1
+        outList = []
+        self.assertFalse(config1.compare(config2, shortcut=False, output=outList.append))
+        self.assertEqual(outList, ["legacy"])
+
+        config2.f = 1.0 + 1e-10
+        config2.ll = [1.0, float("nan"), 3.0 + 1e-10]
+        self.assertFalse(config1.compare(config2, shortcut=False, rtol=0.0, atol=0.0))
+        del outList[:]
+        self.assertFalse(config1.compare(config2, shortcut=False, output=outList.append))
+        self.assertEqual(outList, ["legacy"])
+
+        # Differences are reported in field order, with the floats compared
+        # along with everything else.
+        config2.f = 2.0
+        config2.ll[2] = 4.0
+        config2.ll[0] = 0.0
+        config2.d["b"] = 2.0
+        config2.i = 2
+        del outList[:]
+        self.assertFalse(config1.compare(config2, shortcut=False, output=outList.append))
+        self.assertEqual(
+            outList,
+            [
+                "Inequality in f: 1.0 != 2.0",
+                "Inequality in ll[0]: 1.0 != 0.0",
+                "Inequality in ll[2]: 3.0 != 4.0",
+                "Inequality in d['b']: None != 2.0",
+                "Inequality in i: 1 != 2",
+                "legacy",
+            ],
+        )
+        del outList[:]
+        self.assertFalse(config1.compare(config2, shortcut=True, output=outList.append))
+        self.assertEqual(outList, ["Inequality in f: 1.0 != 2.0"])
+        config2.f = 1.0
+        del outList[:]
+        self.assertFalse(config1.compare(config2, shortcut=True, output=outList.append))
+        self.assertEqual(outList, ["Inequality in ll[0]: 1.0 != 0.0"])
+
+    def testGroupConfigs(self):
+        configs = [Complex() for _ in range(6)]
+        configs[1].c.f = 1e-12
+        configs[2].r["AAA"].d = {"key": "value", "other": "v"}
+        configs[3].r["AAA"].d = {"other": "v", "key": "value"}
+        configs[4].p["AAA"].f = 5.0
+        configs[5].c.f = 2.0
+        configs += [self.simple, Complex()]
+
+        # Configs are only compared with groups of the same structure, and
+        # not at all if their fingerprint was seen before.
+        run = pexConfig.comparison._Comparison.run
+        with unittest.mock.patch.object(
+            pexConfig.comparison._Comparison, "run", autospec=True, side_effect=run
+        ) as mockRun:
+            groups = pexConfig.groupConfigs(configs)
+        self.assertEqual([group.indices for group in groups], [[0, 1, 4, 7], [2, 3], [5], [6]])
+        self.assertEqual(mockRun.call_count, 4)
+        self.assertIs(groups[0].representative, configs[0])
+        self.assertEqual(groups[1].members, [configs[2], configs[3]])
+
+        groups = pexConfig.groupConfigs(configs, atol=1e-13)
+        self.assertEqual([group.indices for group in groups], [[0, 4, 7], [1], [2, 3], [5], [6]])
+
     def testLoadError(self):
         """Check that loading allows errors in the file being loaded to
         propagate.
@@ -557,6 +1210,18 @@ except ImportError:
         for name in names:
             self.assertTrue(hasattr(self.simple, name))
 
+        self.comp.r["AAA"].f = 5.0
+        names = self.comp.names()
+        self.assertEqual(names[:3], ["c.f", "r['AAA'].i", "r['AAA'].f"])
+        self.assertIn("r.name", names)
+        self.assertIn("p['BBB'].f", names)
+
+        items = self.comp.iterNames()
+        self.assertEqual(
+            list(itertools.islice(items, 3)), [("c.f", 0.0), ("r['AAA'].i", None), ("r['AAA'].f", 5.0)]
+        )
+        self.assertEqual(dict(self.comp.iterNames())["r.name"], "AAA")
+
     def testIteration(self):
         self.assertIn("ll", self.simple)
         self.assertIn("ll", self.simple.keys())
@@ -0,0 +1,163 @@
+# This file is part of pex_config.
+#
+# Developed for the LSST Data Management System.
+# This product includes software developed by the LSST Project
+# (http://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This software is dual licensed under the GNU General Public License and also
+# under a 3-clause BSD license. Recipients may choose which of these licenses
+# to use; please see the files gpl-3.0.txt and/or bsd_license.txt,
+# respectively.  If you choose the GPL option then the following text applies
+# (but note that there is still no warranty even if you opt for BSD instead):
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import pickle
+import unittest
+
+import lsst.pex.config as pexConfig
+import numpy
+
+
+class Config1(pexConfig.Config):
+    a1 = pexConfig.ArrayField("a1", float, default=[1, 2, 3], shape=(None,), itemCheck=lambda x: x > 0)
+    a2 = pexConfig.ArrayField("a2", int, default=numpy.arange(100).reshape(4, 25), shape=(4, None))
+    a3 = pexConfig.ArrayField("a3", numpy.float32, default=None, optional=True, arrayCheck=numpy.all)
+
+
+class ArrayFieldTest(unittest.TestCase):
+    def testConstructor(self):
+        with self.assertRaises(ValueError):
+            pexConfig.ArrayField("...", str)
+        with self.assertRaises(ValueError):
+            pexConfig.ArrayField("...", float, shape=(-1,))
+        with self.assertRaises(ValueError):
+            pexConfig.ArrayField("...", float, itemCheck=4)
+
+    def testAssignment(self):
+        c = Config1()
+        self.assertEqual(c.a1.dtype, numpy.float64)
+        self.assertEqual(c.a2.shape, (4, 25))
+        self.assertIsNone(c.a3)
+
+        # Values are read-only, and shared without copying.
+        with self.assertRaises(ValueError):
+            c.a1[0] = 5.0
+        self.assertTrue(numpy.shares_memory(c.a2, c._storage["a2"]))
+
+        values = numpy.array([4.0, 5.0])
+        c.a1 = values
+        values[0] = 6.0
+        self.assertEqual(c.a1.tolist(), [4.0, 5.0])
+        c.a3 = [1, 2]
+        self.assertEqual(c.a3.dtype, numpy.float32)
+
+        with self.assertRaises(pexConfig.FieldValidationError):
+            c.a1 = [1.0, -1.0]
+        with self.assertRaises(pexConfig.FieldValidationError):
+            c.a2 = [1.5]
+        with self.assertRaises(pexConfig.FieldValidationError):
+            c.a2 = ["a"]
+        self.assertEqual(c.a1.tolist(), [4.0, 5.0])
+
+        c.freeze()
+        with self.assertRaises(pexConfig.FieldValidationError):
+            c.a1 = [1.0]
+
+    def testValidate(self):
+        c = Config1()
+        c.validate()
+        c.a1 = [[1.0]]
+        self.assertRaises(pexConfig.FieldValidationError, c.validate)
+        c.a1 = []
+        c.a2 = numpy.ones((3, 25), dtype=int)
+        self.assertRaises(pexConfig.FieldValidationError, c.validate)
+        c.a2 = numpy.ones((4, 2), dtype=int)
+        c.a3 = [1.0, 0.0]
+        self.assertRaises(pexConfig.FieldValidationError, c.validate)
+        c.a3 = None
+        c.validate()
+
+    def testSaveLoad(self):
+        c = Config1()
+        c.a3 = [numpy.nan, 1.0]
+        saved = c.saveToString()
+        self.assertIn("config.a1=[1.0, 2.0, 3.0]", saved)
+        self.assertIn("config.a2=numpy.frombuffer(", saved)
+
+        loaded = Config1()
+        loaded.loadFromString(saved)
+        self.assertEqual(loaded.fingerprint(), c.fingerprint())
+        self.assertEqual(loaded.diff(c), [])
+        self.assertTrue(loaded.compare(c))
+        self.assertEqual(loaded.a2.shape, (4, 25))
+        self.assertNotIn("a2", c.saveToString(skipDefaults=True))
+
+        unpickled = pickle.loads(pickle.dumps(c))
+        self.assertEqual(unpickled.fingerprint(), c.fingerprint())
+
+    def testCompare(self):
+        c1 = Config1()
+        c2 = Config1()
+        c2.a1 = [1.0, 2.0, 3.0 + 1e-12]
+        self.assertTrue(c1.compare(c2))
+        self.assertNotEqual(c1.fingerprint(), c2.fingerprint())
+
+        c2.a2 = numpy.zeros((4, 25), dtype=int)
+        c2.a1 = [1.0, 2.0, 4.0]
+        messages = []
+        self.assertFalse(c1.compare(c2, shortcut=False, output=messages.append))
+        self.assertEqual(messages[0], "Inequality in a1[2]: 3.0 != 4.0")
+        self.assertEqual(messages[1], "Inequality in a2[0, 1]: 1 != 0")
+        self.assertEqual([d.path for d in c1.diff(c2)], ["a1", "a2"])
+
+        c2.a1 = [1.0]
+        messages = []
+        self.assertFalse(c1.compare(c2, output=messages.append))
+        self.assertEqual(messages, ["Inequality in shape for a1: (3,) != (1,)"])
+
+    def testEquality(self):
+        c1 = Config1()
+        c2 = Config1()
+        self.assertEqual(c1, c2)
+        c1.a3 = [numpy.nan, 1.0]
+        self.assertNotEqual(c1, c2)
+        c2.a3 = [numpy.nan, 1.0]
+        self.assertEqual(c1, c2)
+        c2.a2 = numpy.zeros((4, 25), dtype=int)
+        self.assertNotEqual(c1, c2)
+        c2.a2 = numpy.arange(100).reshape(2, 50)
+        self.assertNotEqual(c1, c2)
+
+        c2.a2 = c1.a2
+        c1.a3 = [numpy.nan, 0.0]
+        c2.a3 = [-numpy.nan, -0.0]
+        c1.freeze()
+        c2.freeze()
+        self.assertEqual(c1, c2)
+        self.assertEqual(hash(c1), hash(c2))
+        self.assertEqual({c1: 1}[c2], 1)
+
+        # The hash depends on the values, not just the shapes.
+        c3 = Config1()
+        c3.a2 = numpy.zeros((4, 25), dtype=int)
+        c3.a3 = [numpy.nan, 0.0]
+        c3.freeze()
+        self.assertNotEqual(hash(c1), hash(c3))
+
+
+if __name__ == "__main__":
+    unittest.main()
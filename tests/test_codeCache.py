@@ -0,0 +1,111 @@
+# This file is part of pex_config.
+#
+# Developed for the LSST Data Management System.
+# This product includes software developed by the LSST Project
+# (http://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This software is dual licensed under the GNU General Public License and also
+# under a 3-clause BSD license. Recipients may choose which of these licenses
+# to use; please see the files gpl-3.0.txt and/or bsd_license.txt,
+# respectively.  If you choose the GPL option then the following text applies
+# (but note that there is still no warranty even if you opt for BSD instead):
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import sys
+import tempfile
+import unittest
+import unittest.mock
+
+import lsst.pex.config as pexConfig
+from lsst.pex.config.codeCache import CodeCache, getDefaultCodeCache
+
+
+class CacheConfig(pexConfig.Config):
+    number = pexConfig.Field("number", int, default=0)
+
+
+class CodeCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.tmpdir.name, "override.py")
+        with open(self.filename, "w") as f:
+            f.write("config.number = 3\n")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    @unittest.mock.patch.object(sys, "dont_write_bytecode", False)
+    def testCompileFile(self):
+        cache = CodeCache()
+        code = cache.compileFile(self.filename)
+        self.assertIs(cache.compileFile(self.filename), code)
+        self.assertEqual(cache.getStats(), {"hits": 1, "diskHits": 0, "misses": 1, "size": 1})
+
+        # A fresh cache finds the code on disk.
+        other = CodeCache()
+        self.assertEqual(other.compileFile(self.filename).filename, self.filename)
+        self.assertEqual(other.getStats()["diskHits"], 1)
+
+        # Changing the file invalidates both.
+        with open(self.filename, "w") as f:
+            f.write("config.number = 4\n")
+        os.utime(self.filename, ns=(0, 0))
+        for c in (cache, other, CodeCache(useDisk=False)):
+            config = CacheConfig()
+            config.loadFromString(c.compileFile(self.filename))
+            self.assertEqual(config.number, 4)
+        self.assertEqual(cache.getStats()["misses"], 2)
+
+        cache.clear()
+        self.assertEqual(cache.getStats(), {"hits": 0, "diskHits": 0, "misses": 0, "size": 0})
+
+    @unittest.mock.patch.object(sys, "dont_write_bytecode", False)
+    def testFailedWrite(self):
+        cache = CodeCache()
+        cacheFile = cache._getCacheFile(self.filename)
+        with unittest.mock.patch("os.replace", side_effect=OSError("read-only")):
+            config = CacheConfig()
+            config.loadFromString(cache.compileFile(self.filename))
+        self.assertEqual(config.number, 3)
+        # No temporary file is left behind next to the cache file.
+        self.assertEqual(os.listdir(os.path.dirname(cacheFile)), [])
+
+    def testCompileSource(self):
+        cache = CodeCache(maxSize=1)
+        code = cache.compileSource("config.number = 5\n", "a.py")
+        self.assertIs(cache.compileSource("config.number = 5\n", "a.py"), code)
+        self.assertIsNot(cache.compileSource("config.number = 5\n", "b.py"), code)
+        self.assertIsNot(cache.compileSource("config.number = 5\n", "a.py"), code)
+        self.assertEqual(cache.getStats()["size"], 1)
+
+        disabled = CodeCache(enabled=False)
+        self.assertIsNot(disabled.compileSource("x = 1", "a.py"), disabled.compileSource("x = 1", "a.py"))
+        self.assertEqual(disabled.getStats()["size"], 0)
+
+    def testLoad(self):
+        stats = getDefaultCodeCache().getStats()
+        for _ in range(2):
+            config = CacheConfig()
+            config.load(self.filename)
+            self.assertEqual(config.number, 3)
+        newStats = getDefaultCodeCache().getStats()
+        self.assertEqual(newStats["hits"], stats["hits"] + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -113,6 +113,9 @@ class ConfigDictFieldTest(unittest.TestCase):
         self.assertRaises(pexConfig.FieldValidationError, c.d1.__setitem__, "a", 0)
         c.d1["a"] = Config1(f=4)
         self.assertEqual(c.d1["a"].f, 4)
+        c.d1.update({"a": Config1(f=5), "b": Config1})
+        self.assertEqual(c.d1["a"].f, 5)
+        self.assertEqual(c.d1["b"].f, Config1().f)
 
     def testSave(self):
         c = Config2(d1={"a": Config1(f=4)})
@@ -170,6 +173,26 @@ class ConfigDictFieldTest(unittest.TestCase):
 
         self.assertTrue(pexConfig.compareConfigs("test", c1, c2))
 
+    def testDiff(self):
+        c1 = Config2(d1={"a": Config1(f=4), "b": Config1})
+        c2 = Config2(d1={"b": Config1, "c": Config1(f=5), "d": Config1})
+        diff = c1.diff(c2)
+        self.assertEqual(
+            [(d.path, d.kind) for d in diff], [("d1['a']", "remove"), ("d1['c']", "add"), ("d1['d']", "add")]
+        )
+
+        # All the changes to the dict are recorded as one history entry.
+        patched = c1.copy()
+        nHistory = len(patched.history["d1"])
+        patched.applyDiff(diff)
+        self.assertEqual(patched.diff(c2), [])
+        self.assertEqual(len(patched.history["d1"]), nHistory + 1)
+        self.assertEqual(patched.history["d1"][-1][2], "diff")
+
+        # Differences that do not come from diff cannot be applied.
+        with self.assertRaises(ValueError):
+            patched.applyDiff([pexConfig.ConfigDifference("d1['e']", None, Config1(), "add")])
+
 
 if __name__ == "__main__":
     unittest.main()
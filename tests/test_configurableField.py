@@ -141,6 +141,35 @@ class ConfigurableFieldTest(unittest.TestCase):
         self.assertEqual(c.c2.f, r.c2.f)
         self.assertEqual(c.c2.target, r.c2.target)
 
+        # Only the retarget and the changed value are needed.
+        saved = c.saveToString(skipDefaults=True, skipDocs=True)
+        self.assertEqual(saved.count("\nconfig."), 2)
+        r = Config2()
+        r.loadFromString(saved)
+        self.assertEqual(r.c2.f, 10)
+        self.assertIs(r.c2.target, Target1)
+        self.assertTrue(c.compare(r))
+
+    def testCopy(self):
+        c = Config2()
+        c.c2.retarget(Target1)
+        c.c2.f = 10
+        r = c.copy()
+        self.assertIs(r.c2.target, Target1)
+        self.assertEqual(r.c2.f, 10)
+        r.c2.f = 11
+        self.assertEqual(c.c2.f, 10)
+        self.assertTrue(c.c1.value.compare(r.c1.value))
+
+    def testPickle(self):
+        c = Config2()
+        c.c2.retarget(Target1)
+        c.c2.f = 10
+        r = pickle.loads(pickle.dumps(c))
+        self.assertIs(r.c2.target, Target1)
+        self.assertEqual(r.c2.f, 10)
+        self.assertTrue(c.compare(r))
+
     def testNoPickle(self):
         """Test that pickle support is disabled for the proxy container."""
         c = Config2()
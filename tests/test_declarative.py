@@ -0,0 +1,134 @@
+# This file is part of pex_config.
+#
+# Developed for the LSST Data Management System.
+# This product includes software developed by the LSST Project
+# (http://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This software is dual licensed under the GNU General Public License and also
+# under a 3-clause BSD license. Recipients may choose which of these licenses
+# to use; please see the files gpl-3.0.txt and/or bsd_license.txt,
+# respectively.  If you choose the GPL option then the following text applies
+# (but note that there is still no warranty even if you opt for BSD instead):
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import math
+import os
+import tempfile
+import unittest
+import unittest.mock
+
+import lsst.pex.config as pexConfig
+from lsst.pex.config.declarative import DeclarativeOverride, compileOverride
+
+
+class InnerConfig(pexConfig.Config):
+    f = pexConfig.Field("f", float, default=1.0)
+
+
+def target(config):
+    return config
+
+
+class OtherConfig(InnerConfig):
+    pass
+
+
+def otherTarget(config):
+    return config
+
+
+class OuterConfig(pexConfig.Config):
+    i = pexConfig.ConfigField("inner", InnerConfig)
+    ll = pexConfig.ListField("list", int, default=[])
+    dd = pexConfig.DictField("dict", str, float, default={})
+    cd = pexConfig.ConfigDictField("config dict", str, InnerConfig, default={})
+    choice = pexConfig.ConfigChoiceField("choice", {"A": InnerConfig, "B": InnerConfig}, default="A")
+    multi = pexConfig.ConfigChoiceField("multi", {"A": InnerConfig, "B": InnerConfig}, multi=True)
+    c = pexConfig.ConfigurableField("configurable", target=target, ConfigClass=InnerConfig)
+
+
+class DeclarativeOverrideTestCase(unittest.TestCase):
+    def setUp(self):
+        self.config = OuterConfig()
+        self.config.i.f = float("nan")
+        self.config.ll = [1, -2]
+        self.config.dd["x"] = -3.5
+        self.config.cd["y"] = InnerConfig(f=4.0)
+        self.config.choice = "B"
+        self.config.choice["B"].f = 5.0
+        self.config.multi.names = ["A", "B"]
+        self.config.c.retarget(otherTarget, OtherConfig)
+        self.config.c.f = 6.0
+
+    def testSavedConfig(self):
+        saved = self.config.saveToString()
+        self.assertIsInstance(compileOverride(saved, "saved.py"), DeclarativeOverride)
+        with unittest.mock.patch("lsst.pex.config.config.exec", side_effect=AssertionError, create=True):
+            loaded = OuterConfig()
+            loaded.loadFromString(saved)
+        self.assertEqual(loaded.saveToString(), saved)
+        self.assertTrue(math.isnan(loaded.i.f))
+        loaded.i.f = self.config.i.f = 0.0
+        self.assertTrue(self.config.compare(loaded))
+        self.assertIs(loaded.c.target, otherTarget)
+        self.assertIs(type(loaded.c.value), OtherConfig)
+
+        # The assertion written by saveToStream still applies, before
+        # anything is modified.
+        with self.assertRaises(AssertionError):
+            InnerConfig().loadFromString(saved)
+
+    def testHistory(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, "override.py")
+            with open(filename, "w") as f:
+                f.write('"""Overrides."""\nimport math\n\nconfig.i.f = -2\nconfig.ll[0] = 3\n')
+            self.config.load(filename)
+        self.assertEqual(self.config.i.f, -2.0)
+        self.assertEqual(list(self.config.ll), [3, -2])
+        frame = self.config.i.history["f"][-1][1][-1]
+        self.assertEqual((frame.filename, frame.lineno), (filename, 4))
+        self.assertEqual(self.config.ll.history[-1][1][-1].lineno, 5)
+
+    def testFallback(self):
+        for source in (
+            "config.i.f = 2.0\nconfig.ll = [len('abc')]\n",
+            "value = 3\nconfig.i.f = 2.0\nconfig.ll = [value]\n",
+            "config.i.f = 2.0\nconfig.ll = [int(config.i.f) + 1]\n",
+            "config.i.f = 2.0\nfor i in range(3, 4):\n    config.ll = [i]\n",
+        ):
+            config = OuterConfig()
+            config.loadFromString(source)
+            self.assertEqual((config.i.f, list(config.ll)), (2.0, [3]))
+        self.assertNotIsInstance(compileOverride(source, "x.py"), DeclarativeOverride)
+
+        # The path taken is logged.
+        with self.assertLogs("lsst.pex.config", level="DEBUG") as cm:
+            OuterConfig().loadFromString(source, filename="x.py")
+            OuterConfig().loadFromString("config.i.f = 2.0\n", filename="y.py")
+        self.assertEqual(
+            [record.getMessage() for record in cm.records],
+            ["Executing config override x.py.", "Applied config override y.py declaratively."],
+        )
+
+        # Errors are reported by the fallback as they always were.
+        with self.assertRaises(NameError):
+            OuterConfig().loadFromString("config.i.f = 2.0\nconfig.ll = [undefined]\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -146,6 +146,27 @@ class DictFieldTest(unittest.TestCase):
         c.d3[4] = 5
         self.assertEqual(c.d3, {4.0: 5.0})
 
+    def testUpdate(self):
+        c = Config1()
+        nHistory = len(c.history["d1"])
+        c.d1.update({"a": 1}, b=2)
+        c.d1.update([("c", 3)])
+        self.assertEqual(c.d1, {"hi": 4, "a": 1, "b": 2, "c": 3})
+        self.assertEqual(len(c.history["d1"]), nHistory + 2)
+        self.assertEqual(c.history["d1"][-2][0], {"hi": 4, "a": 1, "b": 2})
+
+        # A bad item leaves the mapping unchanged.
+        with self.assertRaises(pexConfig.FieldValidationError):
+            c.d1.update({"d": 4, "e": 0})
+        self.assertEqual(c.d1, {"hi": 4, "a": 1, "b": 2, "c": 3})
+
+        c.d3 = {}
+        c.d3.update({1: 2})
+        self.assertEqual(c.d3, {1.0: 2.0})
+
+        c.freeze()
+        self.assertRaises(pexConfig.FieldValidationError, c.d1.update, {"f": 5})
+
     def testNoArbitraryAttributes(self):
         c = Config1()
         self.assertRaises(pexConfig.FieldValidationError, setattr, c.d1, "should", "fail")
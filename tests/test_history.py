@@ -26,6 +26,7 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import unittest
+import unittest.mock
 
 import lsst.pex.config as pexConfig
 import lsst.pex.config.history as pexConfigHistory
@@ -35,6 +36,13 @@ class PexTestConfig(pexConfig.Config):
     a = pexConfig.Field("Parameter A", float, default=1.0)
 
 
+class PexTestListConfig(pexConfig.Config):
+    ll = pexConfig.ListField("List", int, default=[])
+    dd = pexConfig.DictField("Dict", str, int, default={})
+    sub = pexConfig.ConfigField("Subconfig", PexTestConfig)
+    choice = pexConfig.ConfigChoiceField("Choice", {"A": PexTestConfig}, default="A")
+
+
 class HistoryTest(unittest.TestCase):
     def testHistory(self):
         b = PexTestConfig()
@@ -80,6 +88,128 @@ class HistoryTest(unittest.TestCase):
 
         self.assertIn("\n    b.update(a=4.0)", output)
 
+    def testLazyCallStack(self):
+        b = PexTestConfig()
+        b.a = 2.0
+        value, stack, label = b.history["a"][-1]
+        self.assertIsInstance(stack, pexConfig.callStack.LazyCallStack)
+        self.assertEqual(value, 2.0)
+        self.assertEqual(label, "assignment")
+        self.assertEqual(stack[-1].content, "b.a = 2.0")
+        self.assertEqual(stack[-1].function, "testLazyCallStack")
+        self.assertEqual(len(stack), len(list(stack)))
+
+        # The frames are built once and slices do not expose the cache.
+        frames = stack._frames
+        self.assertIs(stack[0], frames[0])
+        self.assertIs(stack._frames, frames)
+        stack[:].clear()
+        self.assertEqual(len(stack), len(list(stack)))
+
+        # Stacks share their common prefix, down to the frame objects.
+        b.a = 3.0
+        other = b.history["a"][-1][1]
+        self.assertIsNot(other[-1], stack[-1])
+        self.assertIs(other[-2], stack[-2])
+        self.assertIs(other._leaf.parent, stack._leaf.parent)
+
+        # Concatenation with plain frames works from either side.
+        extra = pexConfig.callStack.StackFrame("extra.py", 1, "extra")
+        self.assertIs((stack + [extra])[-1], extra)
+        self.assertIs(([extra] + stack)[0], extra)
+        self.assertEqual(len([extra] + stack), len(stack) + 1)
+
+    def testHistoryLimit(self):
+        c = PexTestListConfig()
+        c.setHistoryLimit(2)
+        for i in range(5):
+            c.sub.a = float(i)
+            c.ll.append(i)
+            c.dd[str(i)] = i
+        self.assertEqual([h[0] for h in c.sub.history["a"]], [3.0, 4.0])
+        self.assertEqual([h[0] for h in c.ll.history], [[0, 1, 2, 3], [0, 1, 2, 3, 4]])
+        self.assertEqual(len(c.dd.history), 2)
+        self.assertIn("a", c.formatHistory("sub"))
+
+        # Subconfigs created later inherit the policy.
+        c.choice["A"].a = 5.0
+        c.choice["A"].a = 6.0
+        c.choice["A"].a = 7.0
+        self.assertEqual([h[0] for h in c.choice["A"].history["a"]], [6.0, 7.0])
+
+        c.setHistoryLimit(0)
+        c.sub.a = 8.0
+        c.ll = [1]
+        self.assertEqual(len(c.sub.history["a"]), 0)
+        self.assertEqual(len(c.ll.history), 0)
+        self.assertEqual(c.sub.a, 8.0)
+
+        for limit in (-1, 1.0, True, False):
+            with self.assertRaises(ValueError):
+                c.setHistoryLimit(limit)
+            with self.assertRaises(ValueError):
+                PexTestConfig.setDefaultHistoryLimit(limit)
+
+    def testDefaultHistoryLimit(self):
+        self.addCleanup(PexTestConfig.setDefaultHistoryLimit, PexTestConfig._historyLimit)
+        PexTestConfig.setDefaultHistoryLimit(0)
+        b = PexTestConfig()
+        b.a = 3.0
+        self.assertEqual(len(b.history["a"]), 0)
+        # Other classes are unaffected.
+        c = PexTestListConfig()
+        self.assertEqual(len(c.history["ll"]), 1)
+        # Existing instances are unaffected by later changes.
+        PexTestConfig.setDefaultHistoryLimit(None)
+        self.assertEqual(len(PexTestConfig().history["a"]), 1)
+        self.assertEqual(len(b.history["a"]), 0)
+
+    def testContainerHistory(self):
+        c = PexTestListConfig()
+        expectedList = [[]]
+        expectedDict = [{}]
+        for i in range(150):
+            c.ll.append(i)
+            expectedList.append(list(c.ll))
+            c.dd[str(i % 7)] = i
+            expectedDict.append(dict(c.dd))
+        c.ll[3] = -1
+        c.ll[10:20] = [0, 0]
+        del c.ll[0]
+        c.ll.insert(-2, 99)
+        expectedList.extend([None] * 4)
+        del c.dd["3"]
+        expectedDict.append(dict(c.dd))
+        self.assertEqual([h[0] for h in c.history["dd"]], expectedDict)
+        self.assertEqual(c.ll.history[-1][0], list(c.ll))
+        self.assertEqual([h[0] for h in c.ll.history[:-4]], expectedList[:-4])
+        self.assertEqual(c.history["ll"][-4][0][3], -1)
+        self.assertIn("99", c.formatHistory("ll"))
+
+        # Changes are recorded rather than full copies, apart from periodic
+        # snapshots.
+        raw = c._history["ll"]
+        self.assertEqual(len(raw), len(expectedList))
+        self.assertLess(sum(isinstance(h[0], list) for h in raw), len(raw) // 32)
+
+        # Expanded entries are kept, and only new entries are expanded.
+        self.assertIsInstance(c.history, dict)
+        apply = pexConfig.listField._ListDelta.apply
+        with unittest.mock.patch.object(
+            pexConfig.listField._ListDelta, "apply", autospec=True, side_effect=apply
+        ) as mockApply:
+            self.assertEqual(c.ll.history[-1][0], list(c.ll))
+            mockApply.assert_not_called()
+            c.ll.append(1000)
+            self.assertEqual(c.history["ll"][-1][0], list(c.ll))
+            self.assertEqual(c.history["ll"][-2][0], list(c.ll)[:-1])
+            self.assertEqual(mockApply.call_count, 1)
+
+        # Limiting the history expands the retained entries.
+        c.setHistoryLimit(3)
+        self.assertEqual(c.ll.history[-1][0], list(c.ll))
+        self.assertEqual(c.dd.history[0][0], expectedDict[-3])
+
 
 if __name__ == "__main__":
     unittest.main()
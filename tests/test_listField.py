@@ -148,6 +148,36 @@ class ListFieldTest(unittest.TestCase):
         c.l1.extend([4, 5, 6])
         self.assertEqual(c.l1, [1, 2, 20, 10, 30, 4, 5, 6])
 
+    def testBulkModification(self):
+        c = Config1()
+        nHistory = len(c.history["l1"])
+        c.l1.extend([4, 5])
+        self.assertEqual(c.l1, [1, 2, 3, 4, 5])
+        self.assertEqual(len(c.history["l1"]), nHistory + 1)
+        self.assertEqual(c.history["l1"][-1][0], [1, 2, 3, 4, 5])
+
+        # A bad item leaves the list unchanged.
+        with self.assertRaises(pexConfig.FieldValidationError):
+            c.l1.extend([6, -1])
+        self.assertEqual(c.l1, [1, 2, 3, 4, 5])
+        with self.assertRaises(pexConfig.FieldValidationError):
+            c.l1.replaceAll([6, -1])
+        self.assertEqual(c.l1, [1, 2, 3, 4, 5])
+
+        c.l1.replaceAll([7, 8])
+        self.assertEqual(c.l1, [7, 8])
+        self.assertEqual(len(c.history["l1"]), nHistory + 2)
+        self.assertEqual(c.history["l1"][-1][0], [7, 8])
+
+        c2 = Config2()
+        c2.lf.extend([4, 5])
+        self.assertEqual(c2.lf, [1.0, 2.0, 3.0, 4.0, 5.0])
+        self.assertTrue(all(isinstance(x, float) for x in c2.lf))
+
+        c.freeze()
+        self.assertRaises(pexConfig.FieldValidationError, c.l1.extend, [1])
+        self.assertRaises(pexConfig.FieldValidationError, c.l1.replaceAll, [1, 2])
+
     def testCastAndTypes(self):
         c = Config2()
         self.assertEqual(c.lf, [1.0, 2.0, 3.0])
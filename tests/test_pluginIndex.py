@@ -0,0 +1,141 @@
+# This file is part of pex_config.
+#
+# Developed for the LSST Data Management System.
+# This product includes software developed by the LSST Project
+# (http://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This software is dual licensed under the GNU General Public License and also
+# under a 3-clause BSD license. Recipients may choose which of these licenses
+# to use; please see the files gpl-3.0.txt and/or bsd_license.txt,
+# respectively.  If you choose the GPL option then the following text applies
+# (but note that there is still no warranty even if you opt for BSD instead):
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import sys
+import tempfile
+import unittest
+import unittest.mock
+
+import lsst.pex.config as pexConfig
+from lsst.pex.config import pluginIndex
+from lsst.pex.config.pluginIndex import PluginIndex
+
+
+class PluginIndexTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.sitedir = os.path.join(self.tmpdir.name, "site")
+        self.cachedir = os.path.join(self.tmpdir.name, "cache")
+        os.mkdir(self.sitedir)
+        self.addDistribution("fakePlugins", {"fakePluginAlg": "fakePluginAlg:FakeAlg"})
+        with open(os.path.join(self.sitedir, "fakePluginAlg.py"), "w") as f:
+            f.write(
+                "import lsst.pex.config as pexConfig\n"
+                "class FakeAlg:\n"
+                "    ConfigClass = pexConfig.Config\n"
+            )
+        sys.path.insert(0, self.sitedir)
+
+    def tearDown(self):
+        sys.path.remove(self.sitedir)
+        sys.modules.pop("fakePluginAlg", None)
+        self.tmpdir.cleanup()
+
+    def addDistribution(self, name, entryPoints):
+        distInfo = os.path.join(self.sitedir, "%s-1.0.dist-info" % name)
+        os.mkdir(distInfo)
+        with open(os.path.join(distInfo, "METADATA"), "w") as f:
+            f.write("Metadata-Version: 2.1\nName: %s\nVersion: 1.0\n" % name)
+        with open(os.path.join(distInfo, "entry_points.txt"), "w") as f:
+            f.write("[test_pex_config.plugins]\n")
+            for k, v in entryPoints.items():
+                f.write("%s = %s\n" % (k, v))
+        # Make sure the change is seen even with coarse timestamps.
+        stat = os.stat(self.sitedir)
+        os.utime(self.sitedir, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000))
+
+    def testIndex(self):
+        index = PluginIndex(cacheDir=self.cachedir)
+        entryPoints = index.getEntryPoints("test_pex_config.plugins")
+        self.assertEqual(entryPoints, [("fakePluginAlg", "fakePluginAlg:FakeAlg")])
+        self.assertEqual(index.getEntryPoints("test_pex_config.none"), [])
+
+        # A fresh index reads the file instead of scanning.
+        with unittest.mock.patch.object(pluginIndex, "_scanEntryPoints") as scan:
+            other = PluginIndex(cacheDir=self.cachedir)
+            self.assertEqual(other.getEntryPoints("test_pex_config.plugins"), entryPoints)
+            scan.assert_not_called()
+
+        # The metadata of unchanged directories is not read again.
+        with unittest.mock.patch.object(pluginIndex, "_getMetadataSignature") as getMetadata:
+            self.assertEqual(index.getEntryPoints("test_pex_config.plugins"), entryPoints)
+            getMetadata.assert_not_called()
+
+        # Another sys.path has its own on-disk index.
+        self.assertEqual(len(os.listdir(self.cachedir)), 1)
+        sys.path.append(self.cachedir)
+        try:
+            PluginIndex(cacheDir=self.cachedir).getEntryPoints("test_pex_config.plugins")
+        finally:
+            sys.path.remove(self.cachedir)
+        self.assertEqual(len(os.listdir(self.cachedir)), 2)
+
+        # Installing a distribution invalidates the index.
+        self.addDistribution("morePlugins", {"another": "fakePluginAlg:FakeAlg [extra]"})
+        self.assertEqual(len(index.getEntryPoints("test_pex_config.plugins")), 2)
+
+        # So does editing the entry points in place, which does not touch
+        # the directory the distribution is installed in.
+        sitedirStat = os.stat(self.sitedir)
+        entryPointsFile = os.path.join(self.sitedir, "morePlugins-1.0.dist-info", "entry_points.txt")
+        with open(entryPointsFile, "a") as f:
+            f.write("third = fakePluginAlg:FakeAlg\n")
+        stat = os.stat(entryPointsFile)
+        os.utime(entryPointsFile, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000))
+        os.utime(self.sitedir, ns=(sitedirStat.st_atime_ns, sitedirStat.st_mtime_ns))
+        other = PluginIndex(cacheDir=self.cachedir)
+        self.assertEqual(len(other.getEntryPoints("test_pex_config.plugins")), 3)
+
+        # An index that has already read the metadata sees the change once
+        # it is cleared.
+        self.assertEqual(len(index.getEntryPoints("test_pex_config.plugins")), 2)
+        index.clear()
+        self.assertEqual(len(index.getEntryPoints("test_pex_config.plugins")), 3)
+
+        index.clear()
+        self.assertEqual(len(os.listdir(self.cachedir)), 1)
+        memoryOnly = PluginIndex(cacheDir=self.cachedir, useDisk=False)
+        self.assertEqual(len(memoryOnly.getEntryPoints("test_pex_config.plugins")), 3)
+        self.assertEqual(len(os.listdir(self.cachedir)), 1)
+
+    def testDiscover(self):
+        self.addDistribution(
+            "morePlugins", {"another": "fakePluginAlg:FakeAlg [extra]", "bad": "fakePluginAlg"}
+        )
+        index = PluginIndex(cacheDir=self.cachedir)
+        registry = pexConfig.makeRegistry("plugins")
+        registry.register("another", "fakePluginAlg:FakeAlg")
+        self.assertEqual(registry.discover("test_pex_config.plugins", index=index), ["fakePluginAlg"])
+        self.assertEqual(set(registry), {"another", "fakePluginAlg"})
+        self.assertNotIn("fakePluginAlg", sys.modules)
+        self.assertIs(registry["fakePluginAlg"], sys.modules["fakePluginAlg"].FakeAlg)
+        self.assertEqual(registry.discover("test_pex_config.plugins", index=index), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
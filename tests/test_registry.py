@@ -25,6 +25,9 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import os
+import sys
+import tempfile
 import unittest
 
 import lsst.pex.config as pexConfig
@@ -150,6 +153,54 @@ class ConfigTest(unittest.TestCase):
 
         self.assertRaises(pexConfig.FieldValidationError, fail, "bar")
 
+    def testLazyEntries(self):
+        with tempfile.TemporaryDirectory() as tempDir:
+            with open(os.path.join(tempDir, "lazyRegistryConfig.py"), "w") as f:
+                f.write(
+                    "import lsst.pex.config as pexConfig\n"
+                    "class LazyConfig(pexConfig.Config):\n"
+                    "    x = pexConfig.Field('x', int, default=1)\n"
+                )
+            with open(os.path.join(tempDir, "lazyRegistryAlg.py"), "w") as f:
+                f.write(
+                    "from lazyRegistryConfig import LazyConfig\n"
+                    "class LazyAlg:\n"
+                    "    ConfigClass = LazyConfig\n"
+                    "    def __init__(self, config):\n"
+                    "        self.config = config\n"
+                )
+            sys.path.insert(0, tempDir)
+            try:
+                registry = pexConfig.makeRegistry(doc="lazy registry")
+                registry.register("lazy", "lazyRegistryAlg:LazyAlg", "lazyRegistryConfig:LazyConfig")
+                registry.register("lazyTarget", "lazyRegistryAlg:LazyAlg")
+                registry.register("missing", "lazyRegistryAlg:Missing")
+                self.assertRaises(ValueError, registry.register, "bad", "lazyRegistryAlg.LazyAlg")
+                self.assertIn("lazy", registry)
+                self.assertNotIn("lazyRegistryConfig", sys.modules)
+
+                class C1(pexConfig.Config):
+                    r = registry.makeField("registry field")
+
+                # Only the config class is imported to make a config.
+                c = C1()
+                c.r.name = "lazy"
+                self.assertEqual(c.r.active.x, 1)
+                self.assertIn("lazyRegistryConfig", sys.modules)
+                self.assertNotIn("lazyRegistryAlg", sys.modules)
+
+                # The target is imported when it is used.
+                alg = c.r.apply()
+                self.assertIn("lazyRegistryAlg", sys.modules)
+                self.assertEqual(alg.config.x, 1)
+                self.assertIs(registry["lazyTarget"], sys.modules["lazyRegistryAlg"].LazyAlg)
+                self.assertIs(registry["lazy"].ConfigClass, sys.modules["lazyRegistryConfig"].LazyConfig)
+                self.assertRaises(ImportError, registry.__getitem__, "missing")
+            finally:
+                sys.path.remove(tempDir)
+                sys.modules.pop("lazyRegistryAlg", None)
+                sys.modules.pop("lazyRegistryConfig", None)
+
 
 if __name__ == "__main__":
     unittest.main()